@@ -0,0 +1,128 @@
+"""
+Compare cache payload formats on realistic squads and match lists.
+
+    python -m benchmarks.bench_cache_formats [--repeat 200]
+
+Reports bytes on disk and encode/decode time for the old indented JSON
+format, compact JSON, pickle protocol 5 (the default) and Arrow IPC.
+"""
+import argparse
+import io
+import json
+import random
+import time
+from typing import Any, Callable, Dict, List, Tuple
+
+import pyarrow as pa
+
+from src.utils.cache_serializers import decode, encode, get_serializer
+
+POSITIONS = ["Goalkeeper", "Defence", "Midfield", "Offence"]
+NATIONALITIES = ["Spain", "England", "Italy", "France", "Brazil", "Argentina", "Portugal", "Germany"]
+
+
+def _squad(rng: random.Random, team_id: int, size: int = 30) -> List[Dict[str, Any]]:
+    return [
+        {
+            "player_id": team_id * 1000 + i,
+            "name": f"Player {team_id}-{i} {rng.choice(['García', 'Smith', 'Rossi', 'Silva'])}",
+            "position": rng.choice(POSITIONS),
+            "date_of_birth": f"{rng.randint(1985, 2007)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "nationality": rng.choice(NATIONALITIES),
+            "appearances": None,
+            "goals": None,
+            "assists": None,
+        }
+        for i in range(size)
+    ]
+
+
+def _matches(rng: random.Random, team_id: int, count: int = 60) -> List[Dict[str, Any]]:
+    rows = []
+    for i in range(count):
+        finished = i < count // 2
+        rows.append({
+            "match_id": 500000 + team_id * 100 + i,
+            "competition_code": rng.choice(["PD", "CL", "CDR"]),
+            "utc_date": f"2025-{(i % 12) + 1:02d}-{(i % 28) + 1:02d}T19:00:00Z",
+            "status": "FINISHED" if finished else "SCHEDULED",
+            "home_team_id": team_id,
+            "home_team_name": f"Team {team_id} FC",
+            "away_team_id": team_id + i + 1,
+            "away_team_name": f"Team {team_id + i + 1} CF",
+            "score_home": rng.randint(0, 4) if finished else None,
+            "score_away": rng.randint(0, 4) if finished else None,
+        })
+    return rows
+
+
+def _legacy_json(data: Any) -> bytes:
+    # Formatet som cache_set skrev innan serializers fanns
+    return json.dumps({"ts": time.time(), "data": data}, ensure_ascii=False, indent=2).encode("utf-8")
+
+
+def _legacy_json_load(raw: bytes) -> Any:
+    return json.loads(raw)["data"]
+
+
+def _arrow_dumps(rows: List[Dict[str, Any]]) -> bytes:
+    table = pa.Table.from_pylist(rows)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue()
+
+
+def _arrow_loads(raw: bytes) -> List[Dict[str, Any]]:
+    return pa.ipc.open_stream(raw).read_all().to_pylist()
+
+
+FORMATS: Dict[str, Tuple[Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "json-indent (old)": (_legacy_json, _legacy_json_load),
+    "json-compact": (lambda d: encode(d, get_serializer("json")), decode),
+    "pickle5 (default)": (lambda d: encode(d, get_serializer("pickle")), decode),
+    "arrow-ipc": (_arrow_dumps, _arrow_loads),
+}
+
+
+def _time(fn: Callable[[], Any], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(repeat: int) -> List[Dict[str, Any]]:
+    rng = random.Random(42)
+    payloads = {
+        "squad (30 players)": _squad(rng, 86),
+        "team matches (60)": _matches(rng, 86),
+    }
+
+    results = []
+    for payload_name, data in payloads.items():
+        for fmt_name, (dumps, loads) in FORMATS.items():
+            blob = dumps(data)
+            assert loads(blob) == data
+            results.append({
+                "payload": payload_name,
+                "format": fmt_name,
+                "bytes": len(blob),
+                "dump_us": _time(lambda: dumps(data), repeat) * 1e6,
+                "load_us": _time(lambda: loads(blob), repeat) * 1e6,
+            })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'payload':<20} {'format':<18} {'bytes':>8} {'dump µs':>10} {'load µs':>10}")
+    for r in run(args.repeat):
+        print(f"{r['payload']:<20} {r['format']:<18} {r['bytes']:>8} {r['dump_us']:>10.1f} {r['load_us']:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,268 @@
+"""
+Time the hot paths on synthetic league data and save the results as JSON.
+
+    python -m benchmarks.bench_hot_paths [--repeat 20] [--competitions 20]
+                                         [--seasons 2] [--squad-size 30]
+                                         [--only cache] [--compare old.json]
+
+Covers the api_client row normalization, cache_get/cache_set, search_teams,
+the model constructors and the DataFrame building of the league pages.
+Data comes from mock_loader and lives in a temporary cache database, so
+no network and no data/cache is touched.
+
+Results go to benchmarks/results/<commit>.json. They are compared with
+--compare, or else with the newest other result file, and a benchmark whose
+median got more than --threshold percent slower is reported as a regression
+(exit code 1).
+"""
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from src.components import league_frames, player_search, search
+from src.data_collection import api_client
+from src.data_collection.mock_loader import MockLeagueData, write_to_cache
+from src.models.match import Match
+from src.models.player import Player
+from src.models.team import Team
+from src.utils import cache
+from src.utils.cache_backends import SqliteBackend
+
+RESULTS_DIR = Path("benchmarks/results")
+
+# (namn, funktion, antal rader per anrop)
+Bench = Tuple[str, Callable[[], Any], int]
+
+
+def _benches(data: MockLeagueData) -> Dict[str, List[Bench]]:
+    codes = list(data.competitions)
+    team_ids = list(data.teams)
+    big_team = team_ids[0]
+
+    raw_standings = [data.standings(code) for code in codes]
+    raw_teams = [data.team(team_id) for team_id in team_ids]
+    raw_team_matches = data.team_matches(big_team)
+    raw_all_matches = [data.competition_matches(code, season=season) for code in codes for season in data.seasons]
+
+    standings = [api_client._normalize_standings(p, code) for p, code in zip(raw_standings, codes)]
+    squads = [api_client._normalize_squad(p) for p in raw_teams]
+    team_matches = api_client._normalize_team_matches(raw_team_matches, None)
+    all_matches = [row for p in raw_all_matches for row in api_client._normalize_team_matches(p, None)]
+    scorers = api_client._normalize_top_scorers(data.scorers("PD", limit=20), "PD")
+    crest_by_team = league_frames.crest_lookup(standings[0])
+    now = pd.Timestamp.now(tz="UTC")
+
+    standings_rows = sum(len(s) for s in standings)
+    squad_rows = sum(len(s) for s in squads)
+
+    # Cache: poster i samma storlek som de riktiga, läst ur minnet, från disk och skrivna
+    squad_keys = [f"team_detail_{team_id}" for team_id in team_ids]
+    cache.cache_get_many(squad_keys, ttl_seconds=86400)
+
+    def cache_get_disk() -> None:
+        cache._memory.clear()
+        for key in squad_keys:
+            cache.cache_get(key, ttl_seconds=86400)
+
+    def cache_get_memory() -> None:
+        for key in squad_keys:
+            cache.cache_get(key, ttl_seconds=86400)
+
+    # Sökindexet byggs en gång per process; mät bara uppslagningarna
+    search.refresh_team_index(search.get_team_index(refresh=False))
+    # Ett index över alla genererade lag, för att se hur fuzzy-sökningen skalar
+    all_teams_index = search.TeamSearchIndex(
+        [{"code": code, "name": code, "flag": "", "page": ""} for code in codes]
+    )
+    for code in codes:
+        all_teams_index.update(code, api_client._normalize_teams(data.competition_teams_payload(code)))
+    fuzzy_name = search.normalize_text(data.teams[team_ids[-1]]["name"])
+    fuzzy_typo = fuzzy_name[:3] + fuzzy_name[4] + fuzzy_name[3] + fuzzy_name[5:]
+    players_index = player_search.PlayerSearchIndex()
+    players_index.sync(cache.get_backend())
+    player_name = squads[-1][0]["name"]
+
+    def cache_set_rows() -> None:
+        for i, squad in enumerate(squads):
+            cache.cache_set(f"bench_squad_{i}", squad, ttl_seconds=3600)
+
+    return {
+        "normalize": [
+            ("normalize.standings", lambda: [api_client._normalize_standings(p, c) for p, c in zip(raw_standings, codes)], standings_rows),
+            ("normalize.team_matches", lambda: [api_client._normalize_team_matches(p, None) for p in raw_all_matches], len(all_matches)),
+            ("normalize.squad", lambda: [api_client._normalize_squad(p) for p in raw_teams], squad_rows),
+        ],
+        "cache": [
+            ("cache.get_memory", cache_get_memory, len(squad_keys)),
+            ("cache.get_disk", cache_get_disk, len(squad_keys)),
+            ("cache.set", cache_set_rows, len(squads)),
+        ],
+        "search": [
+            ("search.teams_hit", lambda: search.search_teams("real"), 1),
+            ("search.teams_miss", lambda: search.search_teams("zzzz"), 1),
+            ("search.fuzzy_all_teams", lambda: all_teams_index.search(fuzzy_typo, limit=5), 1),
+            ("search.prefix_all_teams", lambda: all_teams_index.search(fuzzy_name[:4], limit=5), 1),
+            ("search.players_prefix", lambda: players_index.search(player_name[:4], limit=5), 1),
+            ("search.players_fuzzy", lambda: players_index.search(player_name[1:], limit=5), 1),
+            # Utan sparade frågor, som första gången en fråga ställs
+            ("search.fuzzy_all_teams_cold", lambda: (all_teams_index.memo.clear(), all_teams_index.search(fuzzy_typo, limit=5)), 1),
+            ("search.players_fuzzy_cold", lambda: (players_index.memo.clear(), players_index.search(player_name[1:], limit=5)), 1),
+        ],
+        "models": [
+            ("models.team_from_standings", lambda: [Team.from_api_standings(r) for s in standings for r in s], standings_rows),
+            ("models.match_from_api", lambda: [Match.from_api_match(m) for m in all_matches], len(all_matches)),
+            ("models.player_from_squad", lambda: [Player.from_api_squad(p) for s in squads for p in s], squad_rows),
+        ],
+        "pages": [
+            # Bygget utan minnet, som när en ny payload kommer in
+            ("pages.standings_frame", lambda: league_frames.standings_frame.__wrapped__(standings[0]), len(standings[0])),
+            ("pages.matches_frame", lambda: league_frames._matches_frame.__wrapped__(team_matches, now), len(team_matches)),
+            ("pages.squad_frame", lambda: league_frames.squad_frame.__wrapped__(squads[0]), len(squads[0])),
+            ("pages.scorers_frame", lambda: league_frames.scorers_frame.__wrapped__(scorers, crest_by_team), len(scorers)),
+            # En omkörning med oförändrad data
+            ("pages.standings_frame_memo", lambda: league_frames.standings_frame(standings[0]), len(standings[0])),
+            ("pages.squad_frame_memo", lambda: league_frames.squad_frame(squads[0]), len(squads[0])),
+        ],
+    }
+
+
+def _measure(fn: Callable[[], Any], repeat: int, warmup: int = 2) -> List[float]:
+    for _ in range(warmup):
+        fn()
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return timings
+
+
+def _commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True)
+        return out.stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run(data: MockLeagueData, repeat: int, only: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for group, benches in _benches(data).items():
+        if only and group not in only:
+            continue
+        for name, fn, items in benches:
+            timings = _measure(fn, repeat)
+            median = statistics.median(timings)
+            results[name] = {
+                "median_ms": median * 1e3,
+                "min_ms": min(timings) * 1e3,
+                "mean_ms": statistics.fmean(timings) * 1e3,
+                "stdev_ms": (statistics.stdev(timings) if len(timings) > 1 else 0.0) * 1e3,
+                "rounds": repeat,
+                "items": items,
+                "us_per_item": median * 1e6 / items if items else None,
+            }
+    return results
+
+
+def _previous_results(current: Path) -> Optional[Path]:
+    candidates = [p for p in RESULTS_DIR.glob("*.json") if p.resolve() != current.resolve()]
+    return max(candidates, key=lambda p: p.stat().st_mtime) if candidates else None
+
+
+def compare(old: Dict[str, Any], new: Dict[str, Any], threshold: float) -> List[str]:
+    """Names of benchmarks whose median got more than `threshold` percent slower."""
+    regressions = []
+    print(f"\n{'benchmark':<30} {'before ms':>10} {'after ms':>10} {'change':>8}")
+    for name, result in new["results"].items():
+        before = old["results"].get(name)
+        if before is None:
+            continue
+        change = (result["median_ms"] / before["median_ms"] - 1) * 100 if before["median_ms"] else 0.0
+        flag = ""
+        if change > threshold:
+            regressions.append(name)
+            flag = "  REGRESSION"
+        print(f"{name:<30} {before['median_ms']:>10.3f} {result['median_ms']:>10.3f} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark FootballStatsHub hot paths")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--competitions", type=int, default=20)
+    parser.add_argument("--seasons", type=int, default=2)
+    parser.add_argument("--squad-size", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--only", nargs="+", choices=["normalize", "cache", "search", "models", "pages"])
+    parser.add_argument("--output", type=Path, default=None, help="Default: benchmarks/results/<commit>.json")
+    parser.add_argument("--compare", type=Path, default=None, help="Earlier result file to compare with")
+    parser.add_argument("--threshold", type=float, default=15.0, help="Percent slower that counts as a regression")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        backend = SqliteBackend(Path(tmp) / "bench.sqlite3")
+        cache.set_backend(backend)
+        data = MockLeagueData.generate(
+            competitions=args.competitions,
+            seasons=args.seasons,
+            squad_size=args.squad_size,
+            seed=args.seed,
+        )
+        write_to_cache(data)
+        print(
+            f"Data: {len(data.competitions)} competitions, {len(data.teams)} teams, "
+            f"{data.match_count()} matches, repeat={args.repeat}\n"
+        )
+        try:
+            results = run(data, args.repeat, args.only)
+        finally:
+            backend.close()
+
+    print(f"{'benchmark':<30} {'median ms':>10} {'min ms':>10} {'items':>7} {'µs/item':>9}")
+    for name, r in results.items():
+        per_item = f"{r['us_per_item']:>9.2f}" if r["us_per_item"] is not None else f"{'-':>9}"
+        print(f"{name:<30} {r['median_ms']:>10.3f} {r['min_ms']:>10.3f} {r['items']:>7} {per_item}")
+
+    commit = _commit()
+    report = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "params": {
+            "repeat": args.repeat,
+            "competitions": args.competitions,
+            "seasons": args.seasons,
+            "squad_size": args.squad_size,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+    output = args.output or RESULTS_DIR / f"{commit}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\nSaved {output}")
+
+    baseline = args.compare or _previous_results(output)
+    if baseline is None:
+        return
+    old = json.loads(baseline.read_text(encoding="utf-8"))
+    if old.get("params") != report["params"]:
+        print(f"Note: {baseline} was run with other parameters: {old.get('params')}")
+    print(f"Compared with {baseline} (commit {old.get('commit')})")
+    if compare(old, report, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Purge expired cache entries and evict down to the configured caps.
+
+    python -m scripts.compact_cache [--max-bytes N] [--max-entries N] [--policy lru|lfu] [--vacuum]
+                                    [--migrate-format] [--import-json]
+
+Safe to run while the Streamlit app is serving traffic.
+
+The SQLite cache imports data/cache/*.json (the older cache format) once,
+when its database is first created; --import-json repeats that import.
+"""
+import argparse
+
+from src.utils.cache import (
+    CACHE_EVICTION,
+    CACHE_MAX_BYTES,
+    CACHE_MAX_ENTRIES,
+    compact,
+    get_backend,
+    import_json_cache,
+)
+from src.utils.cache_backends import SqliteBackend, migrate_serialization
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compact the FootballStatsHub cache")
+    parser.add_argument("--max-bytes", type=int, default=CACHE_MAX_BYTES)
+    parser.add_argument("--max-entries", type=int, default=CACHE_MAX_ENTRIES)
+    parser.add_argument("--policy", choices=["lru", "lfu"], default=CACHE_EVICTION)
+    parser.add_argument("--vacuum", action="store_true", help="Return freed SQLite pages to the filesystem")
+    parser.add_argument("--migrate-format", action="store_true", help="Rewrite entries stored in an older format")
+    parser.add_argument("--import-json", action="store_true", help="Import data/cache/*.json entries missing from SQLite")
+    args = parser.parse_args()
+
+    if args.import_json:
+        backend = get_backend()
+        if isinstance(backend, SqliteBackend):
+            print(f"Imported {import_json_cache(backend)} entries from the JSON cache")
+
+    if args.migrate_format:
+        backend = get_backend()
+        if isinstance(backend, SqliteBackend):
+            print(f"Migrated {migrate_serialization(backend)} entries to the current format")
+
+    report = compact(
+        max_bytes=args.max_bytes,
+        max_entries=args.max_entries,
+        policy=args.policy,
+        vacuum=args.vacuum,
+    )
+    print(
+        f"Removed {report['removed']} entries "
+        f"({report['expired']} expired, {report['evicted']} evicted), "
+        f"reclaimed {report['reclaimed_bytes'] / 1024:.1f} KiB. "
+        f"Cache now holds {report['entries']} entries, {report['bytes'] / 1024:.1f} KiB."
+    )
+
+
+if __name__ == "__main__":
+    main()
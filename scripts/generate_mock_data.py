@@ -0,0 +1,54 @@
+"""
+Fill a cache database with seeded synthetic league data.
+
+    python -m scripts.generate_mock_data [--competitions 40] [--seasons 3]
+                                         [--teams 20] [--squad-size 30]
+                                         [--seed 0] [--cache-path bench.sqlite3]
+
+Entries use the same keys and row shapes as api_client, so the app,
+search and benchmarks read them as if they had been fetched. Without
+--cache-path the app's own cache (data/cache) is filled.
+"""
+import argparse
+import time
+from pathlib import Path
+
+from src.data_collection.mock_loader import DEFAULT_SQUAD_SIZE, MockLeagueData, write_to_cache
+from src.utils import cache
+from src.utils.cache_backends import SqliteBackend
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write synthetic league data into the cache")
+    parser.add_argument("--competitions", type=int, default=3, help="Synthetic leagues are added after PD/PL/SA")
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=20, help="Teams per synthetic league")
+    parser.add_argument("--squad-size", type=int, default=DEFAULT_SQUAD_SIZE)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--cache-path", type=Path, default=None, help="Separate SQLite file to fill")
+    args = parser.parse_args()
+
+    if args.cache_path is not None:
+        cache.set_backend(SqliteBackend(args.cache_path))
+
+    started = time.perf_counter()
+    data = MockLeagueData.generate(
+        competitions=args.competitions,
+        seasons=args.seasons,
+        teams_per_competition=args.teams,
+        squad_size=args.squad_size,
+        seed=args.seed,
+    )
+    generated = time.perf_counter() - started
+    players = sum(len(squad) for squad in data.squads.values())
+    print(
+        f"Generated {len(data.competitions)} competitions, {len(data.teams)} teams, "
+        f"{players} players, {data.match_count()} matches in {generated:.1f}s"
+    )
+
+    written = write_to_cache(data)
+    print(f"Wrote {written} cache entries in {time.perf_counter() - started - generated:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
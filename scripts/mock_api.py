@@ -0,0 +1,68 @@
+"""
+Run the local football-data.org stand-in.
+
+    python -m scripts.mock_api [--port 8090] [--latency 0.05] [--jitter 0.1]
+                               [--error-rate 0.01] [--rate-limit-rate 0.02]
+                               [--quota 10] [--seed 0]
+                               [--competitions 40 --seasons 3 --squad-size 30]
+
+Then point the app (or a benchmark) at it:
+
+    FSH_API_BASE_URL=http://127.0.0.1:8090/v4 FOOTBALL_DATA_TOKEN=mock streamlit run app.py
+"""
+import argparse
+
+from src.data_collection.mock_loader import DEFAULT_SQUAD_SIZE, MockLeagueData
+from src.data_collection.mock_server import MockApiServer
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve mock football-data.org /v4 data")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every answer")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random 0..N seconds per answer")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of answers that are 503")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of answers that are 429")
+    parser.add_argument("--quota", type=int, default=None, help="Requests per minute before answering 429")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--competitions", type=int, default=3, help="Synthetic leagues are added after PD/PL/SA")
+    parser.add_argument("--seasons", type=int, default=1)
+    parser.add_argument("--teams", type=int, default=20, help="Teams per synthetic league")
+    parser.add_argument("--squad-size", type=int, default=DEFAULT_SQUAD_SIZE)
+    args = parser.parse_args()
+
+    data = MockLeagueData.generate(
+        competitions=args.competitions,
+        seasons=args.seasons,
+        teams_per_competition=args.teams,
+        squad_size=args.squad_size,
+        seed=args.seed,
+    )
+    server = MockApiServer(
+        data,
+        host=args.host,
+        port=args.port,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        quota_per_minute=args.quota,
+        seed=args.seed,
+    )
+    print(
+        f"Mock API on {server.base_url}: {len(data.competitions)} competitions, "
+        f"{len(data.teams)} teams, {data.match_count()} matches"
+    )
+    print(f"  export FSH_API_BASE_URL={server.base_url} FOOTBALL_DATA_TOKEN=mock")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for endpoint, counts in sorted(server.stats().items()):
+            print(f"{endpoint:<32} " + " ".join(f"{status}:{n}" for status, n in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main()
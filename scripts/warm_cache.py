@@ -0,0 +1,198 @@
+"""
+Prefetch every supported competition into the cache before traffic arrives.
+
+    python -m scripts.warm_cache [--workers 4] [--competitions PD PL] [--fresh]
+
+Runs at background priority, so the shared rate limiter paces it and any
+live page render goes first. Progress is saved after every fetch: rerun
+the command after an interruption and finished work is skipped. Use
+--fresh to start over.
+"""
+import argparse
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src.data_collection.api_client import (
+    SUPPORTED_COMPETITIONS,
+    ApiClientError,
+    get_standings,
+    get_team,
+    get_team_matches,
+    get_teams,
+    get_top_scorers,
+)
+from src.data_collection.rate_limit import PRIORITY_BACKGROUND, request_priority
+
+STATE_FILE = Path("data/cache/warmup_state.json")
+
+# Samma fönster som lagsidorna använder, så att det är exakt de nycklarna som värms
+MATCH_WINDOW_DAYS = 120
+MATCH_LIMIT = 60
+
+Task = Tuple[str, str, Callable[[], Any]]
+
+
+def _load_state(fresh: bool) -> Dict[str, Any]:
+    today = datetime.now(timezone.utc).date().isoformat()
+    if not fresh and STATE_FILE.exists():
+        try:
+            state = json.loads(STATE_FILE.read_text(encoding="utf-8"))
+            # Matchfönstret flyttas varje dag, så gårdagens progress gäller inte
+            if state.get("date") == today:
+                return state
+        except ValueError:
+            pass
+    return {"date": today, "done": []}
+
+
+def _save_state(state: Dict[str, Any]) -> None:
+    STATE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    tmp = STATE_FILE.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state), encoding="utf-8")
+    tmp.replace(STATE_FILE)
+
+
+def _competition_tasks(code: str) -> List[Task]:
+    return [
+        (f"standings:{code}", "standings", lambda: get_standings(code)),
+        (f"teams:{code}", "teams", lambda: get_teams(code)),
+        (f"top_scorers:{code}", "top_scorers", lambda: get_top_scorers(code)),
+    ]
+
+
+def _team_tasks(team_id: int) -> List[Task]:
+    today = datetime.now(timezone.utc).date()
+    date_from = (today - timedelta(days=MATCH_WINDOW_DAYS)).isoformat()
+    date_to = (today + timedelta(days=MATCH_WINDOW_DAYS)).isoformat()
+    return [
+        # get_team och get_squad delar cachepost, så en hämtning värmer båda
+        (f"team:{team_id}", "team", lambda: get_team(team_id)),
+        (
+            f"team_matches:{team_id}",
+            "team_matches",
+            lambda: get_team_matches(team_id, dateFrom=date_from, dateTo=date_to, limit=MATCH_LIMIT),
+        ),
+    ]
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+class WarmupRun:
+    def __init__(self, state: Dict[str, Any], workers: int):
+        self.state = state
+        self.done = set(state["done"])
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup")
+        self.lock = Lock()
+        self.latencies: Dict[str, List[float]] = {}
+        self.errors: Dict[str, int] = {}
+        self.completed = 0
+        self.submitted = 0
+
+    def _run(self, task: Task) -> Any:
+        task_id, endpoint, fn = task
+        start = time.perf_counter()
+        with request_priority(PRIORITY_BACKGROUND):
+            result = fn()
+        elapsed = time.perf_counter() - start
+        with self.lock:
+            self.latencies.setdefault(endpoint, []).append(elapsed)
+            self.done.add(task_id)
+            self.state["done"] = sorted(self.done)
+            _save_state(self.state)
+        return result
+
+    def submit(self, tasks: List[Task]) -> Dict[Any, Task]:
+        futures = {}
+        for task in tasks:
+            if task[0] in self.done:
+                continue
+            futures[self.pool.submit(self._run, task)] = task
+            self.submitted += 1
+        return futures
+
+    def report(self, task: Task, error: Optional[Exception] = None) -> None:
+        with self.lock:
+            self.completed += 1
+            if error is not None:
+                self.errors[task[1]] = self.errors.get(task[1], 0) + 1
+            status = f"FAILED: {error}" if error is not None else "ok"
+            print(f"[{self.completed}/{self.submitted}] {task[0]} {status}", flush=True)
+
+
+def warm(competitions: List[str], workers: int, fresh: bool) -> WarmupRun:
+    run = WarmupRun(_load_state(fresh), workers)
+    skipped = len(run.done)
+    if skipped:
+        print(f"Resuming: {skipped} fetches already done today")
+
+    futures: Dict[Any, Task] = {}
+    for code in competitions:
+        futures.update(run.submit(_competition_tasks(code)))
+
+    # Lagen behövs för att veta vilka lag som ska värmas; de hämtas från cachen om de redan är klara
+    team_ids: List[int] = []
+    with request_priority(PRIORITY_BACKGROUND):
+        for code in competitions:
+            try:
+                team_ids.extend(t["team_id"] for t in get_teams(code) if t.get("team_id"))
+            except ApiClientError as e:
+                print(f"Could not list teams for {code}: {e}")
+    for team_id in team_ids:
+        futures.update(run.submit(_team_tasks(team_id)))
+
+    for future in as_completed(futures):
+        task = futures[future]
+        try:
+            future.result()
+            run.report(task)
+        except Exception as e:
+            run.report(task, e)
+
+    run.pool.shutdown()
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Warm the FootballStatsHub cache")
+    parser.add_argument("--competitions", nargs="+", default=list(SUPPORTED_COMPETITIONS))
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--fresh", action="store_true", help="Ignore saved progress and start over")
+    args = parser.parse_args()
+
+    unknown = [c for c in args.competitions if c not in SUPPORTED_COMPETITIONS]
+    if unknown:
+        raise SystemExit(f"Unknown competition(s): {', '.join(unknown)}")
+
+    started = time.perf_counter()
+    run = warm(args.competitions, args.workers, args.fresh)
+    total = time.perf_counter() - started
+
+    print(f"\nWarm-up finished in {total:.1f}s")
+    print(f"{'endpoint':<14} {'count':>6} {'p50 s':>8} {'p95 s':>8} {'max s':>8} {'errors':>7}")
+    for endpoint in sorted(set(run.latencies) | set(run.errors)):
+        values = run.latencies.get(endpoint, [])
+        if values:
+            print(
+                f"{endpoint:<14} {len(values):>6} {_percentile(values, 50):>8.3f} "
+                f"{_percentile(values, 95):>8.3f} {max(values):>8.3f} {run.errors.get(endpoint, 0):>7}"
+            )
+        else:
+            print(f"{endpoint:<14} {0:>6} {'-':>8} {'-':>8} {'-':>8} {run.errors.get(endpoint, 0):>7}")
+
+    if not run.errors:
+        STATE_FILE.unlink(missing_ok=True)
+    else:
+        print("Some fetches failed; rerun to retry only those.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,299 @@
+"""
+One league page for every competition in SUPPORTED_COMPETITIONS.
+
+Each file in pages/ only calls render_league_page(code). Data comes from
+the cached api_client, the tables from league_frames, so all leagues and
+sessions share the same cache, code and imports.
+"""
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List
+
+import streamlit as st
+from matplotlib.figure import Figure
+
+from src.components import league_frames
+from src.components.leagues import League, get_league
+from src.components.menubar import show_menubar
+from src.data_collection import async_client
+from src.data_collection.api_client import (
+    ApiClientError,
+    RateLimitedError,
+    estimate_wait,
+    get_standings,
+    get_teams,
+    get_top_scorers,
+)
+from src.data_collection.async_client import fetch_all
+from src.data_collection.rate_limit import request_max_wait
+from src.utils.metrics import PAGE_RENDER_SECONDS
+from src.utils.storage import load_favorites, save_favorites
+
+TABS = ["📊 Tabell", "🏟 Lag", "🥇 Toppskyttar"]
+NO_TEAM = "— välj —"
+
+# Matcher som visas runt dagens datum på Lag-fliken
+MATCH_WINDOW_DAYS = 120
+# Sekunder en sida väntar på rate-limitern; längre än så visas sparad data eller en väntetid
+PAGE_MAX_WAIT = float(os.getenv("FSH_PAGE_MAX_WAIT", "5"))
+
+
+def render_league_page(competition_code: str) -> None:
+    league = get_league(competition_code)
+    with request_max_wait(PAGE_MAX_WAIT):
+        _render_league_page(league)
+
+
+def _render_league_page(league: League) -> None:
+    # Page config
+    st.set_page_config(
+        page_title=f"{league.name} - FootballStatsHub",
+        layout="wide",
+        initial_sidebar_state="collapsed"
+    )
+    show_menubar(current_page=league.slug)
+    st.title(league.name)
+
+    # Session state
+    session_key = f"selected_team_id_{league.code}"
+    if session_key not in st.session_state:
+        st.session_state[session_key] = None
+    if "favorites" not in st.session_state:
+        st.session_state["favorites"] = load_favorites()
+
+    try:
+        standings = get_standings(league.code)
+    except ApiClientError as e:
+        _stop_with(e)
+
+    if not standings:
+        st.warning("Ingen tabell-data hittades.")
+        st.stop()
+
+    # Lag-fliken öppnas direkt när man kommer från sökningen eller favoriterna
+    open_team_tab_key = f"open_team_tab_{league.code}"
+    if st.session_state[session_key] and st.session_state.get(open_team_tab_key, False):
+        default_tab = 1
+        st.session_state[open_team_tab_key] = False
+    else:
+        default_tab = 0
+
+    tab_choice = st.radio(
+        "Välj vy:",
+        TABS,
+        horizontal=True,
+        label_visibility="collapsed",
+        key=f"tab_selector_{league.code}",
+        index=default_tab
+    )
+
+    wait = estimate_wait()
+    if wait > PAGE_MAX_WAIT:
+        st.caption(f"⏳ API-kvoten är slut för stunden: ny data kan hämtas om ~{wait:.0f} s.")
+
+    st.divider()
+
+    # Renderingstid per flik (st.stop() i en flik hoppar över mätningen)
+    render_started = time.perf_counter()
+    if tab_choice == TABS[0]:
+        _render_table(standings)
+    elif tab_choice == TABS[1]:
+        _render_team(league, session_key)
+    else:
+        _render_scorers(league, league_frames.crest_lookup(standings))
+    PAGE_RENDER_SECONDS.labels(league.slug, tab_choice.split(" ", 1)[-1]).observe(time.perf_counter() - render_started)
+
+
+def _stop_with(error: ApiClientError) -> None:
+    if isinstance(error, RateLimitedError):
+        # Ingen sparad data att visa: säg hur länge det dröjer i stället för att blockera sidan
+        st.warning(f"API-kvoten är slut för stunden, försök igen om ~{error.retry_after:.0f} s.")
+    else:
+        st.error(str(error))
+    st.stop()
+
+
+def _render_table(standings: List[Dict[str, Any]]) -> None:
+    left, right = st.columns([3, 1])  # 3:1 ratio för tabell vs graf
+
+    with left:
+        st.dataframe(
+            league_frames.standings_frame(standings),
+            width='content',
+            hide_index=True,
+            height='content',
+            column_config={
+                "Logo": st.column_config.ImageColumn("Logo", width="small"),
+                "#": st.column_config.NumberColumn("#", width=40),
+                "Lag": st.column_config.TextColumn("Lag", width=180),
+                "M": st.column_config.NumberColumn("M", width=40),
+                "V": st.column_config.NumberColumn("V", width=40),
+                "O": st.column_config.NumberColumn("O", width=40),
+                "F": st.column_config.NumberColumn("F", width=40),
+                "MS": st.column_config.NumberColumn("MS", width=50),
+                "P": st.column_config.NumberColumn("P", width=50),
+            }
+        )
+
+    with right:
+        percentage = league_frames.season_progress(standings)
+        # Figure i stället för pyplot: inga figurer blir kvar i pyplots globala register
+        fig = Figure(figsize=(4, 4))
+        ax = fig.subplots()
+        ax.pie([percentage, 100 - percentage], labels=["Spelade", "Kvar"],
+            autopct="%1.1f%%", startangle=90, colors=["#4CAF50", "#CCCCCC"])
+        ax.set_title("Säsong spelad")
+        st.pyplot(fig)
+
+
+def _render_team(league: League, session_key: str) -> None:
+    try:
+        teams = get_teams(league.code)
+    except ApiClientError as e:
+        _stop_with(e)
+
+    options = league_frames.team_options(teams)
+    team_names = sorted(options)
+    team_id = st.session_state[session_key]
+
+    default_index = 0
+    if team_id:
+        selected = next((name for name, tid in options.items() if tid == team_id), None)
+        if selected in team_names:
+            default_index = team_names.index(selected) + 1  # +1 för "— välj —"
+
+    selected_name = st.selectbox("Välj lag:", [NO_TEAM] + team_names, index=default_index)
+    if selected_name != NO_TEAM:
+        st.session_state[session_key] = options[selected_name]
+
+    team_id = st.session_state[session_key]
+    if not team_id:
+        st.info("Välj ett lag ovan för att se detaljer")
+        return
+
+    try:
+        today = datetime.now(timezone.utc).date()
+        # Laginfo, matcher och trupp är oberoende: hämta dem samtidigt
+        team_data = fetch_all({
+            "info": async_client.get_team(team_id),
+            "matches": async_client.get_team_matches(
+                team_id,
+                dateFrom=(today - timedelta(days=MATCH_WINDOW_DAYS)).isoformat(),
+                dateTo=(today + timedelta(days=MATCH_WINDOW_DAYS)).isoformat(),
+                limit=60
+            ),
+            "squad": async_client.get_squad(team_id),
+        })
+    except ApiClientError as e:
+        _stop_with(e)
+
+    left, right = st.columns([1, 2])
+    with left:
+        _render_team_info(league, team_id, team_data["info"])
+    with right:
+        _render_matches(team_data["matches"])
+    _render_squad(team_data["squad"])
+
+
+def _render_team_info(league: League, team_id: int, info: Dict[str, Any]) -> None:
+    st.markdown("### Laginfo")
+    crest = info.get("crest")
+    if crest:
+        st.image(crest, width=120)
+
+    # Lagets namn + hjärtknapp
+    col_name, col_heart = st.columns([4, 1])
+    with col_name:
+        st.write(f"**{info.get('name') or '—'}**")
+
+    favorites = st.session_state["favorites"]
+    is_favorite = any(f["team_id"] == team_id for f in favorites)
+    with col_heart:
+        clicked = st.button("❤️" if is_favorite else "🤍", key=f"fav_{team_id}")
+
+    if clicked:
+        if is_favorite:
+            favorites = [f for f in favorites if f["team_id"] != team_id]
+        else:
+            favorites.append({
+                "team_id": team_id,
+                "team_name": info.get("name"),
+                "crest": info.get("crest"),
+                "league_code": league.code,
+                "page": league.page
+            })
+        st.session_state["favorites"] = favorites
+        save_favorites(favorites)
+        st.rerun()
+
+    if info.get("venue"):
+        st.write(f"📍 Arena: {info['venue']}")
+    if info.get("founded"):
+        st.write(f"📅 Grundat: {info['founded']}")
+    if info.get("website"):
+        st.write(f"🔗 {info['website']}")
+
+
+def _render_matches(matches: List[Dict[str, Any]]) -> None:
+    st.markdown("### Senaste / kommande 5 matcher")
+    view = league_frames.matches_frame(matches)
+    if view.empty:
+        st.info("Inga matcher hittades")
+        return
+    st.dataframe(view, width='stretch', hide_index=True)
+    st.caption("Visar senaste 5 matcher + nästa 5 matcher.")
+
+
+def _render_squad(squad: List[Dict[str, Any]]) -> None:
+    st.markdown("### Trupp")
+    if not squad:
+        st.info("Ingen trupp-data hittades")
+        return
+    view = league_frames.squad_frame(squad)
+    if view.empty:
+        st.info("Ingen spelardata hittades i truppen.")
+        return
+    st.dataframe(
+        view,
+        use_container_width=True,
+        hide_index=True,
+        height=1000
+    )
+    st.caption("Truppen sorteras per position: målvakt → försvar → mittfält → anfall.")
+
+
+def _render_scorers(league: League, crest_by_team: Dict[str, str]) -> None:
+    st.markdown("### Toppskyttar")
+    try:
+        scorers = get_top_scorers(league.code)
+    except ApiClientError as e:
+        _stop_with(e)
+
+    if not scorers:
+        st.info("Inga toppskyttar hittades")
+        return
+
+    sdf = league_frames.scorers_frame(scorers, crest_by_team)
+    columns = ["Logo", "Spelare", "Lag", "Mål", "Assist", "Matcher"]
+    try:
+        st.dataframe(
+            sdf[columns],
+            width='content',
+            hide_index=True,
+            height=1000,
+            column_config={
+                "Logo": st.column_config.ImageColumn("Logo", width="small")
+            }
+        )
+    except Exception:
+        st.dataframe(sdf[columns], width='stretch', hide_index=True)
+
+    top10 = league_frames.goals_per_match(sdf)
+    fig = Figure(figsize=(10, 5))
+    ax = fig.subplots()
+    ax.barh(top10["Spelare"], top10["Mål per match"])
+    ax.set_xlabel("Mål per match")
+    ax.set_title("Topp 10 mål per match")
+    st.pyplot(fig)
+
@@ -0,0 +1,59 @@
+"""
+The leagues the app has pages for, derived from SUPPORTED_COMPETITIONS.
+
+A new competition needs its code in SUPPORTED_COMPETITIONS, an entry in
+_PAGES and a two-line file in pages/ that calls render_league_page(code);
+slug and team snapshot name follow from the competition name.
+"""
+from dataclasses import dataclass
+from typing import Dict
+
+from src.data_collection.api_client import SUPPORTED_COMPETITIONS
+
+# Sidfil per liga; uttryckligen, eftersom numren i pages/ också används av andra sidor
+_PAGES = {
+    "PD": "pages/1_La_Liga.py",
+    "PL": "pages/2_Premier_League.py",
+    "SA": "pages/3_Serie_A.py",
+}
+
+# Flaggor för ligor vi känner till; övriga får en fotboll
+_FLAGS = {"PD": "🇪🇸", "PL": "🏴󠁧󠁢󠁥󠁮󠁧󠁿", "SA": "🇮🇹"}
+
+
+@dataclass(frozen=True)
+class League:
+    code: str
+    name: str
+    slug: str   # "la_liga": menyns current_page, metrics-etikett och data/lookup-namn
+    page: str   # "pages/1_La_Liga.py"
+    flag: str = "⚽"
+
+    @property
+    def lookup(self) -> str:
+        return f"{self.slug}_teams.json"
+
+
+def _league(code: str, name: str) -> League:
+    return League(
+        code=code,
+        name=name,
+        slug=name.lower().replace(" ", "_"),
+        page=_PAGES[code],
+        flag=_FLAGS.get(code, "⚽"),
+    )
+
+
+# Ligor utan sidfil visas inte i appen
+LEAGUES: Dict[str, League] = {
+    code: _league(code, name)
+    for code, name in SUPPORTED_COMPETITIONS.items()
+    if code in _PAGES
+}
+
+
+def get_league(code: str) -> League:
+    try:
+        return LEAGUES[code]
+    except KeyError:
+        raise ValueError(f"Unsupported competition {code!r}") from None
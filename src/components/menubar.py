@@ -1,11 +1,16 @@
 import streamlit as st
+from src.components.leagues import LEAGUES
+from src.components.player_search import search_players
 from src.components.search import search_teams
+from src.utils.metrics import start_exporters
 
 def show_menubar(current_page: str = None):
     """
     Fixed horizontal menu bar at top of page
     
     """
+    # Alla sidor går igenom menyn; startas bara första gången i processen
+    start_exporters()
     
     # CSS för fast navbar
     st.markdown("""
@@ -78,8 +83,9 @@ def show_menubar(current_page: str = None):
             del st.session_state['navbar_search']
         st.session_state['clear_navbar_search'] = False
 
-    # Skapa kolumner
-    col_logo, col1, col2, col3, col4, col_search = st.columns([3, 2, 2, 2, 2, 3])
+    # Skapa kolumner: logga, en knapp per liga, favoriter, sök
+    nav_cols = st.columns([3] + [2] * (len(LEAGUES) + 1) + [3])
+    col_logo, col_fav, col_search = nav_cols[0], nav_cols[-2], nav_cols[-1]
     
     # FootballstatsHub logo
     with col_logo:
@@ -87,34 +93,17 @@ def show_menubar(current_page: str = None):
             st.switch_page("app.py")
     
     # Navigation buttons
-    with col1:
-        if st.button(
-            "La Liga",
-            width='stretch',
-            type="primary" if current_page == "la_liga" else "secondary",
-            key="nav_laliga"
-        ):
-            st.switch_page("pages/1_La_Liga.py")  
-    
-    with col2:
-        if st.button(
-            "Premier League",
-            width='stretch',
-            type="primary" if current_page == "premier_league" else "secondary",
-            key="nav_premier"
-        ):
-            st.switch_page("pages/2_Premier_League.py")  
+    for col, league in zip(nav_cols[1:], LEAGUES.values()):
+        with col:
+            if st.button(
+                league.name,
+                width='stretch',
+                type="primary" if current_page == league.slug else "secondary",
+                key=f"nav_{league.slug}"
+            ):
+                st.switch_page(league.page)
     
-    with col3:
-        if st.button(
-            "Serie A",
-            width='stretch',
-            type="primary" if current_page == "serie_a" else "secondary",
-            key="nav_seria"
-        ):
-            st.switch_page("pages/3_Serie_A.py")  
-    
-    with col4:
+    with col_fav:
         if st.button(
             "Favorites",
             width='stretch',
@@ -126,11 +115,11 @@ def show_menubar(current_page: str = None):
     # Search field
     with col_search:
         search_input = st.text_input(
-            "Sök lag...",
+            "Sök lag eller spelare...",
             placeholder="Search...",
             label_visibility="collapsed",
             key="navbar_search",
-            help="Sök efter lag"
+            help="Sök efter lag eller spelare"
         )
 
     st.markdown('</div>', unsafe_allow_html=True)
@@ -138,12 +127,13 @@ def show_menubar(current_page: str = None):
 
     # If user typed something (at least 2 chars), show dropdown
     if search_input and len(search_input) >= 2:
-        results = search_teams(search_input)
+        # Max 5 results each to keep it clean, best match first
+        results = search_teams(search_input, limit=5)
+        players = search_players(search_input, limit=5)
         
-        if results:
+        if results or players:
             st.markdown(f"Toppresultat för {search_input}: ")
-            # Show max 5 results to keep it clean
-            for team in results[:5]:
+            for team in results:
                 # Create clickable team card
                 col_flag, col_name, col_league = st.columns([2, 8, 4], width=450)
                 
@@ -162,23 +152,48 @@ def show_menubar(current_page: str = None):
                         width='content',
                         help=f"Gå till {team['team_name']}"
                     ):
-                        # Set session state for target league
-                        session_key = f"selected_team_id_{team['league_code']}"
-                        st.session_state[session_key] = team['team_id']
-
-                        st.session_state[f"open_team_tab_{team['league_code']}"] = True
-
-                        st.session_state['clear_navbar_search'] = True
-                        
-                        # Navigate to league page
-                        st.switch_page(team['page'])
+                        _open_team(team)
                 
                 with col_league:
                     st.caption(f"{team['league']}")
+
+            for i, player in enumerate(players):
+                # Spelarkort: knappen leder till spelarens lag
+                col_flag, col_name, col_team = st.columns([2, 8, 4], width=450)
+
+                with col_flag:
+                    st.markdown(f"## {player['league_flag'] or '⚽'}")
+
+                with col_name:
+                    if st.button(
+                        player['player_name'],
+                        key=f"search_player_{player['team_id']}_{i}",
+                        width='content',
+                        disabled=player['page'] is None,
+                        help=f"Gå till {player['team_name']}"
+                    ):
+                        _open_team(player)
+
+                with col_team:
+                    st.caption(player['team_name'] or "")
             
             st.divider()
         
         else:
-            st.warning(f"Inga lag hittades för '{search_input}'")
-            st.info("Prova att söka på en del av lagnamnet")
-            st.divider()
\ No newline at end of file
+            st.warning(f"Inga lag eller spelare hittades för '{search_input}'")
+            st.info("Prova att söka på en del av lag- eller spelarnamnet")
+            st.divider()
+
+
+def _open_team(result: dict):
+    """Open the team tab of the result's league page"""
+    # Set session state for target league
+    session_key = f"selected_team_id_{result['league_code']}"
+    st.session_state[session_key] = result['team_id']
+
+    st.session_state[f"open_team_tab_{result['league_code']}"] = True
+
+    st.session_state['clear_navbar_search'] = True
+    
+    # Navigate to league page
+    st.switch_page(result['page'])
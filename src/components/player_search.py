@@ -0,0 +1,318 @@
+"""
+For searching any player in the cached squads and top scorer lists
+
+Like the team search, queries only touch an in-memory index. A background
+refresh every FSH_PLAYER_INDEX_REFRESH seconds reads the cache (never the
+API): entries whose timestamp moved are re-read, and only those whose
+content changed are re-indexed.
+
+The index holds at most FSH_PLAYER_INDEX_MAX players; past that the
+oldest cached squads are left out until they are fetched again.
+"""
+import os
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from src.components.search import (
+    COMPETITIONS,
+    MIN_SIMILARITY,
+    QueryMemo,
+    get_team_index,
+    match_tier,
+    normalize_text,
+    trigrams,
+)
+from src.utils.cache import content_hash, get_backend, schedule_revalidate
+from src.utils.cache_backends import CacheBackend
+from src.utils.logger import get_logger
+from src.utils.metrics import PLAYER_SEARCH_SECONDS
+
+_log = get_logger("player_search")
+
+PLAYER_INDEX_REFRESH = int(os.getenv("FSH_PLAYER_INDEX_REFRESH", "60"))
+PLAYER_INDEX_MAX = int(os.getenv("FSH_PLAYER_INDEX_MAX", "100000"))
+
+SQUAD_PREFIX = "team_detail_"
+SCORERS_PREFIX = "top_scorers_"
+# Poster som läses ur cachen per get_many-anrop
+LOAD_BATCH = 200
+
+_COMPETITIONS_BY_CODE = {comp["code"]: comp for comp in COMPETITIONS}
+
+
+class _Player:
+    __slots__ = ("name", "fold", "player_id", "position", "goals", "team_id", "team_name", "competition_code")
+
+    def __init__(
+        self,
+        name: str,
+        player_id: Any,
+        position: Optional[str],
+        goals: Optional[int],
+        team_id: Any,
+        team_name: Optional[str],
+        competition_code: Optional[str],
+    ):
+        self.name = name
+        self.fold = normalize_text(name)
+        self.player_id = player_id
+        self.position = position
+        self.goals = goals
+        self.team_id = team_id
+        self.team_name = team_name
+        self.competition_code = competition_code
+
+
+def _players_from(key: str, data: Any) -> List[_Player]:
+    """Index rows for one cache entry: a team_detail_<id> or top_scorers_<code>."""
+    if key.startswith(SQUAD_PREFIX):
+        team = (data or {}).get("team") or {}
+        return [
+            _Player(p["name"], p.get("player_id"), p.get("position"), None, team.get("team_id"), team.get("name"), None)
+            for p in (data or {}).get("squad") or []
+            if p.get("name")
+        ]
+    code = key[len(SCORERS_PREFIX):]
+    return [
+        _Player(r["player_name"], None, None, r.get("goals"), r.get("team_id"), r.get("team_name"), code)
+        for r in data or []
+        if r.get("player_name")
+    ]
+
+
+class PlayerSearchIndex:
+    """Trigram index over player names, updated one cache entry at a time."""
+
+    def __init__(self, max_players: int = PLAYER_INDEX_MAX):
+        self.max_players = max_players
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+        self._players: Dict[int, _Player] = {}
+        self._postings: Dict[str, Set[int]] = {}
+        self._next_id = 0
+        # Ökar vid varje ändring; sparade frågor från en äldre generation gäller inte längre
+        self._generation = 0
+        self.memo = QueryMemo(name="players")
+        # Cachenyckel -> (ts, content_hash, spelar-id:n) för det som är indexerat
+        self._sources: Dict[str, Tuple[float, str, List[int]]] = {}
+        # ts per cachenyckel som lästs, även de som hölls utanför för minnets skull
+        self._seen: Dict[str, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._players)
+
+    def sources(self) -> List[str]:
+        return sorted(self._sources)
+
+    def update(self, key: str, data: Any, ts: float, fingerprint: Optional[str] = None) -> bool:
+        """Index one cache entry; False if its content is what is already indexed."""
+        fingerprint = fingerprint or content_hash(data)
+        self._seen[key] = ts
+        previous = self._sources.get(key)
+        if previous is not None and previous[1] == fingerprint:
+            self._sources[key] = (ts, fingerprint, previous[2])
+            return False
+
+        players = _players_from(key, data)
+        with self._lock:
+            if previous is not None:
+                self._remove_ids(previous[2])
+            ids = []
+            for player in players:
+                pid = self._next_id
+                self._next_id += 1
+                self._players[pid] = player
+                for gram in trigrams(player.fold):
+                    self._postings.setdefault(gram, set()).add(pid)
+                ids.append(pid)
+            self._sources[key] = (ts, fingerprint, ids)
+            self._generation += 1
+        return True
+
+    def remove(self, key: str) -> None:
+        self._seen.pop(key, None)
+        source = self._sources.pop(key, None)
+        if source is not None:
+            with self._lock:
+                self._remove_ids(source[2])
+                self._generation += 1
+
+    def _remove_ids(self, ids: List[int]) -> None:
+        for pid in ids:
+            player = self._players.pop(pid)
+            for gram in trigrams(player.fold):
+                posting = self._postings.get(gram)
+                if posting is not None:
+                    posting.discard(pid)
+                    if not posting:
+                        del self._postings[gram]
+
+    def _enforce_budget(self) -> int:
+        """Drop the oldest entries until the index fits in max_players."""
+        dropped = 0
+        if len(self._players) <= self.max_players:
+            return dropped
+        for key, _ in sorted(self._sources.items(), key=lambda item: item[1][0]):
+            if len(self._players) <= self.max_players:
+                break
+            ts = self._seen[key]
+            self.remove(key)
+            # Kom ihåg ts, så att posten inte läses in igen förrän den hämtats på nytt
+            self._seen[key] = ts
+            dropped += 1
+        return dropped
+
+    def sync(self, backend: CacheBackend) -> int:
+        """Bring the index in line with the cache; returns how many entries were re-indexed."""
+        infos = {
+            info.key: info for info in backend.entries()
+            if info.key.startswith((SQUAD_PREFIX, SCORERS_PREFIX))
+        }
+        for key in list(self._seen):
+            if key not in infos:
+                self.remove(key)
+
+        # Nyast först, så att det är de äldsta som hamnar utanför om minnet inte räcker
+        changed = sorted(
+            (info for key, info in infos.items() if self._seen.get(key) != info.ts),
+            key=lambda info: info.ts,
+            reverse=True,
+        )
+        updated = 0
+        for start in range(0, len(changed), LOAD_BATCH):
+            batch = [info.key for info in changed[start:start + LOAD_BATCH]]
+            for key, record in backend.get_many(batch).items():
+                try:
+                    updated += self.update(key, record.data, record.ts, (record.meta or {}).get("content_hash"))
+                except (AttributeError, KeyError, TypeError) as e:
+                    _log.warning("Could not index players from '%s': %s", key, e)
+                    self._seen[key] = record.ts
+            self._enforce_budget()
+        return updated
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The best `limit` players for `query`, one row per player and team, best first."""
+        query = normalize_text(query)
+        if not query:
+            return []
+
+        with self._lock:
+            generation, players = self._generation, self._players
+            ranked = self.memo.get(generation, query)
+            if ranked is None:
+                ranked = self._rank(generation, query)
+            matches = [players[pid] for pid in ranked]
+
+        results: List[Dict[str, Any]] = []
+        seen: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        for player in matches:
+            # Samma spelare kan finnas både i truppen och i skytteligan
+            dedupe_key = (player.fold, player.team_id)
+            row = seen.get(dedupe_key)
+            if row is not None:
+                if row["goals"] is None and player.goals is not None:
+                    row["goals"] = player.goals
+                row["player_id"] = row["player_id"] or player.player_id
+                row["position"] = row["position"] or player.position
+                continue
+            if limit is not None and len(results) >= limit:
+                continue
+            row = seen[dedupe_key] = _result(player)
+            results.append(row)
+        return results
+
+    def _rank(self, generation: int, query: str) -> List[int]:
+        """Matching player ids, best first; call with the lock held."""
+        postings, players = self._postings, self._players
+        query_grams = trigrams(query)
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(postings.get(gram, ()))
+
+        candidates = self.memo.base(generation, query)
+        if candidates is None:
+            inner = [word[i:i + 3] for word in query.split() for i in range(len(word) - 2)]
+            if inner:
+                # Delsträngar och prefix har alltid frågans inre trigram
+                rarest = min(inner, key=lambda g: len(postings.get(g, ())))
+                candidates = postings.get(rarest, ())
+            else:
+                # Inget ord på tre tecken ("am"): delsträngar hittas bara genom att gå igenom namnen
+                candidates = [pid for pid, player in players.items() if query in player.fold]
+        candidates = set(candidates)
+        needed = MIN_SIMILARITY * len(query_grams)
+        candidates.update(pid for pid, n in shared.items() if n >= needed)
+
+        ranked = []
+        direct = set()
+        for pid in candidates:
+            player = players[pid]
+            similarity = shared[pid] / len(query_grams)
+            tier = match_tier(query, (player.fold,), similarity)
+            if tier is None:
+                continue
+            if tier < 3:
+                direct.add(pid)
+            ranked.append((tier, -similarity, -(player.goals or 0), len(player.fold), pid))
+        ranked.sort()
+        pids = [pid for *_, pid in ranked]
+        self.memo.put(generation, query, frozenset(direct), pids)
+        return pids
+
+
+def _result(player: _Player) -> Dict[str, Any]:
+    team = get_team_index(refresh=False).team(player.team_id)
+    comp = _COMPETITIONS_BY_CODE.get(team["league_code"] if team else player.competition_code)
+    return {
+        "player_name": player.name,
+        "player_id": player.player_id,
+        "position": player.position,
+        "goals": player.goals,
+        "team_id": player.team_id,
+        "team_name": player.team_name,
+        "crest": team["crest"] if team else "",
+        "league": comp["name"] if comp else None,
+        "league_code": comp["code"] if comp else None,
+        "league_flag": comp["flag"] if comp else "",
+        "page": comp["page"] if comp else None,
+    }
+
+
+_index: Optional[PlayerSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def refresh_player_index(index: Optional[PlayerSearchIndex] = None) -> int:
+    """Sync the index with the cached squads and scorer lists; no API calls."""
+    index = index or get_player_index(refresh=False)
+    try:
+        updated = index.sync(get_backend())
+    finally:
+        index.refreshed_at = time.time()
+    if updated:
+        _log.info("Player index updated from %s cache entries, %s players", updated, len(index))
+    return updated
+
+
+def get_player_index(refresh: bool = True) -> PlayerSearchIndex:
+    """The process-wide index; schedules a background refresh when it is due."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                _index = PlayerSearchIndex()
+    if refresh and time.time() - _index.refreshed_at > PLAYER_INDEX_REFRESH:
+        schedule_revalidate("player_index", refresh_player_index)
+    return _index
+
+
+def search_players(query: str, limit: Optional[int] = 10) -> List[Dict]:
+    if not query or len(query) < 2:
+        return []
+
+    started = time.perf_counter()
+    results = get_player_index().search(query, limit)
+    PLAYER_SEARCH_SECONDS.observe(time.perf_counter() - started)
+    return results
@@ -1,46 +1,358 @@
 """
 For searching any team across competitions
+
+Searches run against an in-memory index, never against the cache or the
+API. The index is built once per process from the data/lookup snapshots
+and refreshed in the background from the cached team lists every
+FSH_SEARCH_INDEX_REFRESH seconds; only competitions whose list changed
+are re-indexed.
+
+Names are Unicode-folded ("Atlético" -> "atletico") and matched through a
+trigram index, so typos still find the team. Results are ranked: exact
+match, then prefix, then substring, then fuzzy, by trigram overlap within
+each tier.
 """
-from typing import List, Dict, Optional
-from src.data_collection.api_client import get_teams, ApiClientError
+import json
+import os
+import threading
+import time
+import unicodedata
+from bisect import bisect_left
+from collections import Counter, OrderedDict
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+from src.components.leagues import LEAGUES
+from src.data_collection.api_client import ApiClientError
+from src.data_collection.async_client import fetch_all, get_teams
+from src.data_collection.rate_limit import PRIORITY_BACKGROUND, request_priority
+from src.utils.cache import content_hash, schedule_revalidate
+from src.utils.logger import get_logger
+from src.utils.metrics import SEARCH_MEMO_LOOKUPS, SEARCH_SECONDS
+
+_log = get_logger("search")
+
+LOOKUP_DIR = Path("data/lookup")
+SEARCH_INDEX_REFRESH = int(os.getenv("FSH_SEARCH_INDEX_REFRESH", "300"))
+# Andel av frågans trigram som måste finnas i laget för en fuzzy-träff
+MIN_SIMILARITY = float(os.getenv("FSH_SEARCH_MIN_SIMILARITY", "0.45"))
+# Antal frågor vars resultat sparas per index
+SEARCH_MEMO_SIZE = int(os.getenv("FSH_SEARCH_MEMO_SIZE", "512"))
+
+COMPETITIONS = [
+    {"code": league.code, "name": league.name, "flag": league.flag, "page": league.page, "lookup": league.lookup}
+    for league in LEAGUES.values()
+]
+
+
+# Bokstäver som NFKD inte delar upp i bas + accent
+_FOLD = str.maketrans({"ø": "o", "æ": "ae", "œ": "oe", "ł": "l", "đ": "d", "ð": "d", "þ": "th", "ı": "i"})
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Casefolded, accents removed, punctuation as spaces: "Atlético-B" -> "atletico b"."""
+    decomposed = unicodedata.normalize("NFKD", (text or "").casefold().translate(_FOLD))
+    chars = [c if c.isalnum() else " " for c in decomposed if not unicodedata.combining(c)]
+    return " ".join("".join(chars).split())
+
+
+def trigrams(text: str) -> Set[str]:
+    """Trigrams of each word, padded like pg_trgm so word starts weigh more."""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class QueryMemo:
+    """
+    LRU of normalized query -> ranked positions, for one index generation.
+
+    Streamlit reruns the script for every widget change, so the same query
+    is searched again and again. A query that extends a memoized one (a
+    user typing on) starts from that query's direct matches instead of the
+    index. Entries from an older index generation are dropped on access.
+    """
+
+    def __init__(self, max_entries: int = SEARCH_MEMO_SIZE, name: str = "teams"):
+        self.max_entries = max_entries
+        self.name = name
+        self._lock = threading.Lock()
+        # fråga -> (positioner med direktträff, alla träffar rankade)
+        self._entries: "OrderedDict[str, Tuple[FrozenSet[int], List[int]]]" = OrderedDict()
+        self._generation: Optional[int] = None
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def _sync(self, generation: int) -> None:
+        if generation != self._generation:
+            self._entries.clear()
+            self._generation = generation
+
+    def get(self, generation: int, query: str) -> Optional[List[int]]:
+        with self._lock:
+            self._sync(generation)
+            entry = self._entries.get(query)
+            if entry is not None:
+                self._entries.move_to_end(query)
+        SEARCH_MEMO_LOOKUPS.labels(self.name, "hit" if entry is not None else "miss").inc()
+        return entry[1] if entry is not None else None
+
+    def base(self, generation: int, query: str) -> Optional[FrozenSet[int]]:
+        """Direct matches of the longest memoized query of 3+ characters that `query` extends."""
+        with self._lock:
+            self._sync(generation)
+            # Bara frågor vars kandidater kom från trigramindexet har garanterat alla direktträffar,
+            # och en tom mängd sparar inget arbete
+            for n in range(len(query) - 1, 2, -1):
+                entry = self._entries.get(query[:n])
+                if entry is not None and entry[0]:
+                    SEARCH_MEMO_LOOKUPS.labels(self.name, "refine").inc()
+                    return entry[0]
+        return None
+
+    def put(self, generation: int, query: str, direct: FrozenSet[int], ranked: List[int]) -> None:
+        with self._lock:
+            self._sync(generation)
+            self._entries[query] = (direct, ranked)
+            self._entries.move_to_end(query)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class _Entry:
+    __slots__ = ("result", "fields", "grams")
+
+    def __init__(self, result: Dict[str, Any], fields: Tuple[str, ...]):
+        self.result = result
+        self.fields = fields
+        self.grams = set().union(*(trigrams(f) for f in fields))
+
+
+class _View(NamedTuple):
+    entries: List[_Entry]
+    terms: List[Tuple[str, int]]       # sorterade (term, position) för prefixuppslag
+    postings: Dict[str, List[int]]     # trigram -> positioner
+    generation: int
 
-def search_teams(query: str) -> List[Dict]:
+
+class TeamSearchIndex:
+    """Pre-normalized name, shortName and TLA per team, in competition order."""
+
+    def __init__(self, competitions: Sequence[Dict[str, str]] = COMPETITIONS):
+        self.competitions = list(competitions)
+        self.refreshed_at = 0.0
+        self._lock = threading.Lock()
+        # Per liga: listan som indexerades och dess hash, så att oförändrade listor hoppas över
+        self._sources: Dict[str, Tuple[Any, str]] = {}
+        self._by_code: Dict[str, List[_Entry]] = {}
+        # Sökningar läser bara denna, som byts ut i sin helhet vid varje uppdatering
+        self._view = _View([], [], {}, 0)
+        self._by_id: Dict[Any, Dict[str, Any]] = {}
+        self.memo = QueryMemo()
+
+    def __len__(self) -> int:
+        return len(self._view.entries)
+
+    def load_snapshots(self, lookup_dir: Path = LOOKUP_DIR) -> None:
+        for comp in self.competitions:
+            path = lookup_dir / comp["lookup"]
+            try:
+                teams = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError) as e:
+                _log.warning("Could not read team snapshot %s: %s", path, e)
+                continue
+            self.update(comp["code"], teams)
+
+    def update(self, code: str, teams: List[Dict[str, Any]]) -> bool:
+        """Re-index one competition; False if `teams` is what is already indexed."""
+        comp = next((c for c in self.competitions if c["code"] == code), None)
+        if comp is None:
+            raise ValueError(f"Unknown competition {code!r}")
+
+        with self._lock:
+            previous = self._sources.get(code)
+            # Cachen lämnar ut samma objekt så länge innehållet är oförändrat
+            if previous is not None and previous[0] is teams:
+                return False
+            fingerprint = content_hash(teams)
+            if previous is not None and previous[1] == fingerprint:
+                self._sources[code] = (teams, fingerprint)
+                return False
+
+            self._sources[code] = (teams, fingerprint)
+            self._by_code[code] = [self._entry(comp, team) for team in teams]
+            self._rebuild()
+        return True
+
+    @staticmethod
+    def _entry(comp: Dict[str, str], team: Dict[str, Any]) -> _Entry:
+        team_name = team.get("name") or team.get("team_name", "")
+        result = {
+            "team_name": team_name,
+            "team_id": team.get("team_id") or team.get("id"),
+            "crest": team.get("crest", ""),
+            "league": comp["name"],
+            "league_code": comp["code"],
+            "league_flag": comp["flag"],
+            "page": comp["page"],
+        }
+        fields = tuple(
+            f for f in (normalize_text(team_name), normalize_text(team.get("shortName")), normalize_text(team.get("tla"))) if f
+        )
+        return _Entry(result, fields)
+
+    def _rebuild(self) -> None:
+        entries = [e for comp in self.competitions for e in self._by_code.get(comp["code"], [])]
+        terms = set()
+        postings: Dict[str, List[int]] = {}
+        for i, entry in enumerate(entries):
+            for field in entry.fields:
+                terms.add((field, i))
+                # Varje ord för sig, så att "mad" hittar "real madrid cf" som prefix
+                for word in field.split()[1:]:
+                    terms.add((word, i))
+            for gram in entry.grams:
+                postings.setdefault(gram, []).append(i)
+        self._view = _View(entries, sorted(terms), postings, self._view.generation + 1)
+        self._by_id = {e.result["team_id"]: e.result for e in entries}
+
+    def team(self, team_id: Any) -> Optional[Dict[str, Any]]:
+        """The search result for one team, or None if it is in none of the indexed leagues."""
+        return self._by_id.get(team_id)
+
+    def prefix(self, query: str) -> List[int]:
+        """Positions of teams with a name, shortName, TLA or word starting with `query`."""
+        return sorted(self._prefix(self._view.terms, query))
+
+    @staticmethod
+    def _prefix(terms: List[Tuple[str, int]], query: str) -> Set[int]:
+        hits = set()
+        i = bisect_left(terms, (query, -1))
+        while i < len(terms) and terms[i][0].startswith(query):
+            hits.add(terms[i][1])
+            i += 1
+        return hits
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """The best `limit` teams for `query` (all matches if None), best first."""
+        query = normalize_text(query)
+        if not query:
+            return []
+        view = self._view
+        ranked = self.memo.get(view.generation, query)
+        if ranked is None:
+            ranked = self._rank(view, query)
+        best = ranked[:limit] if limit is not None else ranked
+        return [dict(view.entries[i].result) for i in best]
+
+    def _rank(self, view: "_View", query: str) -> List[int]:
+        entries, postings = view.entries, view.postings
+        query_grams = trigrams(query)
+        shared: Counter = Counter()
+        for gram in query_grams:
+            shared.update(postings.get(gram, ()))
+
+        # Den som fortsätter skriva på en tidigare fråga kan bara få direktträffar bland dess direktträffar
+        candidates = self.memo.base(view.generation, query)
+        if candidates is None:
+            candidates = self._prefix(view.terms, query)
+            # Delsträngar kan sakna frågans kanttrigram, så de hittas via dess ovanligaste inre trigram
+            inner = [word[i:i + 3] for word in query.split() for i in range(len(word) - 2)]
+            if inner:
+                rarest = min(inner, key=lambda g: len(postings.get(g, ())))
+                candidates.update(postings.get(rarest, ()))
+            else:
+                # Inget ord på tre tecken ("ta"): delsträngar hittas bara genom att gå igenom namnen
+                candidates.update(i for i, entry in enumerate(entries) if any(query in f for f in entry.fields))
+        candidates = set(candidates)
+        needed = MIN_SIMILARITY * len(query_grams)
+        candidates.update(i for i, n in shared.items() if n >= needed)
+
+        ranked = []
+        direct = set()
+        for i in candidates:
+            fields = entries[i].fields
+            similarity = shared[i] / len(query_grams)
+            tier = match_tier(query, fields, similarity)
+            if tier is None:
+                continue
+            if tier < 3:
+                direct.add(i)
+            ranked.append((tier, -similarity, len(fields[0]), i))
+        ranked.sort()
+        positions = [i for *_, i in ranked]
+        self.memo.put(view.generation, query, frozenset(direct), positions)
+        return positions
+
+
+def match_tier(query: str, fields: Sequence[str], similarity: float) -> Optional[int]:
+    """0 exact, 1 prefix of a field or word, 2 substring, 3 fuzzy, None no match."""
+    if query in fields:
+        return 0
+    if any(f.startswith(query) or f" {query}" in f for f in fields):
+        return 1
+    if any(query in f for f in fields):
+        return 2
+    if similarity >= MIN_SIMILARITY:
+        return 3
+    return None
+
+
+_index: Optional[TeamSearchIndex] = None
+_index_lock = threading.Lock()
+
+
+def refresh_team_index(index: Optional[TeamSearchIndex] = None) -> int:
+    """Sync the index with the (cached) team lists; returns how many competitions changed."""
+    index = index or get_team_index(refresh=False)
+    changed = 0
+    try:
+        # Sökningen väntar aldrig på detta, så förnyelsen köar bakom sidladdningar
+        with request_priority(PRIORITY_BACKGROUND):
+            teams_by_code = fetch_all(
+                {comp["code"]: get_teams(comp["code"]) for comp in index.competitions},
+                return_exceptions=True,
+            )
+        for code, teams in teams_by_code.items():
+            if isinstance(teams, ApiClientError):
+                _log.error("Error refreshing search index for %s: %s", code, teams)
+                continue
+            if isinstance(teams, BaseException):
+                raise teams
+            changed += index.update(code, teams)
+    finally:
+        index.refreshed_at = time.time()
+    if changed:
+        _log.info("Search index updated for %s competition(s), %s teams", changed, len(index))
+    return changed
+
+
+def get_team_index(refresh: bool = True) -> TeamSearchIndex:
+    """The process-wide index; schedules a background refresh when it is due."""
+    global _index
+    if _index is None:
+        with _index_lock:
+            if _index is None:
+                index = TeamSearchIndex()
+                index.load_snapshots()
+                _index = index
+    if refresh and time.time() - _index.refreshed_at > SEARCH_INDEX_REFRESH:
+        schedule_revalidate("search_index", refresh_team_index)
+    return _index
+
+
+def search_teams(query: str, limit: Optional[int] = 10) -> List[Dict]:
     if not query or len(query) < 2:
         return []
-    
-    query = query.lower()
-    results = []
-
-    competitions = [
-        {"code": "PD", "name": "La Liga", "flag": "🇪🇸", "page": "pages/1_La_Liga.py"},
-        {"code": "PL", "name": "Premier League", "flag": "🏴󠁧󠁢󠁥󠁮󠁧󠁿", "page": "pages/2_Premier_League.py"},
-        {"code": "SA", "name": "Serie A", "flag": "🇮🇹", "page": "pages/3_Serie_A.py"},
-    ]
-
-    for comp in competitions:
-        try:
-            teams = get_teams(comp["code"])
-            
-            for team in teams:
-                # Extract team name from dict or object
-                team_name = team.get("name") or team.get("team_name", "")
-                team_id = team.get("team_id") or team.get("id")
-                crest = team.get("crest", "")
-                
-                # Check if query matches team name
-                if query in team_name.lower():
-                    results.append({
-                        "team_name": team_name,
-                        "team_id": team_id,
-                        "crest": crest,
-                        "league": comp["name"],
-                        "league_code": comp["code"],
-                        "league_flag": comp["flag"],
-                        "page": comp["page"]
-                    })
-        
-        except ApiClientError as e:
-            print(f"Error searching {comp['name']}: {e}")
-            continue
-    
+
+    started = time.perf_counter()
+    results = get_team_index().search(query, limit)
+    SEARCH_SECONDS.observe(time.perf_counter() - started)
     return results
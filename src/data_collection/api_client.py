@@ -1,11 +1,34 @@
 import os
-from typing import Any, Dict, List, Optional
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import requests
-
-from src.utils.cache import cache_get, cache_set
-
-BASE_URL = "https://api.football-data.org/v4"
+from tenacity import Retrying, RetryCallState, retry_if_exception_type, stop_after_attempt, wait_random_exponential
+
+from src.data_collection.circuit_breaker import breaker_states, get_breaker
+from src.data_collection.http_session import get_session
+from src.data_collection.rate_limit import (
+    PRIORITY_BACKGROUND,
+    RateLimitExceeded,
+    get_rate_limiter,
+    request_priority,
+)
+from src.data_collection.match_store import Interval, MatchStore, merge
+from src.utils.cache import (
+    cache_get,
+    cache_peek,
+    cache_set,
+    cache_touch,
+    content_hash,
+    schedule_revalidate,
+)
+from src.utils.logger import get_logger, record_call
+from src.utils.metrics import API_REQUEST_SECONDS, API_RETRIES
+from src.utils.singleflight import SingleFlight
+
+# Kan pekas om, t.ex. mot den lokala mock-servern (python -m scripts.mock_api)
+BASE_URL = os.getenv("FSH_API_BASE_URL", "https://api.football-data.org/v4").rstrip("/")
 
 SUPPORTED_COMPETITIONS = {
     "PD": "La Liga",
@@ -13,34 +36,329 @@ SUPPORTED_COMPETITIONS = {
     "SA": "Serie A",
 }
 
+# Hur många gånger ett 429-svar köas om innan vi ger upp
+RATE_LIMIT_RETRIES = 2
+
+# Nätverksfel och 5xx försöks igen med jittrad exponentiell backoff
+RETRY_ATTEMPTS = int(os.getenv("FSH_API_RETRY_ATTEMPTS", "3"))
+RETRY_BACKOFF_BASE = float(os.getenv("FSH_API_BACKOFF_BASE", "0.5"))
+RETRY_BACKOFF_MAX = float(os.getenv("FSH_API_BACKOFF_MAX", "8"))
+RETRY_STATUSES = {500, 502, 503, 504}
+# (connect, read) i sekunder
+REQUEST_TIMEOUT = (
+    float(os.getenv("FSH_API_CONNECT_TIMEOUT", "5")),
+    float(os.getenv("FSH_API_READ_TIMEOUT", "20")),
+)
+
+# Nycklas på samma cache-nycklar som get_*-funktionerna bygger
+_flights = SingleFlight()
+
+_log = get_logger("api_client")
+
 class ApiClientError(Exception):
     pass
 
+class RateLimitedError(ApiClientError):
+    """Over the request quota; `retry_after` is the estimated wait in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class UpstreamUnavailableError(ApiClientError):
+    """Network error or 5xx answer that did not go away after retrying."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+class CircuitOpenError(ApiClientError):
+    """The endpoint has failed repeatedly; calls fail fast for `retry_after` seconds."""
+
+    def __init__(self, endpoint: str, retry_after: float):
+        super().__init__(f"API endpoint {endpoint} is unavailable, retrying in ~{retry_after:.0f}s")
+        self.endpoint = endpoint
+        self.retry_after = retry_after
+
 def _get_headers() -> Dict[str, str]:
     token = os.getenv("FOOTBALL_DATA_TOKEN")
     if not token:
         raise ApiClientError("Missing env var FOOTBALL_DATA_TOKEN")
     return {"X-Auth-Token": token}
 
-def _get(path: str, params: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-    url = f"{BASE_URL}{path}"
-    r = requests.get(url, headers=_get_headers(), params=params, timeout=20)
-    if r.status_code >= 400:
-        raise ApiClientError(f"API error {r.status_code}: {r.text[:200]}")
-    return r.json()
-
-# 1) Competitions
-def get_competitions() -> List[Dict[str, str]]:
-    return [{"code": code, "name": name} for code, name in SUPPORTED_COMPETITIONS.items()]
-
-# 2) Standings (cached)
-def get_standings(competition_code: str) -> List[Dict[str, Any]]:
-    cache_key = f"standings_{competition_code}"
-    cached = cache_get(cache_key, ttl_seconds=600)  # 10 min
+def _retry_after(r, default: Optional[float] = 60.0) -> Optional[float]:
+    # football-data.org skickar X-RequestCounter-Reset (sekunder kvar på minuten)
+    for header in ("Retry-After", "X-RequestCounter-Reset"):
+        value = r.headers.get(header)
+        if value:
+            try:
+                return max(float(value), 1.0)
+            except ValueError:
+                continue
+    return default
+
+def _endpoint(path: str) -> str:
+    # "/teams/86/matches" -> "/teams/{id}/matches", en brytare per endpoint och inte per lag
+    parts = path.strip("/").split("/")
+    for i in range(1, len(parts)):
+        if parts[i - 1] == "competitions":
+            parts[i] = "{code}"
+        elif parts[i - 1] == "teams":
+            parts[i] = "{id}"
+    return "/" + "/".join(parts)
+
+def _backoff(retry_state: RetryCallState) -> float:
+    error = retry_state.outcome.exception()
+    retry_after = getattr(error, "retry_after", None)
+    if retry_after:
+        return retry_after
+    return wait_random_exponential(multiplier=RETRY_BACKOFF_BASE, max=RETRY_BACKOFF_MAX)(retry_state)
+
+def _retry_after_too_long(retry_state: RetryCallState) -> bool:
+    # Ett Retry-After längre än vår maxväntan: ge upp direkt i stället för att hänga sidan
+    retry_after = getattr(retry_state.outcome.exception(), "retry_after", None)
+    return bool(retry_after and retry_after > RETRY_BACKOFF_MAX)
+
+def _retrying() -> Retrying:
+    return Retrying(
+        retry=retry_if_exception_type(UpstreamUnavailableError),
+        stop=stop_after_attempt(RETRY_ATTEMPTS) | _retry_after_too_long,
+        wait=_backoff,
+        reraise=True,
+    )
+
+def get_breaker_states() -> Dict[str, Dict[str, Any]]:
+    """Circuit breaker state per API endpoint, for monitoring."""
+    return breaker_states()
+
+def estimate_wait(priority: Optional[int] = None) -> float:
+    """Seconds a new request would currently queue behind the rate limiter."""
+    return get_rate_limiter().estimate_wait(priority)
+
+def _request(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_wait: Optional[float] = None,
+    extra_headers: Optional[Dict[str, str]] = None,
+    cache_status: Optional[str] = None,
+):
+    headers = _get_headers()
+    if extra_headers:
+        headers.update(extra_headers)
+
+    endpoint = _endpoint(path)
+    breaker = get_breaker(endpoint)
+    if not breaker.allow():
+        raise CircuitOpenError(endpoint, breaker.retry_after())
+
+    # Fylls i av _send: senaste status, svarets storlek och antal 429-omköningar
+    call: Dict[str, Any] = {"status": None, "size": 0, "requeued": 0}
+    attempts = 0
+    error: Optional[BaseException] = None
+    start = time.perf_counter()
+    try:
+        for attempt in _retrying():
+            with attempt:
+                attempts += 1
+                r = _send(f"{BASE_URL}{path}", headers, params, max_wait, call)
+    except UpstreamUnavailableError as e:
+        error = e
+        breaker.record_failure()
+        raise
+    except RateLimitedError as e:
+        error = e
+        breaker.release()
+        raise
+    except ApiClientError as e:
+        # 4xx: API:t svarar, så endpointen är frisk
+        error = e
+        breaker.record_success()
+        raise
+    except BaseException as e:
+        error = e
+        breaker.release()
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        retries = max(attempts - 1, 0) + call["requeued"]
+        record_call(
+            endpoint,
+            elapsed,
+            cache=cache_status,
+            status=call["status"],
+            size=call["size"],
+            retries=retries,
+            error=type(error).__name__ if error is not None else None,
+        )
+        API_REQUEST_SECONDS.labels(endpoint, str(call["status"] or "error")).observe(elapsed)
+        if retries:
+            API_RETRIES.labels(endpoint).inc(retries)
+    breaker.record_success()
+    return r
+
+def _send(
+    url: str,
+    headers: Dict[str, str],
+    params: Optional[Dict[str, Any]],
+    max_wait: Optional[float],
+    call: Optional[Dict[str, Any]] = None,
+):
+    limiter = get_rate_limiter()
+    call = call if call is not None else {"requeued": 0}
+    attempt = 0
+    while True:
+        try:
+            limiter.acquire(max_wait=max_wait)
+        except RateLimitExceeded as e:
+            raise RateLimitedError(str(e), e.estimated_wait) from e
+
+        try:
+            r = get_session().get(url, headers=headers, params=params, timeout=REQUEST_TIMEOUT)
+        except requests.RequestException as e:
+            call["status"] = None
+            raise UpstreamUnavailableError(f"API request failed: {e}") from e
+        call["status"] = r.status_code
+        call["size"] = len(r.content)
+        if r.status_code == 429:
+            # Någon annan process har ätit kvoten: pausa alla och köa om
+            wait = _retry_after(r)
+            limiter.pause(wait)
+            attempt += 1
+            if attempt <= RATE_LIMIT_RETRIES:
+                call["requeued"] += 1
+                continue
+            raise RateLimitedError(f"API rate limit hit, retry in ~{wait:.0f}s", wait)
+        if r.status_code in RETRY_STATUSES:
+            raise UpstreamUnavailableError(
+                f"API error {r.status_code}: {r.text[:200]}",
+                retry_after=_retry_after(r, default=None),
+            )
+        if r.status_code >= 400:
+            raise ApiClientError(f"API error {r.status_code}: {r.text[:200]}")
+        return r
+
+def _get(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    max_wait: Optional[float] = None,
+    cache_status: Optional[str] = None,
+) -> Dict[str, Any]:
+    return _request(path, params=params, max_wait=max_wait, cache_status=cache_status).json()
+
+def _get_conditional(
+    path: str,
+    params: Optional[Dict[str, Any]] = None,
+    validators: Optional[Dict[str, Any]] = None,
+    cache_status: Optional[str] = None,
+) -> Tuple[Optional[Dict[str, Any]], Dict[str, Any]]:
+    """
+    GET with If-None-Match / If-Modified-Since from an earlier response.
+    Returns (None, validators) on 304 Not Modified, else (body, new validators).
+    """
+    extra: Dict[str, str] = {}
+    if validators:
+        if validators.get("etag"):
+            extra["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            extra["If-Modified-Since"] = validators["last_modified"]
+
+    r = _request(path, params=params, extra_headers=extra, cache_status=cache_status)
+    new_validators = {
+        "etag": r.headers.get("ETag") or (validators or {}).get("etag"),
+        "last_modified": r.headers.get("Last-Modified") or (validators or {}).get("last_modified"),
+    }
+    if r.status_code == 304:
+        return None, new_validators
+    return r.json(), new_validators
+
+# Delad cache-logik: cache -> single-flight -> API
+def _cached(
+    cache_key: str,
+    ttl_seconds: int,
+    path: str,
+    normalize: Callable[[Dict[str, Any]], Any],
+    params: Optional[Dict[str, Any]] = None,
+    max_age_seconds: Optional[int] = None,
+) -> Any:
+    # Posten är värd att spara så länge den kan serveras som stale
+    keep_seconds = max(ttl_seconds, max_age_seconds or 0)
+
+    def load(cache_status: str = "miss") -> Any:
+        # Någon annan tråd kan ha fyllt cachen medan vi väntade på vår tur
+        cached = cache_get(cache_key, ttl_seconds=ttl_seconds)
+        if cached is not None:
+            return cached
+
+        # En gammal post (oavsett ålder) ger validatorer för en villkorlig request
+        previous = cache_peek(cache_key)
+        previous_meta = (previous.meta or {}) if previous is not None else {}
+        data, validators = _get_conditional(
+            path,
+            params=params,
+            validators=previous_meta if previous is not None else None,
+            cache_status=cache_status,
+        )
+        if data is None:
+            # 304: oförändrat, så bara tidsstämpeln flyttas fram
+            cache_touch(cache_key, ttl_seconds=keep_seconds, meta={**previous_meta, **validators})
+            return previous.data
+
+        result = normalize(data)
+        meta = {**validators, "content_hash": content_hash(result)}
+        if previous is not None and previous_meta.get("content_hash") == meta["content_hash"]:
+            # API:t ignorerade validatorerna men innehållet är samma: behåll samma objekt,
+            # så att det som räknats ut från det kan återanvändas
+            cache_touch(cache_key, ttl_seconds=keep_seconds, meta=meta)
+            return previous.data
+        cache_set(cache_key, result, ttl_seconds=keep_seconds, meta=meta)
+        return result
+
+    def revalidate() -> Any:
+        # Användaren har redan fått gammal data, så förnyelsen får köa bakom sidladdningar
+        with request_priority(PRIORITY_BACKGROUND):
+            return _flights.do(cache_key, lambda: load("refresh"))
+
+    # Mellan ttl_seconds och max_age_seconds: returnera gammal data och förnya i bakgrunden
+    start = time.perf_counter()
+    cached = cache_get(
+        cache_key,
+        ttl_seconds=ttl_seconds,
+        max_age_seconds=max_age_seconds,
+        revalidate=revalidate,
+    )
     if cached is not None:
+        record_call(_endpoint(path), time.perf_counter() - start, cache="hit")
         return cached
 
-    data = _get(f"/competitions/{competition_code}/standings")
+    # Samtidiga anrop för samma nyckel delar på en enda request
+    try:
+        return _flights.do(cache_key, load)
+    except (CircuitOpenError, UpstreamUnavailableError, RateLimitedError) as e:
+        # API:t är nere eller kön för lång: gammal data (oavsett ålder) är bättre än en tom sida
+        previous = cache_peek(cache_key)
+        if previous is None:
+            raise
+        _log.warning("Serving stale '%s' while the API is unavailable: %s", cache_key, e)
+        return previous.data
+
+def _match_row(m: Dict[str, Any], competition_code: Optional[str]) -> Dict[str, Any]:
+    home = m.get("homeTeam", {}) or {}
+    away = m.get("awayTeam", {}) or {}
+    score = (m.get("score", {}) or {}).get("fullTime", {}) or {}
+    return {
+        "match_id": m.get("id"),
+        "competition_code": competition_code,
+        "utc_date": m.get("utcDate"),
+        "status": m.get("status"),
+        "home_team_id": home.get("id"),
+        "home_team_name": home.get("name"),
+        "away_team_id": away.get("id"),
+        "away_team_name": away.get("name"),
+        "score_home": score.get("home"),
+        "score_away": score.get("away"),
+    }
+
+def _normalize_standings(data: Dict[str, Any], competition_code: str) -> List[Dict[str, Any]]:
     standings = data.get("standings", [])
     if not standings:
         return []
@@ -64,18 +382,9 @@ def get_standings(competition_code: str) -> List[Dict[str, Any]]:
             "goals_against": row.get("goalsAgainst"),
             "goal_difference": row.get("goalDifference"),
         })
-
-    cache_set(cache_key, rows)
     return rows
 
-# 3) Teams in a league (cached)
-def get_teams(competition_code: str) -> List[Dict[str, Any]]:
-    cache_key = f"teams_{competition_code}"
-    cached = cache_get(cache_key, ttl_seconds=3600)  # 1h
-    if cached is not None:
-        return cached
-
-    data = _get(f"/competitions/{competition_code}/teams")
+def _normalize_teams(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     teams = data.get("teams", []) or []
 
     result: List[Dict[str, Any]] = []
@@ -87,64 +396,17 @@ def get_teams(competition_code: str) -> List[Dict[str, Any]]:
             "tla": t.get("tla"),
             "crest": t.get("crest"),
         })
-
-    cache_set(cache_key, result)
     return result
 
-
-# 4) Teams data (cached)
-def get_team_matches(
-    team_id: int,
-    dateFrom: Optional[str] = None,  # "YYYY-MM-DD"
-    dateTo: Optional[str] = None,    # "YYYY-MM-DD"
-    status: Optional[str] = None,    # "FINISHED" / "SCHEDULED"
-    limit: int = 10,
-) -> List[Dict[str, Any]]:
-    params: Dict[str, Any] = {}
-    if status:
-        params["status"] = status
-    if dateFrom:
-        params["dateFrom"] = dateFrom
-    if dateTo:
-        params["dateTo"] = dateTo
-
-    cache_key = f"team_matches_{team_id}_{status}_{dateFrom}_{dateTo}_{limit}"
-    cached = cache_get(cache_key, ttl_seconds=300)  # 5 min
-    if cached is not None:
-        return cached
-
-    data = _get(f"/teams/{team_id}/matches", params=params)
+def _normalize_team_matches(data: Dict[str, Any], limit: Optional[int]) -> List[Dict[str, Any]]:
     matches = (data.get("matches", []) or [])[:limit]
+    return [
+        _match_row(m, (m.get("competition", {}) or {}).get("code"))
+        for m in matches
+    ]
 
-    out: List[Dict[str, Any]] = []
-    for m in matches:
-        home = m.get("homeTeam", {}) or {}
-        away = m.get("awayTeam", {}) or {}
-        score = (m.get("score", {}) or {}).get("fullTime", {}) or {}
-        out.append({
-            "match_id": m.get("id"),
-            "competition_code": (m.get("competition", {}) or {}).get("code"),
-            "utc_date": m.get("utcDate"),
-            "status": m.get("status"),
-            "home_team_id": home.get("id"),
-            "home_team_name": home.get("name"),
-            "away_team_id": away.get("id"),
-            "away_team_name": away.get("name"),
-            "score_home": score.get("home"),
-            "score_away": score.get("away"),
-        })
-
-    cache_set(cache_key, out)
-    return out
-
-def get_team(team_id: int) -> Dict[str, Any]:
-    cache_key = f"team_{team_id}"
-    cached = cache_get(cache_key, ttl_seconds=86400)  # 24h
-    if cached is not None:
-        return cached
-
-    data = _get(f"/teams/{team_id}")
-    result = {
+def _normalize_team(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {
         "team_id": data.get("id"),
         "name": data.get("name"),
         "shortName": data.get("shortName"),
@@ -156,16 +418,7 @@ def get_team(team_id: int) -> Dict[str, Any]:
         "website": data.get("website"),
     }
 
-    cache_set(cache_key, result)
-    return result
-
-def get_squad(team_id: int) -> List[Dict[str, Any]]:
-    cache_key = f"squad_{team_id}"
-    cached = cache_get(cache_key, ttl_seconds=86400)  # 24h
-    if cached is not None:
-        return cached
-
-    data = _get(f"/teams/{team_id}")
+def _normalize_squad(data: Dict[str, Any]) -> List[Dict[str, Any]]:
     squad = data.get("squad", []) or []
 
     players: List[Dict[str, Any]] = []
@@ -180,60 +433,16 @@ def get_squad(team_id: int) -> List[Dict[str, Any]]:
             "goals": None,
             "assists": None,
         })
-
-    cache_set(cache_key, players)
     return players
 
-# 5) Competition matches by date (cached)
-
-def get_matches_by_date(
-    competition_code: str,
-    dateFrom: str,   # "YYYY-MM-DD"
-    dateTo: str,     # "YYYY-MM-DD"
-    status: Optional[str] = None,
-) -> List[Dict[str, Any]]:
-    params: Dict[str, Any] = {"dateFrom": dateFrom, "dateTo": dateTo}
-    if status:
-        params["status"] = status
-
-    cache_key = f"matches_{competition_code}_{dateFrom}_{dateTo}_{status}"
-    cached = cache_get(cache_key, ttl_seconds=300)  # 5 min
-    if cached is not None:
-        return cached
+def _normalize_team_detail(data: Dict[str, Any]) -> Dict[str, Any]:
+    return {"team": _normalize_team(data), "squad": _normalize_squad(data)}
 
-    data = _get(f"/competitions/{competition_code}/matches", params=params)
+def _normalize_competition_matches(data: Dict[str, Any], competition_code: str) -> List[Dict[str, Any]]:
     matches = data.get("matches", []) or []
+    return [_match_row(m, competition_code) for m in matches]
 
-    out: List[Dict[str, Any]] = []
-    for m in matches:
-        home = m.get("homeTeam", {}) or {}
-        away = m.get("awayTeam", {}) or {}
-        score = (m.get("score", {}) or {}).get("fullTime", {}) or {}
-        out.append({
-            "match_id": m.get("id"),
-            "competition_code": competition_code,
-            "utc_date": m.get("utcDate"),
-            "status": m.get("status"),
-            "home_team_id": home.get("id"),
-            "home_team_name": home.get("name"),
-            "away_team_id": away.get("id"),
-            "away_team_name": away.get("name"),
-            "score_home": score.get("home"),
-            "score_away": score.get("away"),
-        })
-
-    cache_set(cache_key, out)
-    return out
-
-# 6) Top scorers (cachhed)
-
-def get_top_scorers(competition_code: str) -> List[Dict[str, Any]]:
-    cache_key = f"top_scorers_{competition_code}"
-    cached = cache_get(cache_key, ttl_seconds=3600)  # 1h
-    if cached is not None:
-        return cached
-
-    data = _get(f"/competitions/{competition_code}/scorers")
+def _normalize_top_scorers(data: Dict[str, Any], competition_code: str) -> List[Dict[str, Any]]:
     scorers = data.get("scorers", []) or []
 
     rows: List[Dict[str, Any]] = []
@@ -250,6 +459,166 @@ def get_top_scorers(competition_code: str) -> List[Dict[str, Any]]:
             "assists": s.get("assists"),          # kan vara None
             "appearances": s.get("playedMatches") # kan vara None
         })
-
-    cache_set(cache_key, rows)
     return rows
+
+# 1) Competitions
+def get_competitions() -> List[Dict[str, str]]:
+    return [{"code": code, "name": name} for code, name in SUPPORTED_COMPETITIONS.items()]
+
+# 2) Standings (cached)
+def get_standings(competition_code: str) -> List[Dict[str, Any]]:
+    return _cached(
+        f"standings_{competition_code}",
+        600,  # 10 min
+        f"/competitions/{competition_code}/standings",
+        lambda data: _normalize_standings(data, competition_code),
+        max_age_seconds=6 * 3600,
+    )
+
+# 3) Teams in a league (cached)
+def get_teams(competition_code: str) -> List[Dict[str, Any]]:
+    return _cached(
+        f"teams_{competition_code}",
+        3600,  # 1h
+        f"/competitions/{competition_code}/teams",
+        _normalize_teams,
+        max_age_seconds=7 * 86400,
+    )
+
+
+# 4) Teams data (cached)
+def get_team_matches(
+    team_id: int,
+    dateFrom: Optional[str] = None,  # "YYYY-MM-DD"
+    dateTo: Optional[str] = None,    # "YYYY-MM-DD"
+    status: Optional[str] = None,    # "FINISHED" / "SCHEDULED"
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    if dateFrom and dateTo:
+        window = (date.fromisoformat(dateFrom), date.fromisoformat(dateTo))
+        return _get_team_matches_window(team_id, window, status, limit)
+
+    params: Dict[str, Any] = {}
+    if status:
+        params["status"] = status
+    if dateFrom:
+        params["dateFrom"] = dateFrom
+    if dateTo:
+        params["dateTo"] = dateTo
+
+    return _cached(
+        f"team_matches_{team_id}_{status}_{dateFrom}_{dateTo}_{limit}",
+        300,  # 5 min
+        f"/teams/{team_id}/matches",
+        lambda data: _normalize_team_matches(data, limit),
+        params=params,
+        max_age_seconds=3600,
+    )
+
+# Alla datumfönster för ett lag besvaras ur samma matchlager (se match_store.py)
+MATCH_STORE_TTL = 30 * 86400
+
+def _load_match_store(team_id: int) -> MatchStore:
+    return MatchStore.from_dict(cache_get(f"team_match_store_{team_id}", ttl_seconds=MATCH_STORE_TTL))
+
+def _refresh_match_store(team_id: int, window: Interval, cache_status: str = "miss") -> MatchStore:
+    cache_key = f"team_match_store_{team_id}"
+
+    def load() -> MatchStore:
+        store = _load_match_store(team_id)
+        missing, stale = store.plan(window, time.time(), datetime.now(timezone.utc).date())
+        for start, end in merge(missing + stale):
+            data = _get(
+                f"/teams/{team_id}/matches",
+                params={"dateFrom": start.isoformat(), "dateTo": end.isoformat()},
+                cache_status=cache_status,
+            )
+            store.apply((start, end), _normalize_team_matches(data, None), time.time())
+            # Spara efter varje intervall: faller ett senare, behöver de hämtade inte hämtas om
+            cache_set(cache_key, store.to_dict(), ttl_seconds=MATCH_STORE_TTL)
+        return store
+
+    return _flights.do(cache_key, load)
+
+def _get_team_matches_window(
+    team_id: int,
+    window: Interval,
+    status: Optional[str],
+    limit: int,
+) -> List[Dict[str, Any]]:
+    started = time.perf_counter()
+    store = _load_match_store(team_id)
+    missing, stale = store.plan(window, time.time(), datetime.now(timezone.utc).date())
+    if not missing:
+        record_call("/teams/{id}/matches", time.perf_counter() - started, cache="hit")
+
+    # En samtidig uppdatering kan ha gällt ett annat fönster, så planera om efteråt
+    for _ in range(2):
+        if not missing:
+            break
+        try:
+            store = _refresh_match_store(team_id, window)
+        except (CircuitOpenError, UpstreamUnavailableError, RateLimitedError) as e:
+            if not store.coverage:
+                raise
+            _log.warning("Serving stored matches for team %s while the API is unavailable: %s", team_id, e)
+            return store.query(window, status=status, limit=limit)
+        missing, stale = store.plan(window, time.time(), datetime.now(timezone.utc).date())
+
+    if stale and not missing:
+        # Allt finns redan lokalt: svara direkt och hämta bara det som kan ha ändrats i bakgrunden
+        def revalidate() -> MatchStore:
+            with request_priority(PRIORITY_BACKGROUND):
+                return _refresh_match_store(team_id, window, cache_status="refresh")
+
+        schedule_revalidate(f"team_match_store_{team_id}", revalidate)
+
+    return store.query(window, status=status, limit=limit)
+
+# /teams/{id} innehåller både laginfo och trupp: en hämtning, en cachepost, två vyer
+def _get_team_detail(team_id: int) -> Dict[str, Any]:
+    return _cached(
+        f"team_detail_{team_id}",
+        86400,  # 24h
+        f"/teams/{team_id}",
+        _normalize_team_detail,
+        max_age_seconds=7 * 86400,
+    )
+
+def get_team(team_id: int) -> Dict[str, Any]:
+    return _get_team_detail(team_id)["team"]
+
+def get_squad(team_id: int) -> List[Dict[str, Any]]:
+    return _get_team_detail(team_id)["squad"]
+
+# 5) Competition matches by date (cached)
+
+def get_matches_by_date(
+    competition_code: str,
+    dateFrom: str,   # "YYYY-MM-DD"
+    dateTo: str,     # "YYYY-MM-DD"
+    status: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    params: Dict[str, Any] = {"dateFrom": dateFrom, "dateTo": dateTo}
+    if status:
+        params["status"] = status
+
+    return _cached(
+        f"matches_{competition_code}_{dateFrom}_{dateTo}_{status}",
+        300,  # 5 min
+        f"/competitions/{competition_code}/matches",
+        lambda data: _normalize_competition_matches(data, competition_code),
+        params=params,
+        max_age_seconds=3600,
+    )
+
+# 6) Top scorers (cachhed)
+
+def get_top_scorers(competition_code: str) -> List[Dict[str, Any]]:
+    return _cached(
+        f"top_scorers_{competition_code}",
+        3600,  # 1h
+        f"/competitions/{competition_code}/scorers",
+        lambda data: _normalize_top_scorers(data, competition_code),
+        max_age_seconds=86400,
+    )
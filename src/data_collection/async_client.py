@@ -0,0 +1,109 @@
+"""
+Async variant of the api_client surface, for fetching several endpoints at once.
+
+Each call runs the normal synchronous client in a worker thread, so caching,
+single-flight, rate limiting and error types are exactly the same. The
+caller's request priority (a context variable) is carried into the worker.
+
+    # from async code
+    info, squad = await gather(get_team(81), get_squad(81))
+
+    # from a Streamlit page (no event loop)
+    data = fetch_all({"info": get_team(81), "squad": get_squad(81)})
+
+Wall time is the slowest of the fetches instead of their sum.
+"""
+import asyncio
+import contextvars
+import functools
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from src.data_collection import api_client
+
+# Trådar som delas av alla sidor; fler än så här hinner ändå inte förbi rate-limitern
+FAN_OUT_WORKERS = int(os.getenv("FSH_FAN_OUT_WORKERS", "8"))
+
+_executor = ThreadPoolExecutor(max_workers=FAN_OUT_WORKERS, thread_name_prefix="api-fan-out")
+
+
+async def run_sync(fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking client function in the shared pool, keeping the caller's context."""
+    loop = asyncio.get_running_loop()
+    ctx = contextvars.copy_context()
+    return await loop.run_in_executor(_executor, functools.partial(ctx.run, fn, *args, **kwargs))
+
+
+async def get_standings(competition_code: str) -> List[Dict[str, Any]]:
+    return await run_sync(api_client.get_standings, competition_code)
+
+
+async def get_teams(competition_code: str) -> List[Dict[str, Any]]:
+    return await run_sync(api_client.get_teams, competition_code)
+
+
+async def get_team(team_id: int) -> Dict[str, Any]:
+    return await run_sync(api_client.get_team, team_id)
+
+
+async def get_squad(team_id: int) -> List[Dict[str, Any]]:
+    return await run_sync(api_client.get_squad, team_id)
+
+
+async def get_team_matches(
+    team_id: int,
+    dateFrom: Optional[str] = None,
+    dateTo: Optional[str] = None,
+    status: Optional[str] = None,
+    limit: int = 10,
+) -> List[Dict[str, Any]]:
+    return await run_sync(
+        api_client.get_team_matches,
+        team_id,
+        dateFrom=dateFrom,
+        dateTo=dateTo,
+        status=status,
+        limit=limit,
+    )
+
+
+async def get_matches_by_date(
+    competition_code: str,
+    dateFrom: str,
+    dateTo: str,
+    status: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    return await run_sync(api_client.get_matches_by_date, competition_code, dateFrom, dateTo, status)
+
+
+async def get_top_scorers(competition_code: str) -> List[Dict[str, Any]]:
+    return await run_sync(api_client.get_top_scorers, competition_code)
+
+
+async def gather(*calls: Awaitable[Any], return_exceptions: bool = False) -> List[Any]:
+    """
+    Await all calls concurrently, results in the same order.
+
+    Like asyncio.gather: the first ApiClientError is raised unless
+    `return_exceptions` is set, in which case errors are returned in place.
+    """
+    return list(await asyncio.gather(*calls, return_exceptions=return_exceptions))
+
+
+def fetch_all(calls: Dict[str, Awaitable[Any]], return_exceptions: bool = False) -> Dict[str, Any]:
+    """Blocking batch for code without an event loop (Streamlit pages, scripts)."""
+    async def _run() -> List[Any]:
+        return await gather(*calls.values(), return_exceptions=return_exceptions)
+
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return dict(zip(calls.keys(), asyncio.run(_run())))
+
+    for call in calls.values():
+        # Stäng coroutinerna så att de inte varnar för att aldrig ha körts
+        close = getattr(call, "close", None)
+        if close is not None:
+            close()
+    raise RuntimeError("fetch_all() cannot run inside an event loop; use 'await gather(...)'")
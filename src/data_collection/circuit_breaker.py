@@ -0,0 +1,124 @@
+"""
+Per-endpoint circuit breakers for the football-data.org API.
+
+After `failure_threshold` consecutive failed calls an endpoint is "open":
+calls fail at once instead of waiting for timeouts, and api_client serves
+stale cache. After `reset_timeout` seconds one probe call is let through
+("half_open"); if it succeeds the endpoint is closed again.
+"""
+import os
+import threading
+import time
+from typing import Any, Dict
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("FSH_BREAKER_FAILURES", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("FSH_BREAKER_RESET_SECONDS", "30"))
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        failure_threshold: int = BREAKER_FAILURE_THRESHOLD,
+        reset_timeout: float = BREAKER_RESET_TIMEOUT,
+    ):
+        self.failure_threshold = max(failure_threshold, 1)
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self.total_failures = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+            self._state = HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def retry_after(self) -> float:
+        """Seconds until the next probe is allowed (0 if calls are allowed now)."""
+        with self._lock:
+            if self._current_state() != OPEN:
+                return 0.0
+            return max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return True
+            if state == HALF_OPEN and not self._probe_in_flight:
+                # Bara ett testanrop åt gången medan vi inte vet om API:t är tillbaka
+                self._probe_in_flight = True
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._failures = 0
+            self._probe_in_flight = False
+
+    def release(self) -> None:
+        """The call ended without telling us anything about the upstream (e.g. local rate limit)."""
+        with self._lock:
+            self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self.total_failures += 1
+            self._probe_in_flight = False
+            if self._state == HALF_OPEN or self._failures >= self.failure_threshold:
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            state = self._current_state()
+            return {
+                "state": state,
+                "consecutive_failures": self._failures,
+                "total_failures": self.total_failures,
+                "rejected": self.rejected,
+                "retry_after": (
+                    max(self.reset_timeout - (time.monotonic() - self._opened_at), 0.0)
+                    if state == OPEN else 0.0
+                ),
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(endpoint: str) -> CircuitBreaker:
+    with _breakers_lock:
+        breaker = _breakers.get(endpoint)
+        if breaker is None:
+            breaker = _breakers[endpoint] = CircuitBreaker()
+        return breaker
+
+
+def breaker_states() -> Dict[str, Dict[str, Any]]:
+    """State of every endpoint seen so far, for monitoring."""
+    with _breakers_lock:
+        breakers = dict(_breakers)
+    return {endpoint: b.snapshot() for endpoint, b in sorted(breakers.items())}
+
+
+def reset_breakers() -> None:
+    with _breakers_lock:
+        _breakers.clear()
@@ -0,0 +1,148 @@
+"""
+Shared HTTP session for the football-data.org client.
+
+One pooled `requests.Session` per process, so every `get_*` call in
+api_client reuses open keep-alive connections instead of paying a new
+TCP + TLS handshake per request.
+"""
+import os
+import threading
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Antal host-pooler som hålls öppna samt max antal connections per host
+POOL_CONNECTIONS = int(os.getenv("FSH_HTTP_POOL_CONNECTIONS", "4"))
+POOL_MAXSIZE = int(os.getenv("FSH_HTTP_POOL_MAXSIZE", "8"))
+# Blockera hellre än att öppna fler connections än POOL_MAXSIZE mot samma host
+POOL_BLOCK = os.getenv("FSH_HTTP_POOL_BLOCK", "1") == "1"
+
+DEFAULT_HEADERS = {
+    "Accept": "application/json",
+    "Accept-Encoding": "gzip, deflate",
+    "Connection": "keep-alive",
+}
+
+
+class ConnectionStats:
+    """Counts connections opened versus requests sent over the pool."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.opened = 0
+        self.requests = 0
+
+    def connection_opened(self) -> None:
+        with self._lock:
+            self.opened += 1
+
+    def request_sent(self) -> None:
+        with self._lock:
+            self.requests += 1
+
+    def reset(self) -> None:
+        with self._lock:
+            self.opened = 0
+            self.requests = 0
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "opened": self.opened,
+                "reused": max(self.requests - self.opened, 0),
+                "requests": self.requests,
+            }
+
+
+_stats = ConnectionStats()
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _stats.connection_opened()
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _stats.connection_opened()
+        return super()._new_conn()
+
+
+class PooledAdapter(HTTPAdapter):
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _CountingHTTPConnectionPool,
+            "https": _CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        _stats.request_sent()
+        return super().send(request, **kwargs)
+
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+
+def _build_session(pool_connections: int, pool_maxsize: int, pool_block: bool) -> requests.Session:
+    session = requests.Session()
+    adapter = PooledAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+def get_session() -> requests.Session:
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE, POOL_BLOCK)
+    return _session
+
+
+def configure_session(
+    pool_connections: Optional[int] = None,
+    pool_maxsize: Optional[int] = None,
+    pool_block: Optional[bool] = None,
+) -> requests.Session:
+    """Replace the shared session with one using the given pool settings."""
+    global _session, POOL_CONNECTIONS, POOL_MAXSIZE, POOL_BLOCK
+    with _session_lock:
+        if pool_connections is not None:
+            POOL_CONNECTIONS = pool_connections
+        if pool_maxsize is not None:
+            POOL_MAXSIZE = pool_maxsize
+        if pool_block is not None:
+            POOL_BLOCK = pool_block
+        old = _session
+        _session = _build_session(POOL_CONNECTIONS, POOL_MAXSIZE, POOL_BLOCK)
+    if old is not None:
+        old.close()
+    return _session
+
+
+def close_session() -> None:
+    global _session
+    with _session_lock:
+        old = _session
+        _session = None
+    if old is not None:
+        old.close()
+
+
+def get_connection_stats() -> Dict[str, int]:
+    return _stats.snapshot()
+
+
+def reset_connection_stats() -> None:
+    _stats.reset()
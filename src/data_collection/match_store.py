@@ -0,0 +1,173 @@
+"""
+Per-team match store for get_team_matches.
+
+Instead of caching each (dateFrom, dateTo, limit) window separately, one
+store per team keeps the union of every match fetched so far plus the
+date intervals it covers. A request for a window only fetches the parts
+that are missing, or that are old enough to have changed, and answers
+the window/status/limit by slicing locally.
+
+How fast covered dates go stale depends on where they are:
+- dates that were already SETTLE_DAYS old when fetched: final, never refetched
+- anything else up to NEAR_FUTURE_DAYS ahead: refetched after RECENT_TTL
+- further ahead: only kickoff times move, refetched after FAR_FUTURE_TTL
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+SETTLE_DAYS = 2
+NEAR_FUTURE_DAYS = 14
+RECENT_TTL = 300          # 5 min
+FAR_FUTURE_TTL = 6 * 3600 # 6h
+
+# Inkluderande datumintervall
+Interval = Tuple[date, date]
+
+_ONE_DAY = timedelta(days=1)
+
+
+def merge(intervals: List[Interval]) -> List[Interval]:
+    """Sort and join overlapping or adjacent intervals."""
+    out: List[Interval] = []
+    for start, end in sorted(intervals):
+        if out and start <= out[-1][1] + _ONE_DAY:
+            out[-1] = (out[-1][0], max(out[-1][1], end))
+        else:
+            out.append((start, end))
+    return out
+
+
+def subtract(window: Interval, covered: List[Interval]) -> List[Interval]:
+    """Parts of `window` not covered by any of `covered`."""
+    start, end = window
+    gaps: List[Interval] = []
+    for c_start, c_end in merge(covered):
+        if c_end < start or c_start > end:
+            continue
+        if c_start > start:
+            gaps.append((start, c_start - _ONE_DAY))
+        start = max(start, c_end + _ONE_DAY)
+        if start > end:
+            return gaps
+    gaps.append((start, end))
+    return gaps
+
+
+def _intersect(a: Interval, b: Interval) -> Optional[Interval]:
+    start, end = max(a[0], b[0]), min(a[1], b[1])
+    return (start, end) if start <= end else None
+
+
+def refresh_zones(today: date) -> List[Tuple[Interval, int]]:
+    """(date range, ttl seconds) for dates that were not yet final when fetched."""
+    near_until = today + timedelta(days=NEAR_FUTURE_DAYS)
+    return [
+        ((date.min, near_until), RECENT_TTL),
+        ((near_until + _ONE_DAY, date.max), FAR_FUTURE_TTL),
+    ]
+
+
+def _final_until(fetched_at: float) -> date:
+    # Sista datumet vars matcher redan var avgjorda när intervallet hämtades
+    fetched_day = datetime.fromtimestamp(fetched_at, timezone.utc).date()
+    return fetched_day - timedelta(days=SETTLE_DAYS)
+
+
+class MatchStore:
+    def __init__(
+        self,
+        coverage: Optional[List[Tuple[date, date, float]]] = None,
+        matches: Optional[Dict[str, Dict[str, Any]]] = None,
+    ):
+        # (från, till, hämtad) – disjunkta intervall
+        self.coverage: List[Tuple[date, date, float]] = coverage or []
+        self.matches: Dict[str, Dict[str, Any]] = matches or {}
+
+    @classmethod
+    def from_dict(cls, data: Optional[Dict[str, Any]]) -> "MatchStore":
+        if not data:
+            return cls()
+        coverage = [
+            (date.fromisoformat(start), date.fromisoformat(end), fetched_at)
+            for start, end, fetched_at in data.get("coverage", [])
+        ]
+        # Kopia, så att cachens delade objekt aldrig ändras
+        return cls(coverage, dict(data.get("matches", {})))
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "coverage": [[s.isoformat(), e.isoformat(), t] for s, e, t in self.coverage],
+            "matches": self.matches,
+        }
+
+    def plan(self, window: Interval, now: float, today: date) -> Tuple[List[Interval], List[Interval]]:
+        """
+        Split the work needed to answer `window` into (missing, stale):
+        dates never fetched, and covered dates old enough to be refetched.
+        """
+        missing = subtract(window, [(s, e) for s, e, _ in self.coverage])
+
+        stale: List[Interval] = []
+        for start, end, fetched_at in self.coverage:
+            part = _intersect((start, end), window)
+            if part is None:
+                continue
+            unsettled = _intersect(part, (_final_until(fetched_at) + _ONE_DAY, date.max))
+            if unsettled is None:
+                continue
+            for zone, ttl in refresh_zones(today):
+                if now - fetched_at > ttl:
+                    overlap = _intersect(unsettled, zone)
+                    if overlap is not None:
+                        stale.append(overlap)
+        return merge(missing), merge(stale)
+
+    def apply(self, interval: Interval, rows: List[Dict[str, Any]], fetched_at: float) -> None:
+        """Replace everything known about `interval` with a fresh fetch of it."""
+        start, end = interval
+        start_iso, end_iso = start.isoformat(), end.isoformat()
+        # Matcher som flyttats ut ur intervallet ska inte ligga kvar på sitt gamla datum
+        self.matches = {
+            match_id: row for match_id, row in self.matches.items()
+            if not (start_iso <= (row.get("utc_date") or "")[:10] <= end_iso)
+        }
+        for row in rows:
+            if row.get("match_id") is not None:
+                self.matches[str(row["match_id"])] = row
+
+        coverage: List[Tuple[date, date, float]] = []
+        for c_start, c_end, c_fetched in self.coverage:
+            for gap_start, gap_end in subtract((c_start, c_end), [interval]):
+                coverage.append((gap_start, gap_end, c_fetched))
+        coverage.append((start, end, fetched_at))
+        self.coverage = self._compact(coverage)
+
+    @staticmethod
+    def _compact(coverage: List[Tuple[date, date, float]]) -> List[Tuple[date, date, float]]:
+        # Slå ihop angränsande intervall som hämtades samtidigt, eller som båda är slutgiltiga
+        # (då spelar hämtningstiden ingen roll längre)
+        out: List[Tuple[date, date, float]] = []
+        for start, end, fetched_at in sorted(coverage):
+            if out and start <= out[-1][1] + _ONE_DAY:
+                prev_start, prev_end, prev_fetched = out[-1]
+                both_final = prev_end <= _final_until(prev_fetched) and end <= _final_until(fetched_at)
+                if prev_fetched == fetched_at or both_final:
+                    out[-1] = (prev_start, max(prev_end, end), max(prev_fetched, fetched_at))
+                    continue
+            out.append((start, end, fetched_at))
+        return out
+
+    def query(
+        self,
+        window: Interval,
+        status: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> List[Dict[str, Any]]:
+        start_iso, end_iso = window[0].isoformat(), window[1].isoformat()
+        rows = [
+            row for row in self.matches.values()
+            if start_iso <= (row.get("utc_date") or "")[:10] <= end_iso
+            and (status is None or row.get("status") == status)
+        ]
+        rows.sort(key=lambda r: (r.get("utc_date") or "", r.get("match_id") or 0))
+        return rows[:limit]
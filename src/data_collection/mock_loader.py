@@ -0,0 +1,474 @@
+"""
+Seeded football-data.org data for the mock API server and benchmarks.
+
+Builds full seasons per competition: a double round-robin schedule with
+seeded scores, squads, goal scorers and the standings table that follows
+from the results. The three supported leagues use their real teams from
+data/lookup; `generate` adds synthetic competitions, past seasons and
+bigger squads to reach production scale.
+
+Payloads come in the raw /v4 response shape, so api_client normalizes them
+exactly like real API data. `normalized_payloads` and `write_to_cache` go
+one step further and give the rows api_client would have cached, under
+the same cache keys. The same seed and `today` always give the same data.
+"""
+import json
+import random
+import time as _time
+from datetime import date, datetime, time, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from src.data_collection import api_client
+from src.data_collection.match_store import MatchStore
+from src.utils.cache import cache_set_many
+
+LOOKUP_DIR = Path("data/lookup")
+
+LOOKUP_FILES = {
+    "PD": ("La Liga", "Spain", "la_liga_teams.json"),
+    "PL": ("Premier League", "England", "premier_league_teams.json"),
+    "SA": ("Serie A", "Italy", "serie_a_teams.json"),
+}
+
+# Truppens sammansättning per position, som andelar av truppstorleken
+SQUAD_SHARES = [("Goalkeeper", 0.12), ("Defence", 0.32), ("Midfield", 0.32), ("Offence", 0.24)]
+DEFAULT_SQUAD_SIZE = 25
+# Chans att en spelare på positionen gör ett visst mål
+SCORER_WEIGHTS = {"Goalkeeper": 0, "Defence": 1, "Midfield": 3, "Offence": 8}
+
+KICKOFF_TIMES = [time(13, 0), time(15, 0), time(17, 30), time(19, 0), time(20, 0)]
+
+FIRST_NAMES = [
+    "Álvaro", "Andrea", "Ben", "Bruno", "Dani", "Federico", "Gonzalo", "Harry", "Iñaki",
+    "Jack", "João", "Jules", "Kai", "Lorenzo", "Luka", "Marco", "Mateo", "Nicolò",
+    "Oliver", "Pedro", "Raúl", "Sergio", "Thiago", "Tom", "Youssef",
+]
+LAST_NAMES = [
+    "Barella", "Bellingham", "Chiesa", "Dias", "Fernández", "García", "Gündoğan", "Hernández",
+    "Kane", "López", "Martínez", "Mbappé", "Müller", "Núñez", "Pérez", "Rodríguez", "Rossi",
+    "Saka", "Silva", "Smith", "Sánchez", "Tonali", "Vázquez", "Walker", "Ødegaard",
+]
+NATIONALITIES = ["Spain", "England", "Italy", "France", "Brazil", "Argentina", "Portugal", "Germany"]
+
+# Syntetiska ligor: land och ortnamn att bygga lagnamn av
+COUNTRIES = ["Portugal", "France", "Germany", "Netherlands", "Belgium", "Scotland", "Austria", "Sweden"]
+CLUB_PREFIXES = ["FC", "Real", "Sporting", "Atlético", "Racing", "Union", "Dynamo", "AC", "SC", "Club"]
+TOWN_PARTS = [
+    "Val", "Monte", "Brück", "Santa", "Nord", "Río", "Lago", "Wester", "Côte", "Alt",
+    "Ber", "Fjäll", "Mar", "Sankt", "Porto", "Villa",
+]
+TOWN_ENDINGS = ["bruna", "heim", "ville", "rosa", "stad", "mont", "dal", "burg", "lena", "ford", "ança", "ås"]
+
+# Samma livslängd som api_client ger respektive cachepost
+CACHE_TTLS = {
+    "standings": 6 * 3600,
+    "teams": 7 * 86400,
+    "top_scorers": 86400,
+    "team_detail": 7 * 86400,
+    "team_match_store": api_client.MATCH_STORE_TTL,
+}
+
+
+def _season_start(today: date) -> date:
+    year = today.year if today.month >= 7 else today.year - 1
+    return date(year, 8, 15)
+
+
+def _round_robin(team_ids: List[int]) -> List[List[tuple]]:
+    """Circle-method schedule: every team meets every other team home and away."""
+    ids = list(team_ids)
+    if len(ids) % 2:
+        ids.append(None)
+    half = len(ids) // 2
+    rounds = []
+    for r in range(len(ids) - 1):
+        pairs = []
+        for i in range(half):
+            home, away = ids[i], ids[-1 - i]
+            if home is None or away is None:
+                continue
+            pairs.append((home, away) if r % 2 == 0 else (away, home))
+        rounds.append(pairs)
+        ids = [ids[0]] + [ids[-1]] + ids[1:-1]
+    return rounds + [[(away, home) for home, away in pairs] for pairs in rounds]
+
+
+def _in_window(utc_date: str, date_from: Optional[str], date_to: Optional[str]) -> bool:
+    day = utc_date[:10]
+    return (not date_from or day >= date_from) and (not date_to or day <= date_to)
+
+
+def _status_filter(status: Optional[str]) -> Optional[set]:
+    return set(status.split(",")) if status else None
+
+
+class MockLeagueData:
+    """Raw /v4 payloads for a set of competitions, answered like the real API."""
+
+    def __init__(
+        self,
+        seed: int = 0,
+        today: Optional[date] = None,
+        seasons: int = 1,
+        squad_size: int = DEFAULT_SQUAD_SIZE,
+    ):
+        self.seed = seed
+        self.today = today or datetime.now(timezone.utc).date()
+        current = _season_start(self.today).year
+        # Startår per säsong, äldst först; den sista är innevarande säsong
+        self.seasons: List[int] = list(range(current - seasons + 1, current + 1))
+        self.squad_size = squad_size
+
+        self.competitions: Dict[str, Dict[str, Any]] = {}
+        self.competition_teams: Dict[str, List[int]] = {}
+        self.teams: Dict[int, Dict[str, Any]] = {}
+        self.squads: Dict[int, List[Dict[str, Any]]] = {}
+        # Per (liga, säsong) samt per lag, sorterade på datum
+        self.matches: Dict[Tuple[str, int], List[Dict[str, Any]]] = {}
+        self.team_match_index: Dict[int, List[Dict[str, Any]]] = {}
+        self.goals: Dict[Tuple[str, int], Dict[int, Dict[str, int]]] = {}
+        self._next_player_id = 100000
+
+    @classmethod
+    def from_lookup(
+        cls,
+        seed: int = 0,
+        today: Optional[date] = None,
+        lookup_dir: Path = LOOKUP_DIR,
+        seasons: int = 1,
+        squad_size: int = DEFAULT_SQUAD_SIZE,
+    ) -> "MockLeagueData":
+        """The three supported leagues with their real teams from data/lookup."""
+        data = cls(seed, today, seasons=seasons, squad_size=squad_size)
+        for code, (name, country, filename) in LOOKUP_FILES.items():
+            rows = json.loads((lookup_dir / filename).read_text(encoding="utf-8"))
+            data.add_competition(code, name, country, rows)
+        return data
+
+    @classmethod
+    def generate(
+        cls,
+        competitions: int = 3,
+        seasons: int = 1,
+        teams_per_competition: int = 20,
+        squad_size: int = DEFAULT_SQUAD_SIZE,
+        seed: int = 0,
+        today: Optional[date] = None,
+        lookup_dir: Path = LOOKUP_DIR,
+    ) -> "MockLeagueData":
+        """
+        The supported leagues plus synthetic ones up to `competitions` in
+        total, each with `seasons` seasons ending with the current one.
+        """
+        data = cls.from_lookup(seed, today, lookup_dir, seasons=seasons, squad_size=squad_size)
+        for index in range(1, competitions - len(data.competitions) + 1):
+            code = f"X{index:02d}"
+            country = COUNTRIES[(index - 1) % len(COUNTRIES)]
+            data.add_competition(
+                code,
+                f"{country} League {index}",
+                country,
+                data._synthetic_teams(index, teams_per_competition),
+            )
+        return data
+
+    def _rng(self, *parts: Any) -> random.Random:
+        # Egen generator per del, så att en ny liga inte ändrar data för de andra
+        return random.Random(":".join(str(p) for p in (self.seed,) + parts))
+
+    def _synthetic_teams(self, index: int, count: int) -> List[Dict[str, Any]]:
+        if count > len(TOWN_PARTS) * len(TOWN_ENDINGS):
+            raise ValueError(f"At most {len(TOWN_PARTS) * len(TOWN_ENDINGS)} teams per synthetic competition")
+        rng = self._rng("teams", index)
+        rows, seen = [], set()
+        while len(rows) < count:
+            town = rng.choice(TOWN_PARTS) + rng.choice(TOWN_ENDINGS)
+            if town in seen:
+                continue
+            seen.add(town)
+            team_id = 20000 + index * 1000 + len(rows)
+            rows.append({
+                "team_id": team_id,
+                "name": f"{rng.choice(CLUB_PREFIXES)} {town}",
+                "shortName": town,
+                "tla": town[:3].upper(),
+                "crest": f"https://crests.football-data.org/{team_id}.png",
+            })
+        return rows
+
+    def add_competition(self, code: str, name: str, country: str, team_rows: Iterable[Dict[str, Any]]) -> None:
+        """Add a competition from team rows shaped like get_teams() output."""
+        self.competitions[code] = {
+            "id": 2000 + len(self.competitions),
+            "code": code,
+            "name": name,
+            "area": {"name": country},
+        }
+        ids: List[int] = []
+        for row in team_rows:
+            team_id = int(row["team_id"])
+            ids.append(team_id)
+            self.teams[team_id] = self._team(team_id, row, country)
+            self.squads[team_id] = self._squad(team_id)
+            self.team_match_index.setdefault(team_id, [])
+        self.competition_teams[code] = ids
+        for season in self.seasons:
+            self._play_season(code, season)
+        for team_id in ids:
+            self.team_match_index[team_id].sort(key=lambda m: m["utcDate"])
+
+    def _team(self, team_id: int, row: Dict[str, Any], country: str) -> Dict[str, Any]:
+        rng = self._rng("team", team_id)
+        short = row.get("shortName") or row["name"]
+        return {
+            "id": team_id,
+            "name": row["name"],
+            "shortName": short,
+            "tla": row.get("tla") or short[:3].upper(),
+            "crest": row.get("crest") or f"https://crests.football-data.org/{team_id}.png",
+            "area": {"name": country},
+            "venue": f"Estadio {short}" if country == "Spain" else f"{short} Stadium",
+            "founded": rng.randint(1870, 1960),
+            "clubColors": " / ".join(rng.sample(["Red", "White", "Blue", "Black", "Green", "Yellow"], 2)),
+            "website": f"https://www.{short.lower().replace(' ', '')}.example",
+        }
+
+    def _squad(self, team_id: int) -> List[Dict[str, Any]]:
+        rng = self._rng("squad", team_id)
+        counts = [max(1, round(self.squad_size * share)) for _, share in SQUAD_SHARES]
+        # Avrundningen justeras på mittfältet så att summan blir exakt squad_size
+        counts[2] += self.squad_size - sum(counts)
+        squad = []
+        for (position, _), count in zip(SQUAD_SHARES, counts):
+            for _ in range(count):
+                squad.append({
+                    "id": self._next_player_id,
+                    "name": f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+                    "position": position,
+                    "dateOfBirth": f"{rng.randint(1988, 2007)}-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+                    "nationality": rng.choice(NATIONALITIES),
+                })
+                self._next_player_id += 1
+        return squad
+
+    def _play_season(self, code: str, season: int) -> None:
+        rng = self._rng("season", code, season)
+        start = date(season, 8, 15)
+        now = datetime.combine(self.today, time(12, 0), tzinfo=timezone.utc)
+        competition = {"id": self.competitions[code]["id"], "code": code, "name": self.competitions[code]["name"]}
+
+        matches: List[Dict[str, Any]] = []
+        goals: Dict[int, Dict[str, int]] = {}
+        for matchday, pairs in enumerate(_round_robin(self.competition_teams[code]), start=1):
+            day = start + timedelta(days=7 * (matchday - 1))
+            for home_id, away_id in pairs:
+                kickoff = datetime.combine(
+                    day + timedelta(days=rng.randint(0, 2)), rng.choice(KICKOFF_TIMES), tzinfo=timezone.utc
+                )
+                finished = kickoff + timedelta(hours=2) < now
+                score = {"home": None, "away": None}
+                if finished:
+                    score = {"home": rng.choice([0, 0, 1, 1, 1, 2, 2, 3, 4]), "away": rng.choice([0, 0, 1, 1, 2, 2, 3])}
+                    self._assign_goals(rng, goals, home_id, score["home"])
+                    self._assign_goals(rng, goals, away_id, score["away"])
+                match = {
+                    "id": int(f"{self.competitions[code]['id']}{season % 100:02d}{len(matches):04d}"),
+                    "competition": competition,
+                    "season": {"startDate": start.isoformat(), "currentMatchday": None},
+                    "utcDate": kickoff.strftime("%Y-%m-%dT%H:%M:%SZ"),
+                    "status": "FINISHED" if finished else "SCHEDULED",
+                    "matchday": matchday,
+                    "homeTeam": self._team_ref(home_id),
+                    "awayTeam": self._team_ref(away_id),
+                    "score": {"fullTime": score},
+                }
+                matches.append(match)
+                self.team_match_index[home_id].append(match)
+                self.team_match_index[away_id].append(match)
+        matches.sort(key=lambda m: m["utcDate"])
+        self.matches[(code, season)] = matches
+        self.goals[(code, season)] = goals
+
+    def _assign_goals(self, rng: random.Random, goals: Dict[int, Dict[str, int]], team_id: int, count: int) -> None:
+        squad = self.squads[team_id]
+        weights = [SCORER_WEIGHTS[p["position"]] for p in squad]
+        for _ in range(count):
+            scorer = rng.choices(squad, weights)[0]
+            stats = goals.setdefault(scorer["id"], {"team_id": team_id, "goals": 0, "assists": 0})
+            stats["goals"] += 1
+            if rng.random() < 0.7:
+                assister = rng.choice([p for p in squad if p is not scorer])
+                goals.setdefault(assister["id"], {"team_id": team_id, "goals": 0, "assists": 0})["assists"] += 1
+
+    def _team_ref(self, team_id: int) -> Dict[str, Any]:
+        team = self.teams[team_id]
+        return {k: team[k] for k in ("id", "name", "shortName", "tla", "crest")}
+
+    def _season(self, season: Optional[int]) -> Optional[int]:
+        if season is None:
+            return self.seasons[-1]
+        return season if season in self.seasons else None
+
+    def _filter_matches(
+        self,
+        matches: Iterable[Dict[str, Any]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+        status: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        statuses = _status_filter(status)
+        return [
+            m for m in matches
+            if _in_window(m["utcDate"], date_from, date_to) and (statuses is None or m["status"] in statuses)
+        ]
+
+    def match_count(self) -> int:
+        return sum(len(matches) for matches in self.matches.values())
+
+    # Payloads i samma form som /v4 svarar med; None betyder 404.
+    # `season` är startåret, som i API:ts ?season=, och innevarande säsong om det saknas.
+
+    def standings(self, code: str, season: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        season = self._season(season)
+        if code not in self.competitions or season is None:
+            return None
+        table: Dict[int, Dict[str, int]] = {
+            team_id: {"playedGames": 0, "won": 0, "draw": 0, "lost": 0, "goalsFor": 0, "goalsAgainst": 0}
+            for team_id in self.competition_teams[code]
+        }
+        for m in self.matches[(code, season)]:
+            if m["status"] != "FINISHED":
+                continue
+            home, away = m["homeTeam"]["id"], m["awayTeam"]["id"]
+            gh, ga = m["score"]["fullTime"]["home"], m["score"]["fullTime"]["away"]
+            for team_id, scored, conceded in ((home, gh, ga), (away, ga, gh)):
+                row = table[team_id]
+                row["playedGames"] += 1
+                row["goalsFor"] += scored
+                row["goalsAgainst"] += conceded
+                row["won" if scored > conceded else "lost" if scored < conceded else "draw"] += 1
+
+        rows = []
+        for team_id, row in table.items():
+            rows.append({
+                "team": self._team_ref(team_id),
+                **row,
+                "points": row["won"] * 3 + row["draw"],
+                "goalDifference": row["goalsFor"] - row["goalsAgainst"],
+            })
+        rows.sort(key=lambda r: (-r["points"], -r["goalDifference"], -r["goalsFor"], r["team"]["name"]))
+        for position, row in enumerate(rows, start=1):
+            row["position"] = position
+        return {
+            "competition": self.competitions[code],
+            "season": {"startDate": date(season, 8, 15).isoformat()},
+            "standings": [{"stage": "REGULAR_SEASON", "type": "TOTAL", "table": rows}],
+        }
+
+    def competition_teams_payload(self, code: str) -> Optional[Dict[str, Any]]:
+        if code not in self.competitions:
+            return None
+        teams = [self.teams[team_id] for team_id in self.competition_teams[code]]
+        return {"competition": self.competitions[code], "count": len(teams), "teams": teams}
+
+    def competition_matches(
+        self,
+        code: str,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        status: Optional[str] = None,
+        season: Optional[int] = None,
+    ) -> Optional[Dict[str, Any]]:
+        if code not in self.competitions:
+            return None
+        if date_from or date_to:
+            # Ett datumfilter gäller över säsongsgränser, som i API:t
+            pool = [m for s in self.seasons for m in self.matches[(code, s)]]
+        else:
+            season = self._season(season)
+            if season is None:
+                return None
+            pool = self.matches[(code, season)]
+        matches = self._filter_matches(pool, date_from, date_to, status)
+        return {"competition": self.competitions[code], "resultSet": {"count": len(matches)}, "matches": matches}
+
+    def scorers(self, code: str, limit: int = 10, season: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        season = self._season(season)
+        if code not in self.competitions or season is None:
+            return None
+        players = {p["id"]: p for team_id in self.competition_teams[code] for p in self.squads[team_id]}
+        played = {team_id: 0 for team_id in self.competition_teams[code]}
+        for m in self.matches[(code, season)]:
+            if m["status"] == "FINISHED":
+                played[m["homeTeam"]["id"]] += 1
+                played[m["awayTeam"]["id"]] += 1
+
+        ranked = sorted(
+            ((player_id, stats) for player_id, stats in self.goals[(code, season)].items() if stats["goals"]),
+            key=lambda item: (-item[1]["goals"], -item[1]["assists"], players[item[0]]["name"]),
+        )[:limit]
+        scorers = []
+        for player_id, stats in ranked:
+            player = players[player_id]
+            scorers.append({
+                "player": {k: player[k] for k in ("id", "name", "dateOfBirth", "nationality")},
+                "team": self._team_ref(stats["team_id"]),
+                "playedMatches": played[stats["team_id"]],
+                "goals": stats["goals"],
+                "assists": stats["assists"] or None,
+                "penalties": None,
+            })
+        return {"competition": self.competitions[code], "count": len(scorers), "scorers": scorers}
+
+    def team(self, team_id: int) -> Optional[Dict[str, Any]]:
+        if team_id not in self.teams:
+            return None
+        return {**self.teams[team_id], "squad": self.squads[team_id]}
+
+    def team_matches(
+        self,
+        team_id: int,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        status: Optional[str] = None,
+    ) -> Optional[Dict[str, Any]]:
+        if team_id not in self.teams:
+            return None
+        matches = self._filter_matches(self.team_match_index[team_id], date_from, date_to, status)
+        return {"resultSet": {"count": len(matches)}, "matches": matches}
+
+
+def normalized_payloads(data: MockLeagueData) -> Dict[str, Dict[str, Any]]:
+    """
+    What api_client would have cached after fetching everything once:
+    {kind: {cache key: normalized rows}}, kind being a CACHE_TTLS key.
+    """
+    out: Dict[str, Dict[str, Any]] = {kind: {} for kind in CACHE_TTLS}
+    for code in data.competitions:
+        out["standings"][f"standings_{code}"] = api_client._normalize_standings(data.standings(code), code)
+        out["teams"][f"teams_{code}"] = api_client._normalize_teams(data.competition_teams_payload(code))
+        out["top_scorers"][f"top_scorers_{code}"] = api_client._normalize_top_scorers(data.scorers(code), code)
+
+    # Hela den genererade perioden räknas som hämtad nu
+    coverage = (date(data.seasons[0], 7, 1), date(data.seasons[-1] + 1, 6, 30))
+    fetched_at = _time.time()
+    for team_id in data.teams:
+        out["team_detail"][f"team_detail_{team_id}"] = api_client._normalize_team_detail(data.team(team_id))
+
+        store = MatchStore()
+        rows = api_client._normalize_team_matches(data.team_matches(team_id), None)
+        store.apply(coverage, rows, fetched_at)
+        out["team_match_store"][f"team_match_store_{team_id}"] = store.to_dict()
+    return out
+
+
+def write_to_cache(data: MockLeagueData, batch_size: int = 500) -> int:
+    """Store every normalized payload in the current cache backend; returns the entry count."""
+    written = 0
+    for kind, items in normalized_payloads(data).items():
+        keys = list(items)
+        for i in range(0, len(keys), batch_size):
+            cache_set_many({key: items[key] for key in keys[i:i + batch_size]}, ttl_seconds=CACHE_TTLS[kind])
+        written += len(keys)
+    return written
@@ -0,0 +1,248 @@
+"""
+Local stand-in for api.football-data.org/v4, for offline and load testing.
+
+Serves the endpoints api_client calls from MockLeagueData, with optional
+injected latency, 5xx errors and 429 answers (random or from a per-minute
+quota, like the real free tier). Answers carry an ETag and honour
+If-None-Match, so conditional refreshes can be tested too.
+
+    with MockApiServer(latency=0.05, error_rate=0.01) as server:
+        os.environ["FSH_API_BASE_URL"] = server.base_url
+        ...
+
+Or from a shell: python -m scripts.mock_api --port 8090
+"""
+import hashlib
+import json
+import random
+import re
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Deque, Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from src.data_collection.mock_loader import MockLeagueData
+
+_ROUTES = [
+    (re.compile(r"^/v4/competitions/(?P<code>[A-Z0-9]+)/standings$"), "/competitions/{code}/standings"),
+    (re.compile(r"^/v4/competitions/(?P<code>[A-Z0-9]+)/teams$"), "/competitions/{code}/teams"),
+    (re.compile(r"^/v4/competitions/(?P<code>[A-Z0-9]+)/matches$"), "/competitions/{code}/matches"),
+    (re.compile(r"^/v4/competitions/(?P<code>[A-Z0-9]+)/scorers$"), "/competitions/{code}/scorers"),
+    (re.compile(r"^/v4/teams/(?P<id>\d+)$"), "/teams/{id}"),
+    (re.compile(r"^/v4/teams/(?P<id>\d+)/matches$"), "/teams/{id}/matches"),
+]
+
+
+def _payload(data: MockLeagueData, endpoint: str, args: Dict[str, str], query: Dict[str, str]) -> Optional[Dict[str, Any]]:
+    date_from, date_to, status = query.get("dateFrom"), query.get("dateTo"), query.get("status")
+    season = int(query["season"]) if query.get("season", "").isdigit() else None
+    if endpoint == "/competitions/{code}/standings":
+        return data.standings(args["code"], season)
+    if endpoint == "/competitions/{code}/teams":
+        return data.competition_teams_payload(args["code"])
+    if endpoint == "/competitions/{code}/matches":
+        return data.competition_matches(args["code"], date_from, date_to, status, season)
+    if endpoint == "/competitions/{code}/scorers":
+        return data.scorers(args["code"], int(query.get("limit", 10)), season)
+    if endpoint == "/teams/{id}":
+        return data.team(int(args["id"]))
+    return data.team_matches(int(args["id"]), date_from, date_to, status)
+
+
+class _MockApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, som det riktiga API:t
+    server: "_MockHTTPServer"
+
+    def do_GET(self):
+        mock = self.server.mock
+        url = urlsplit(self.path)
+        query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+
+        for pattern, endpoint in _ROUTES:
+            match = pattern.match(url.path)
+            if match:
+                break
+        else:
+            endpoint, match = None, None
+
+        delay = mock.draw_latency()
+        if delay:
+            time.sleep(delay)
+
+        if not self.headers.get("X-Auth-Token"):
+            return self._error(endpoint, 403, "The resource you are looking for is restricted. Please pass a valid API token.")
+        if endpoint is None:
+            return self._error(endpoint, 404, f"The resource '{url.path}' does not exist.")
+
+        reset = mock.take_quota()
+        if reset is not None:
+            return self._error(
+                endpoint,
+                429,
+                f"You reached your request limit. Wait {reset} seconds.",
+                {"X-RequestCounter-Reset": str(reset), "Retry-After": str(reset)},
+            )
+        if mock.draw_error():
+            return self._error(endpoint, 503, "Service temporarily unavailable.")
+
+        body = mock.body(endpoint, match.groupdict(), query)
+        if body is None:
+            return self._error(endpoint, 404, "The resource you are looking for does not exist.")
+
+        etag = '"' + hashlib.sha1(body).hexdigest()[:20] + '"'
+        if self.headers.get("If-None-Match") == etag:
+            mock.record(endpoint, 304)
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+
+        mock.record(endpoint, 200)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, endpoint: Optional[str], status: int, message: str, headers: Optional[Dict[str, str]] = None):
+        self.server.mock.record(endpoint or "unknown", status)
+        body = json.dumps({"message": message, "errorCode": status}).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json;charset=UTF-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class _MockHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    mock: "MockApiServer"
+
+
+class MockApiServer:
+    """
+    Threaded HTTP server answering /v4 requests from a MockLeagueData.
+
+    latency/jitter: seconds added to every answer (latency + uniform 0..jitter)
+    error_rate: share of requests answered 503
+    rate_limit_rate: share of requests answered 429
+    quota_per_minute: answer 429 once this many requests hit the last 60 s
+    """
+
+    def __init__(
+        self,
+        data: Optional[MockLeagueData] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        rate_limit_rate: float = 0.0,
+        quota_per_minute: Optional[int] = None,
+        seed: int = 0,
+    ):
+        self.data = data if data is not None else MockLeagueData.from_lookup(seed)
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.quota_per_minute = quota_per_minute
+
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._window: Deque[float] = deque()
+        self._bodies: Dict[Tuple[str, str], bytes] = {}
+        self._stats: Dict[str, Dict[int, int]] = {}
+
+        self._httpd = _MockHTTPServer((host, port), _MockApiHandler)
+        self._httpd.mock = self
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v4"
+
+    def start(self) -> "MockApiServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="mock-api", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self) -> None:
+        self._httpd.serve_forever()
+
+    def stop(self) -> None:
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def __enter__(self) -> "MockApiServer":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+    def draw_latency(self) -> float:
+        if not self.jitter:
+            return self.latency
+        with self._lock:
+            return self.latency + self._rng.uniform(0, self.jitter)
+
+    def draw_error(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._rng.random() < self.error_rate
+
+    def take_quota(self) -> Optional[int]:
+        """Seconds until the caller may retry, or None if the request is allowed."""
+        with self._lock:
+            if self.rate_limit_rate and self._rng.random() < self.rate_limit_rate:
+                return 1
+            if self.quota_per_minute is None:
+                return None
+            now = time.monotonic()
+            while self._window and now - self._window[0] >= 60:
+                self._window.popleft()
+            if len(self._window) >= self.quota_per_minute:
+                return max(int(60 - (now - self._window[0])) + 1, 1)
+            self._window.append(now)
+            return None
+
+    def body(self, endpoint: str, args: Dict[str, str], query: Dict[str, str]) -> Optional[bytes]:
+        # Datan ändras inte medan servern kör, så varje svar serialiseras bara en gång
+        key = (endpoint, json.dumps([args, query], sort_keys=True))
+        body = self._bodies.get(key)
+        if body is None:
+            payload = _payload(self.data, endpoint, args, query)
+            if payload is None:
+                return None
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+    def record(self, endpoint: str, status: int) -> None:
+        with self._lock:
+            counts = self._stats.setdefault(endpoint, {})
+            counts[status] = counts.get(status, 0) + 1
+
+    def stats(self) -> Dict[str, Dict[int, int]]:
+        """Answers sent so far, per endpoint and status code."""
+        with self._lock:
+            return {endpoint: dict(counts) for endpoint, counts in self._stats.items()}
+
+    def reset_stats(self) -> None:
+        with self._lock:
+            self._stats.clear()
+            self._window.clear()
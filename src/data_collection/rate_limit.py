@@ -0,0 +1,221 @@
+"""
+Process-wide token-bucket rate limiter for the football-data.org API.
+
+All Streamlit sessions run as threads in the same process, so one shared
+limiter keeps concurrent users inside the per-minute quota. Requests over
+the budget queue by priority: the page that is rendering goes before
+background warmers.
+"""
+import heapq
+import itertools
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Deque, Dict, Iterator, List, Optional
+
+from src.utils.metrics import RATE_LIMIT_QUEUE_DEPTH
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BACKGROUND = 10
+
+# Free tier: 10 anrop/minut. Ingen 60-sekundersperiod får släppa igenom fler än kvoten.
+RATE_LIMIT_PER_MINUTE = int(os.getenv("FOOTBALL_DATA_RATE_LIMIT", "10"))
+RATE_LIMIT_BURST = os.getenv("FOOTBALL_DATA_BURST")
+
+_priority: ContextVar[int] = ContextVar("api_request_priority", default=PRIORITY_INTERACTIVE)
+# Längsta kötid som anropen i ett block accepterar; None väntar hur länge som helst
+_max_wait: ContextVar[Optional[float]] = ContextVar("api_request_max_wait", default=None)
+
+
+class RateLimitExceeded(Exception):
+    """Raised when the estimated wait for a slot is longer than the caller accepts."""
+
+    def __init__(self, estimated_wait: float):
+        super().__init__(f"Rate limit budget used up, next slot in ~{estimated_wait:.1f}s")
+        self.estimated_wait = estimated_wait
+
+
+class RateLimiter:
+    """
+    Token bucket with a sliding-window log and a priority wait queue.
+
+    `capacity` tokens can be spent at once and tokens refill at
+    `per_minute / 60` per second, so sustained throughput is the full quota.
+    The times of the last `per_minute` admissions are kept as well, and a
+    request is only admitted once the oldest of them is 60 seconds old, so
+    no 60 second window ever admits more than `per_minute` requests.
+    """
+
+    def __init__(
+        self,
+        per_minute: int,
+        burst: Optional[int] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        if per_minute < 1:
+            raise ValueError("per_minute must be at least 1")
+        if burst is None:
+            burst = max(per_minute // 2, 1)
+        self.per_minute = per_minute
+        self.capacity = max(min(burst, per_minute), 1)
+        self.rate = per_minute / 60.0
+        self._clock = clock
+
+        self._cond = threading.Condition()
+        self._tokens = float(self.capacity)
+        self._updated = clock()
+        # Tidpunkterna för de senaste per_minute insläppta anropen, äldst först
+        self._admitted: Deque[float] = deque(maxlen=per_minute)
+        self._paused_until = 0.0
+        self._queue: List[tuple] = []
+        self._seq = itertools.count()
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    def _wait_for(self, slots_ahead: int, now: float) -> float:
+        # Sekunder tills det finns en token för den som har `slots_ahead` framför sig
+        missing = slots_ahead + 1 - self._tokens
+        wait = missing / self.rate if missing > 0 else 0.0
+        # ...och tills fönstret har plats: insläppet som då är per_minute anrop gammalt måste ha
+        # fallit ur. Ligger det längre fram än loggen täcker sätter tokenväntan redan gränsen.
+        oldest = slots_ahead + len(self._admitted) - self.per_minute
+        if 0 <= oldest < len(self._admitted):
+            wait = max(wait, self._admitted[oldest] + 60.0 - now)
+        return max(wait, self._paused_until - now, 0.0)
+
+    def estimate_wait(self, priority: Optional[int] = None) -> float:
+        """Expected seconds until a new request with this priority would be admitted."""
+        if priority is None:
+            priority = current_priority()
+        with self._cond:
+            now = self._clock()
+            self._refill(now)
+            ahead = sum(1 for p, _ in self._queue if p <= priority)
+            return self._wait_for(ahead, now)
+
+    def acquire(self, priority: Optional[int] = None, max_wait: Optional[float] = None) -> float:
+        """
+        Block until a request may be sent. Returns the seconds spent waiting.
+        Raises RateLimitExceeded up front if the estimate is above `max_wait`
+        (default: the block's request_max_wait).
+        """
+        if priority is None:
+            priority = current_priority()
+        if max_wait is None:
+            max_wait = current_max_wait()
+        start = self._clock()
+        with self._cond:
+            self._refill(start)
+            if max_wait is not None:
+                ahead = sum(1 for p, _ in self._queue if p <= priority)
+                estimate = self._wait_for(ahead, start)
+                if estimate > max_wait:
+                    raise RateLimitExceeded(estimate)
+
+            ticket = (priority, next(self._seq))
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    now = self._clock()
+                    self._refill(now)
+                    if self._queue[0] == ticket:
+                        wait = self._wait_for(0, now)
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            self._tokens -= 1
+                            self._admitted.append(now)
+                            self._cond.notify_all()
+                            return now - start
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                if ticket in self._queue:
+                    self._queue.remove(ticket)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                raise
+
+    def pause(self, seconds: float) -> None:
+        """Upstream said we are over quota: stop admitting requests for `seconds`."""
+        with self._cond:
+            now = self._clock()
+            self._refill(now)
+            self._tokens = 0.0
+            self._paused_until = max(self._paused_until, now + seconds)
+            self._cond.notify_all()
+
+    def queue_depth(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def stats(self) -> Dict[str, float]:
+        with self._cond:
+            now = self._clock()
+            self._refill(now)
+            return {
+                "per_minute": self.per_minute,
+                "capacity": self.capacity,
+                "tokens": round(self._tokens, 3),
+                "last_minute": sum(1 for t in self._admitted if t > now - 60.0),
+                "queued": len(self._queue),
+                "paused_for": round(max(self._paused_until - now, 0.0), 3),
+            }
+
+
+_limiter = RateLimiter(
+    RATE_LIMIT_PER_MINUTE,
+    int(RATE_LIMIT_BURST) if RATE_LIMIT_BURST else None,
+)
+_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    return _limiter
+
+
+# Läses vid varje skrapning, så att ett utbytt _limiter också syns
+RATE_LIMIT_QUEUE_DEPTH.set_function(lambda: get_rate_limiter().queue_depth())
+
+
+def configure_rate_limiter(per_minute: int, burst: Optional[int] = None) -> RateLimiter:
+    """Swap the shared limiter, e.g. for a paid tier with a higher quota."""
+    global _limiter
+    with _limiter_lock:
+        _limiter = RateLimiter(per_minute, burst)
+    return _limiter
+
+
+def current_priority() -> int:
+    return _priority.get()
+
+
+@contextmanager
+def request_priority(priority: int) -> Iterator[None]:
+    """Run API calls in this block with the given queue priority."""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+
+def current_max_wait() -> Optional[float]:
+    return _max_wait.get()
+
+
+@contextmanager
+def request_max_wait(seconds: Optional[float]) -> Iterator[None]:
+    """Fail API calls in this block with the estimated wait instead of queueing longer than `seconds`."""
+    token = _max_wait.set(seconds)
+    try:
+        yield
+    finally:
+        _max_wait.reset(token)
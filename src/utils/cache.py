@@ -1,34 +1,470 @@
+import hashlib
 import json
+import os
+import threading
 import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from src.utils.cache_backends import (
+    CacheBackend,
+    CacheRecord,
+    EntryInfo,
+    JsonDirBackend,
+    SqliteBackend,
+    migrate_entries,
+)
+from src.utils.logger import get_logger
+from src.utils.metrics import CACHE_HIT_RATIO, CACHE_LOOKUPS, cache_family
+
+_log = get_logger("cache")
 
 CACHE_DIR = Path("data/cache")
 CACHE_DIR.mkdir(parents=True, exist_ok=True)
 
-def _cache_path(key: str) -> Path:
-    safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
-    return CACHE_DIR / f"{safe}.json"
+# "sqlite" (standard) eller "json" för den gamla en-fil-per-nyckel-lagringen
+CACHE_BACKEND = os.getenv("FSH_CACHE_BACKEND", "sqlite")
+
+# Minnestak för det snabba LRU-lagret framför filerna (bytes, serialiserad storlek)
+MEMORY_CACHE_BYTES = int(os.getenv("FSH_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+
+# Tak för disk-cachen; över taket tas poster bort enligt CACHE_EVICTION ("lru" eller "lfu")
+CACHE_MAX_BYTES = int(os.getenv("FSH_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+CACHE_MAX_ENTRIES = int(os.getenv("FSH_CACHE_MAX_ENTRIES", "20000"))
+CACHE_EVICTION = os.getenv("FSH_CACHE_EVICTION", "lru")
+# Kör en kompaktering i bakgrunden efter så här många skrivningar
+COMPACT_EVERY_WRITES = int(os.getenv("FSH_CACHE_COMPACT_EVERY", "500"))
+# Antal olika nycklar vars åtkomster samlas ihop innan de skrivs till disk
+ACCESS_FLUSH_SIZE = 256
+# Hur länge poster från den gamla JSON-cachen lever efter import, per nyckelfamilj: samma
+# max(ttl, max_age) som api_client använder. Familjer som saknas här läses inte längre
+# (t.ex. team_ och squad_, som ersatts av team_detail_) och importeras inte.
+LEGACY_IMPORT_MAX_AGE = {
+    "standings": 6 * 3600,
+    "teams": 7 * 86400,
+    "team_matches": 3600,
+    "matches": 3600,
+    "top_scorers": 86400,
+}
+
+# Bakgrundsjobb som förnyar inaktuella poster (stale-while-revalidate)
+_revalidate_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="cache-revalidate")
+_revalidating: Set[str] = set()
+_revalidating_lock = threading.Lock()
+
+# Underhåll (åtkomststatistik, kompaktering) körs i en egen tråd, aldrig i sidans tråd
+_maintenance_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cache-maintenance")
+_maintenance_lock = threading.Lock()
+_pending_access: Dict[str, List[float]] = {}
+_writes_since_compact = 0
+_compact_scheduled = False
+
+class MemoryTier:
+    """
+    Bounded in-process LRU in front of the disk cache.
+
+    Entries keep their write timestamp so TTL checks work the same as on
+    disk, and are sized by their serialized length. Cached data is shared
+    between callers and must be treated as read-only.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, Tuple[float, Any, int]]" = OrderedDict()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: str, ttl_seconds: float) -> Optional[Tuple[float, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or (time.time() - entry[0]) > ttl_seconds:
+                # Inaktuell post: låt disken avgöra, en annan process kan ha skrivit nyare data
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0], entry[1]
+
+    def put(self, key: str, ts: float, data: Any, size: int) -> None:
+        with self._lock:
+            old = self._entries.get(key)
+            if old is not None and old[0] > ts:
+                # En långsam läsning får aldrig skriva över nyare data (t.ex. från en förnyelse)
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (ts, data, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, _, evicted_size) = self._entries.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def touch(self, key: str, ts: float) -> None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] < ts:
+                self._entries[key] = (ts, entry[1], entry[2])
+
+    def discard(self, key: str) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+            }
 
-def cache_get(key: str, ttl_seconds: int) -> Optional[Any]:
-    path = _cache_path(key)
-    if not path.exists():
+
+_memory = MemoryTier(MEMORY_CACHE_BYTES)
+
+def configure_memory_cache(max_bytes: int) -> None:
+    global _memory
+    _memory = MemoryTier(max_bytes)
+
+def memory_cache_stats() -> Dict[str, int]:
+    return _memory.stats()
+
+_backend: Optional[CacheBackend] = None
+_backend_lock = threading.Lock()
+
+def _make_backend(name: str) -> CacheBackend:
+    if name == "json":
+        return JsonDirBackend(CACHE_DIR)
+    if name == "sqlite":
+        path = CACHE_DIR / "cache.sqlite3"
+        created = not path.exists()
+        backend = SqliteBackend(path)
+        if created:
+            # Importen kan ta tid med en stor gammal cache; sidan får inte vänta på den
+            _maintenance_pool.submit(import_json_cache, backend)
+        return backend
+    raise ValueError(f"Unknown cache backend '{name}'")
+
+def _legacy_expiry(key: str, record: CacheRecord) -> Optional[CacheRecord]:
+    # Den gamla cachen sparade inget expires_at; utan det skulle compact() aldrig ta bort posten
+    if record.expires_at is None:
+        max_age = LEGACY_IMPORT_MAX_AGE.get(cache_family(key))
+        if max_age is None:
+            return None
+        record.expires_at = record.ts + max_age
+    if record.expires_at < time.time():
         return None
+    return record
+
+def import_json_cache(backend: CacheBackend, directory: Optional[Path] = None) -> int:
+    """
+    Copy entries from the older one-file-per-key JSON cache into `backend`.
 
+    Entries already in `backend` are newer and kept. Imported entries expire
+    like freshly fetched ones of the same family; expired entries and
+    families the app no longer reads are left behind.
+    """
+    directory = directory or CACHE_DIR
+    if not any(directory.glob("*.json")):
+        return 0
     try:
-        payload = json.loads(path.read_text(encoding="utf-8"))
-        ts = payload.get("ts")
-        if ts is None:
-            return None
+        imported = migrate_entries(JsonDirBackend(directory), backend, overwrite=False, prepare=_legacy_expiry)
+    except Exception as e:
+        # En trasig gammal cache får aldrig hindra appen från att starta: den blir bara kall
+        _log.warning("Could not import JSON cache from %s: %s", directory, e)
+        return 0
+    _log.info("Imported %s entries from the JSON cache in %s", imported, directory)
+    return imported
+
+def get_backend() -> CacheBackend:
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                _backend = _make_backend(CACHE_BACKEND)
+    return _backend
+
+def set_backend(backend: CacheBackend) -> None:
+    """Swap the disk tier, e.g. to a JsonDirBackend or a test database."""
+    global _backend
+    with _backend_lock:
+        old, _backend = _backend, backend
+    _memory.clear()
+    if old is not None and old is not backend:
+        old.close()
+
+def _revalidate(key: str, revalidate: Callable[[], Any]) -> None:
+    try:
+        revalidate()
+    except Exception as e:
+        _log.warning("Could not revalidate cache entry '%s': %s", key, e)
+    finally:
+        with _revalidating_lock:
+            _revalidating.discard(key)
+
+def schedule_revalidate(key: str, revalidate: Callable[[], Any]) -> bool:
+    """Run `revalidate` in the background unless a refresh for `key` is already queued."""
+    with _revalidating_lock:
+        if key in _revalidating:
+            return False
+        _revalidating.add(key)
+    _revalidate_pool.submit(_revalidate, key, revalidate)
+    return True
+
+def _note_access(key: str) -> None:
+    with _maintenance_lock:
+        entry = _pending_access.get(key)
+        if entry is None:
+            _pending_access[key] = [time.time(), 1]
+        else:
+            entry[0] = time.time()
+            entry[1] += 1
+        flush = len(_pending_access) >= ACCESS_FLUSH_SIZE
+    if flush:
+        _maintenance_pool.submit(_flush_access_log)
 
-        if (time.time() - ts) > ttl_seconds:
+def _flush_access_log() -> None:
+    global _pending_access
+    with _maintenance_lock:
+        pending, _pending_access = _pending_access, {}
+    if not pending:
+        return
+    try:
+        get_backend().record_access({k: (v[0], int(v[1])) for k, v in pending.items()})
+    except Exception as e:
+        _log.warning("Could not record cache access: %s", e)
+
+def _note_write(count: int = 1) -> None:
+    global _writes_since_compact, _compact_scheduled
+    with _maintenance_lock:
+        _writes_since_compact += count
+        if _writes_since_compact < COMPACT_EVERY_WRITES or _compact_scheduled:
+            return
+        _writes_since_compact = 0
+        _compact_scheduled = True
+    _maintenance_pool.submit(_background_compact)
+
+def _background_compact() -> None:
+    global _compact_scheduled
+    try:
+        compact()
+    except Exception as e:
+        _log.warning("Cache compaction failed: %s", e)
+    finally:
+        with _maintenance_lock:
+            _compact_scheduled = False
+
+_CACHE_RESULTS = ("hit_memory", "hit_disk", "stale", "miss")
+_families_seen: Set[str] = set()
+
+def _hit_ratio(family: str) -> float:
+    counts = {r: CACHE_LOOKUPS.labels(family, r).value for r in _CACHE_RESULTS}
+    total = sum(counts.values())
+    return (total - counts["miss"]) / total if total else 0.0
+
+def _note_lookup(key: str, result: str) -> None:
+    family = cache_family(key)
+    CACHE_LOOKUPS.labels(family, result).inc()
+    if family not in _families_seen:
+        _families_seen.add(family)
+        CACHE_HIT_RATIO.labels(family).set_function(lambda: _hit_ratio(family))
+
+def cache_get(
+    key: str,
+    ttl_seconds: int,
+    max_age_seconds: Optional[int] = None,
+    revalidate: Optional[Callable[[], Any]] = None,
+) -> Optional[Any]:
+    """
+    Return cached data younger than `ttl_seconds`.
+
+    With `max_age_seconds` and `revalidate` set, an entry past its TTL but
+    younger than `max_age_seconds` is still returned, and `revalidate` is
+    run in the background to refresh it. Only entries older than
+    `max_age_seconds` (or missing) return None.
+    """
+    hot = _memory.get(key, ttl_seconds)
+    if hot is not None:
+        _note_access(key)
+        _note_lookup(key, "hit_memory")
+        return hot[1]
+
+    try:
+        record = get_backend().get(key)
+    except Exception:
+        record = None
+    if record is None:
+        _note_lookup(key, "miss")
+        return None
+
+    result = "hit_disk"
+    age = time.time() - record.ts
+    if age > ttl_seconds:
+        if max_age_seconds is None or revalidate is None or age > max_age_seconds:
+            _note_lookup(key, "miss")
             return None
+        schedule_revalidate(key, revalidate)
+        result = "stale"
+
+    _memory.put(key, record.ts, record.data, record.size)
+    _note_access(key)
+    _note_lookup(key, result)
+    return record.data
 
-        return payload.get("data")
+def cache_get_many(keys: Iterable[str], ttl_seconds: int) -> Dict[str, Any]:
+    """Fresh entries for every key found, read from the disk tier in one go."""
+    out: Dict[str, Any] = {}
+    missing = []
+    for key in keys:
+        hot = _memory.get(key, ttl_seconds)
+        if hot is not None:
+            out[key] = hot[1]
+            _note_access(key)
+            _note_lookup(key, "hit_memory")
+        else:
+            missing.append(key)
+    if not missing:
+        return out
+
+    now = time.time()
+    found = get_backend().get_many(missing)
+    for key in missing:
+        record = found.get(key)
+        if record is not None and now - record.ts <= ttl_seconds:
+            _memory.put(key, record.ts, record.data, record.size)
+            out[key] = record.data
+            _note_access(key)
+            _note_lookup(key, "hit_disk")
+        else:
+            _note_lookup(key, "miss")
+    return out
+
+def content_hash(data: Any) -> str:
+    """Stable fingerprint of JSON-like data, independent of dict key order."""
+    raw = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(",", ":"), default=str)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def cache_peek(key: str) -> Optional[CacheRecord]:
+    """The stored entry regardless of age, with its meta; None if missing or unreadable."""
+    try:
+        return get_backend().get(key)
     except Exception:
         return None
 
-def cache_set(key: str, data: Any) -> None:
-    path = _cache_path(key)
-    payload = {"ts": time.time(), "data": data}
-    path.write_text(json.dumps(payload, ensure_ascii=False, indent=2), encoding="utf-8")
+def _record(data: Any, ttl_seconds: Optional[int], meta: Optional[Dict[str, Any]] = None) -> CacheRecord:
+    ts = time.time()
+    expires_at = ts + ttl_seconds if ttl_seconds is not None else None
+    return CacheRecord(ts=ts, data=data, expires_at=expires_at, meta=meta)
+
+def cache_set(
+    key: str,
+    data: Any,
+    ttl_seconds: Optional[int] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> None:
+    """
+    Store `data`; `ttl_seconds` is how long the entry is worth keeping at all.
+    `meta` holds validators for conditional refreshes (see cache_touch).
+    """
+    record = _record(data, ttl_seconds, meta)
+    get_backend().set(key, record)
+    _memory.put(key, record.ts, data, record.size)
+    _note_write()
+
+def cache_set_many(items: Dict[str, Any], ttl_seconds: Optional[int] = None) -> None:
+    records = {key: _record(data, ttl_seconds) for key, data in items.items()}
+    get_backend().set_many(records)
+    for key, record in records.items():
+        _memory.put(key, record.ts, record.data, record.size)
+    _note_write(len(records))
+
+def cache_touch(
+    key: str,
+    ttl_seconds: Optional[int] = None,
+    meta: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """
+    Mark an entry as just fetched without rewriting its payload, e.g. after
+    a 304 Not Modified. Returns False if the entry no longer exists.
+    """
+    record = _record(None, ttl_seconds, meta)
+    if not get_backend().touch(key, record.ts, record.expires_at, meta):
+        return False
+    _memory.touch(key, record.ts)
+    return True
+
+def cache_delete(key: str) -> None:
+    get_backend().delete(key)
+    _memory.discard(key)
+
+def _eviction_order(entries: List[EntryInfo], policy: str) -> List[EntryInfo]:
+    if policy == "lru":
+        return sorted(entries, key=lambda e: e.accessed_at or e.ts)
+    if policy == "lfu":
+        return sorted(entries, key=lambda e: (e.hits, e.accessed_at or e.ts))
+    raise ValueError(f"Unknown eviction policy '{policy}'")
+
+def compact(
+    max_bytes: Optional[int] = None,
+    max_entries: Optional[int] = None,
+    policy: Optional[str] = None,
+    vacuum: bool = False,
+) -> Dict[str, int]:
+    """
+    Purge expired entries, then evict until the disk cache is under its
+    size and entry caps. Safe while the app is serving: entries rewritten
+    after the scan started are never deleted.
+    """
+    max_bytes = CACHE_MAX_BYTES if max_bytes is None else max_bytes
+    max_entries = CACHE_MAX_ENTRIES if max_entries is None else max_entries
+    policy = policy or CACHE_EVICTION
+
+    _flush_access_log()
+    backend = get_backend()
+    now = time.time()
+
+    entries = backend.entries()
+    expired = [e for e in entries if e.expires_at is not None and e.expires_at < now]
+    live = [e for e in entries if not (e.expires_at is not None and e.expires_at < now)]
+
+    live_bytes = sum(e.size for e in live)
+    live_count = len(live)
+    evicted: List[EntryInfo] = []
+    for e in _eviction_order(live, policy):
+        if live_bytes <= max_bytes and live_count <= max_entries:
+            break
+        evicted.append(e)
+        live_bytes -= e.size
+        live_count -= 1
+
+    deleted = set(backend.delete_entries(expired + evicted))
+    for key in deleted:
+        _memory.discard(key)
+    backend.checkpoint(vacuum=vacuum)
+
+    return {
+        "expired": len(expired),
+        "evicted": len(evicted),
+        "removed": len(deleted),
+        # Bara det som faktiskt togs bort: omskrivna poster står kvar
+        "reclaimed_bytes": sum(e.size for e in expired + evicted if e.key in deleted),
+        "entries": live_count,
+        "bytes": live_bytes,
+    }
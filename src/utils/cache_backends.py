@@ -0,0 +1,506 @@
+"""
+Storage backends for src.utils.cache.
+
+- SqliteBackend: one WAL-mode database with indexed keys, atomic upserts
+  and an expires_at column (default).
+- JsonDirBackend: the original one-JSON-file-per-key layout, kept for
+  compatibility.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from src.utils.cache_serializers import DEFAULT_SERIALIZER, Serializer, blob_format, decode, encode
+
+# SQLite tillåter max 999 parametrar per fråga i äldre versioner
+_SQL_CHUNK = 500
+# Lediga SQLite-connections som sparas mellan anrop; fler öppnas vid behov men stängs när de lämnas tillbaka
+SQLITE_POOL_SIZE = int(os.getenv("FSH_SQLITE_POOL_SIZE", "4"))
+
+
+@dataclass
+class CacheRecord:
+    ts: float
+    data: Any
+    expires_at: Optional[float] = None
+    size: int = 0
+    # Validatorer från API:t (etag, last_modified) och content_hash för posten
+    meta: Optional[Dict[str, Any]] = None
+
+
+@dataclass
+class EntryInfo:
+    """Everything compaction needs to know about an entry, without its payload."""
+    key: str
+    ts: float
+    size: int
+    expires_at: Optional[float] = None
+    accessed_at: Optional[float] = None
+    hits: int = 0
+
+
+class CacheBackend:
+    """Interface every cache store implements."""
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        raise NotImplementedError
+
+    def set(self, key: str, record: CacheRecord) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def touch(
+        self,
+        key: str,
+        ts: float,
+        expires_at: Optional[float],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        """Mark an entry as fresh again without rewriting its payload. False if it is gone."""
+        record = self.get(key)
+        if record is None:
+            return False
+        record.ts, record.expires_at = ts, expires_at
+        if meta is not None:
+            record.meta = meta
+        self.set(key, record)
+        return True
+
+    def keys(self, prefix: str = "") -> List[str]:
+        raise NotImplementedError
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheRecord]:
+        out: Dict[str, CacheRecord] = {}
+        for key in keys:
+            record = self.get(key)
+            if record is not None:
+                out[key] = record
+        return out
+
+    def set_many(self, records: Dict[str, CacheRecord]) -> None:
+        for key, record in records.items():
+            self.set(key, record)
+
+    def add_many(self, records: Dict[str, CacheRecord]) -> int:
+        """Write only the records whose key is not stored yet; returns how many were written."""
+        added = 0
+        for key, record in records.items():
+            if self.get(key) is None:
+                self.set(key, record)
+                added += 1
+        return added
+
+    def entries(self) -> List[EntryInfo]:
+        raise NotImplementedError
+
+    def delete_entries(self, entries: Iterable[EntryInfo]) -> List[str]:
+        """Delete entries unless they were rewritten since `entries` was listed; returns the deleted keys."""
+        deleted = []
+        for info in entries:
+            record = self.get(info.key)
+            if record is not None and record.ts == info.ts:
+                self.delete(info.key)
+                deleted.append(info.key)
+        return deleted
+
+    def record_access(self, accesses: Dict[str, Tuple[float, int]]) -> None:
+        """Store (last access time, hit count) per key for LRU/LFU eviction."""
+        pass
+
+    def checkpoint(self, vacuum: bool = False) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class SqliteBackend(CacheBackend):
+    def __init__(
+        self,
+        path: Path,
+        serializer: Serializer = DEFAULT_SERIALIZER,
+        pool_size: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.serializer = serializer
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool_size = SQLITE_POOL_SIZE if pool_size is None else pool_size
+        self._idle: List[sqlite3.Connection] = []
+        self._pool_lock = threading.Lock()
+
+        with self._connection() as conn:
+            self._create_schema(conn)
+
+    def _create_schema(self, conn: sqlite3.Connection) -> None:
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS cache_entries (
+                key TEXT PRIMARY KEY,
+                ts REAL NOT NULL,
+                expires_at REAL,
+                size INTEGER NOT NULL,
+                data BLOB NOT NULL,
+                accessed_at REAL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                meta TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_cache_entries_expires_at
+                ON cache_entries (expires_at);
+            """
+        )
+        # Databaser skapade innan eviction fanns saknar åtkomstkolumnerna
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(cache_entries)")}
+        if "accessed_at" not in columns:
+            conn.execute("ALTER TABLE cache_entries ADD COLUMN accessed_at REAL")
+        if "hits" not in columns:
+            conn.execute("ALTER TABLE cache_entries ADD COLUMN hits INTEGER NOT NULL DEFAULT 0")
+        if "meta" not in columns:
+            conn.execute("ALTER TABLE cache_entries ADD COLUMN meta TEXT")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        return conn
+
+    @contextmanager
+    def _connection(self):
+        # Lånas per anrop i stället för per tråd: Streamlit startar en ny tråd vid varje rerun,
+        # så connections knutna till trådar skulle aldrig stängas
+        with self._pool_lock:
+            conn = self._idle.pop() if self._idle else None
+        if conn is None:
+            conn = self._connect()
+        try:
+            yield conn
+        finally:
+            with self._pool_lock:
+                keep = len(self._idle) < self.pool_size
+                if keep:
+                    self._idle.append(conn)
+            if not keep:
+                conn.close()
+
+    def idle_connections(self) -> int:
+        """Number of idle connections held by the pool."""
+        with self._pool_lock:
+            return len(self._idle)
+
+    def _write(self, sql: str, rows: List[tuple]) -> int:
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                changed = conn.executemany(sql, rows).rowcount
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return changed
+
+    @staticmethod
+    def _row_to_record(row) -> CacheRecord:
+        ts, expires_at, size, blob, meta = row
+        return CacheRecord(
+            ts=ts,
+            data=decode(blob),
+            expires_at=expires_at,
+            size=size,
+            meta=json.loads(meta) if meta else None,
+        )
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        with self._connection() as conn:
+            row = conn.execute(
+                "SELECT ts, expires_at, size, data, meta FROM cache_entries WHERE key = ?", (key,)
+            ).fetchone()
+        return self._row_to_record(row) if row else None
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, CacheRecord]:
+        keys = list(keys)
+        out: Dict[str, CacheRecord] = {}
+        with self._connection() as conn:
+            for i in range(0, len(keys), _SQL_CHUNK):
+                chunk = keys[i:i + _SQL_CHUNK]
+                marks = ",".join("?" * len(chunk))
+                rows = conn.execute(
+                    f"SELECT key, ts, expires_at, size, data, meta FROM cache_entries WHERE key IN ({marks})",
+                    chunk,
+                )
+                for key, *rest in rows:
+                    out[key] = self._row_to_record(rest)
+        return out
+
+    def _upsert_rows(self, records: Dict[str, CacheRecord]) -> List[tuple]:
+        rows = []
+        for key, record in records.items():
+            blob = encode(record.data, self.serializer)
+            record.size = len(blob)
+            meta = json.dumps(record.meta) if record.meta else None
+            rows.append((key, record.ts, record.expires_at, record.size, blob, meta))
+        return rows
+
+    def set(self, key: str, record: CacheRecord) -> None:
+        self.set_many({key: record})
+
+    def set_many(self, records: Dict[str, CacheRecord]) -> None:
+        self._write(
+            """
+            INSERT INTO cache_entries (key, ts, expires_at, size, data, meta)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO UPDATE SET
+                ts = excluded.ts,
+                expires_at = excluded.expires_at,
+                size = excluded.size,
+                data = excluded.data,
+                meta = excluded.meta
+            """,
+            self._upsert_rows(records),
+        )
+
+    def add_many(self, records: Dict[str, CacheRecord]) -> int:
+        # Atomiskt per rad: en post som skrivits sedan källan lästes får aldrig ersättas
+        return self._write(
+            """
+            INSERT INTO cache_entries (key, ts, expires_at, size, data, meta)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT(key) DO NOTHING
+            """,
+            self._upsert_rows(records),
+        )
+
+    def delete(self, key: str) -> None:
+        with self._connection() as conn:
+            conn.execute("DELETE FROM cache_entries WHERE key = ?", (key,))
+
+    def touch(
+        self,
+        key: str,
+        ts: float,
+        expires_at: Optional[float],
+        meta: Optional[Dict[str, Any]] = None,
+    ) -> bool:
+        # Bara tidsstämpeln (och ev. nya validatorer) skrivs, payloaden rörs inte
+        changed = self._write(
+            "UPDATE cache_entries SET ts = MAX(ts, ?), expires_at = ?, meta = COALESCE(?, meta) "
+            "WHERE key = ?",
+            [(ts, expires_at, json.dumps(meta) if meta else None, key)],
+        )
+        return changed > 0
+
+    def keys(self, prefix: str = "") -> List[str]:
+        # Escapa LIKE-jokertecken så att t.ex. "team_" inte matchar "teams"
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT key FROM cache_entries WHERE key LIKE ? ESCAPE '\\'", (pattern,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def expired_keys(self, now: Optional[float] = None) -> List[str]:
+        now = time.time() if now is None else now
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT key FROM cache_entries WHERE expires_at IS NOT NULL AND expires_at < ?", (now,)
+            ).fetchall()
+        return [r[0] for r in rows]
+
+    def stale_format_keys(self) -> List[str]:
+        """Keys whose payload is not in this backend's current format."""
+        current = self.serializer.format_id
+        with self._connection() as conn:
+            rows = conn.execute("SELECT key, substr(data, 1, 5) FROM cache_entries").fetchall()
+        out = []
+        for key, head in rows:
+            # Gamla rader lagrades som JSON-text och kommer tillbaka som str
+            if isinstance(head, str) or blob_format(head) != current:
+                out.append(key)
+        return out
+
+    def reencode(self, keys: List[str]) -> int:
+        """Rewrite the payloads of `keys` in the current format, leaving ts untouched."""
+        rows = []
+        for key, record in self.get_many(keys).items():
+            blob = encode(record.data, self.serializer)
+            # ts-villkoret gör att en samtidig cache_set aldrig skrivs över med äldre data
+            rows.append((blob, len(blob), key, record.ts))
+        return self._write("UPDATE cache_entries SET data = ?, size = ? WHERE key = ? AND ts = ?", rows)
+
+    def entries(self) -> List[EntryInfo]:
+        with self._connection() as conn:
+            rows = conn.execute(
+                "SELECT key, ts, size, expires_at, accessed_at, hits FROM cache_entries"
+            ).fetchall()
+        return [EntryInfo(*row) for row in rows]
+
+    def delete_entries(self, entries: Iterable[EntryInfo]) -> List[str]:
+        deleted = []
+        with self._connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                for info in entries:
+                    # En post som skrivits om sedan listningen har ny ts och blir kvar
+                    if conn.execute("DELETE FROM cache_entries WHERE key = ? AND ts = ?", (info.key, info.ts)).rowcount:
+                        deleted.append(info.key)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return deleted
+
+    def record_access(self, accesses: Dict[str, Tuple[float, int]]) -> None:
+        rows = [(last, count, key) for key, (last, count) in accesses.items()]
+        self._write(
+            "UPDATE cache_entries SET accessed_at = MAX(COALESCE(accessed_at, 0), ?), hits = hits + ? "
+            "WHERE key = ?",
+            rows,
+        )
+
+    def checkpoint(self, vacuum: bool = False) -> None:
+        with self._connection() as conn:
+            if vacuum:
+                # VACUUM ger tillbaka utrymmet till filsystemet men låser skrivare en kort stund
+                conn.execute("VACUUM")
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self) -> None:
+        with self._pool_lock:
+            conns, self._idle = self._idle, []
+        for conn in conns:
+            conn.close()
+
+
+class JsonDirBackend(CacheBackend):
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, key: str) -> Path:
+        safe = "".join(c if c.isalnum() or c in "-_." else "_" for c in key)
+        return self.directory / f"{safe}.json"
+
+    def get(self, key: str) -> Optional[CacheRecord]:
+        path = self._path(key)
+        try:
+            raw = path.read_text(encoding="utf-8")
+        except FileNotFoundError:
+            return None
+        try:
+            payload = json.loads(raw)
+        except ValueError:
+            # En trasig fil är en miss, precis som i entries() och keys()
+            return None
+        ts = payload.get("ts") if isinstance(payload, dict) else None
+        if ts is None:
+            return None
+        return CacheRecord(
+            ts=ts,
+            data=payload.get("data"),
+            expires_at=payload.get("expires_at"),
+            size=len(raw),
+            meta=payload.get("meta"),
+        )
+
+    def set(self, key: str, record: CacheRecord) -> None:
+        path = self._path(key)
+        payload = {
+            "key": key,
+            "ts": record.ts,
+            "expires_at": record.expires_at,
+            "meta": record.meta,
+            "data": record.data,
+        }
+        raw = json.dumps(payload, ensure_ascii=False, indent=2)
+        record.size = len(raw)
+        # Skriv till temporär fil och byt namn, så att läsare aldrig ser en halvskriven fil
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        tmp.write_text(raw, encoding="utf-8")
+        os.replace(tmp, path)
+
+    def delete(self, key: str) -> None:
+        self._path(key).unlink(missing_ok=True)
+
+    def entries(self) -> List[EntryInfo]:
+        out = []
+        for path in self.directory.glob("*.json"):
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+                stat = path.stat()
+            except (OSError, ValueError):
+                continue
+            if not isinstance(payload, dict) or payload.get("ts") is None:
+                continue
+            out.append(EntryInfo(
+                key=payload.get("key") or path.stem,
+                ts=payload["ts"],
+                size=stat.st_size,
+                expires_at=payload.get("expires_at"),
+                accessed_at=stat.st_atime,
+            ))
+        return out
+
+    def record_access(self, accesses: Dict[str, Tuple[float, int]]) -> None:
+        # Senaste åtkomst sparas som filens atime; antal träffar sparas inte
+        for key, (last, _) in accesses.items():
+            path = self._path(key)
+            try:
+                os.utime(path, (last, path.stat().st_mtime))
+            except FileNotFoundError:
+                continue
+
+    def keys(self, prefix: str = "") -> List[str]:
+        out = []
+        for path in self.directory.glob("*.json"):
+            try:
+                payload = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                continue
+            key = (payload.get("key") if isinstance(payload, dict) else None) or path.stem
+            if key.startswith(prefix):
+                out.append(key)
+        return out
+
+
+def migrate_serialization(backend: SqliteBackend, batch_size: int = 200) -> int:
+    """Rewrite entries stored in an older format with the backend's current one."""
+    keys = backend.stale_format_keys()
+    migrated = 0
+    for i in range(0, len(keys), batch_size):
+        migrated += backend.reencode(keys[i:i + batch_size])
+    return migrated
+
+
+def migrate_entries(
+    source: CacheBackend,
+    target: CacheBackend,
+    overwrite: bool = True,
+    prepare: Optional[Callable[[str, CacheRecord], Optional[CacheRecord]]] = None,
+) -> int:
+    """
+    Copy every entry from one backend to another, e.g. JSON files into SQLite.
+
+    `prepare` may adjust each record before it is written, or return None to
+    leave the entry behind.
+    """
+    keys = source.keys()
+    if not overwrite:
+        # Poster som redan finns i målet är nyare än de som kopieras
+        existing = set(target.keys())
+        keys = [key for key in keys if key not in existing]
+    records = source.get_many(keys)
+    if prepare is not None:
+        prepared = {key: prepare(key, record) for key, record in records.items()}
+        records = {key: record for key, record in prepared.items() if record is not None}
+    if overwrite:
+        target.set_many(records)
+        return len(records)
+    # Målet kan ha fått nyare poster medan källan lästes
+    return target.add_many(records)
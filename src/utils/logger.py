@@ -0,0 +1,220 @@
+"""
+Logging and per-request instrumentation.
+
+- get_logger(name): the project's loggers ("fsh.<name>"), level from FSH_LOG_LEVEL
+- timer(name) / @timed(name): time a block or function into the rolling stats
+- record_call(...): one CallRecord per API request or cache answer in api_client
+- dump_stats() / format_stats(): p50/p95/p99 per name over the last
+  ROLLING_WINDOW observations, on demand
+
+Call records are also logged at DEBUG, one key=value line each, so
+FSH_LOG_LEVEL=DEBUG shows exactly where a slow page spent its time.
+"""
+import functools
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, TypeVar
+
+LOG_LEVEL = os.getenv("FSH_LOG_LEVEL", "INFO").upper()
+LOG_FORMAT = "%(asctime)s %(levelname)s %(name)s: %(message)s"
+
+# Antal mätningar per namn som percentilerna räknas på, och antal sparade anrop
+ROLLING_WINDOW = int(os.getenv("FSH_STATS_WINDOW", "1000"))
+RECENT_CALLS = int(os.getenv("FSH_RECENT_CALLS", "500"))
+
+_configured = False
+_configure_lock = threading.Lock()
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _configure() -> None:
+    global _configured
+    with _configure_lock:
+        if _configured:
+            return
+        root = logging.getLogger("fsh")
+        root.setLevel(LOG_LEVEL)
+        if not root.handlers:
+            handler = logging.StreamHandler()
+            handler.setFormatter(logging.Formatter(LOG_FORMAT))
+            root.addHandler(handler)
+        _configured = True
+
+
+def get_logger(name: str) -> logging.Logger:
+    if not _configured:
+        _configure()
+    return logging.getLogger(f"fsh.{name}")
+
+
+_log = get_logger("timing")
+
+
+@dataclass
+class CallRecord:
+    endpoint: str
+    latency: float
+    # "hit" = svarat ur cachen, "miss" = hämtat, "refresh" = bakgrundsförnyelse
+    cache: Optional[str] = None
+    status: Optional[int] = None  # None för cacheträffar och nätverksfel
+    size: int = 0                 # bytes i svaret
+    retries: int = 0
+    error: Optional[str] = None
+    ts: float = field(default_factory=time.time)
+
+    @property
+    def source(self) -> str:
+        return "cache" if self.cache == "hit" else "api"
+
+
+class RollingStats:
+    """Latency percentiles per name over the last `window` observations."""
+
+    def __init__(self, window: int = ROLLING_WINDOW):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._errors: Dict[str, int] = {}
+
+    def observe(self, name: str, seconds: float, error: bool = False) -> None:
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            if error:
+                self._errors[name] = self._errors.get(name, 0) + 1
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            samples = {name: sorted(values) for name, values in self._samples.items()}
+            counts = dict(self._counts)
+            errors = dict(self._errors)
+        out = {}
+        for name, values in sorted(samples.items()):
+            out[name] = {
+                "count": counts[name],
+                "errors": errors.get(name, 0),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "p99": _percentile(values, 99),
+                "max": values[-1],
+                "mean": sum(values) / len(values),
+            }
+        return out
+
+    def reset(self) -> None:
+        with self._lock:
+            self._samples.clear()
+            self._counts.clear()
+            self._errors.clear()
+
+
+def _percentile(ordered: List[float], pct: float) -> float:
+    index = min(int(round(pct / 100 * (len(ordered) - 1))), len(ordered) - 1)
+    return ordered[index]
+
+
+_stats = RollingStats()
+_recent: Deque[CallRecord] = deque(maxlen=RECENT_CALLS)
+_recent_lock = threading.Lock()
+
+
+def observe(name: str, seconds: float, error: bool = False) -> None:
+    _stats.observe(name, seconds, error)
+
+
+def record_call(
+    endpoint: str,
+    latency: float,
+    cache: Optional[str] = None,
+    status: Optional[int] = None,
+    size: int = 0,
+    retries: int = 0,
+    error: Optional[str] = None,
+) -> CallRecord:
+    """Store one API call or cache answer and add it to the per-endpoint stats."""
+    record = CallRecord(endpoint, latency, cache, status, size, retries, error)
+    with _recent_lock:
+        _recent.append(record)
+    observe(f"{record.source} {endpoint}", latency, error=error is not None)
+    if _log.isEnabledFor(logging.DEBUG):
+        _log.debug(" ".join(f"{k}={v}" for k, v in asdict(record).items() if k != "ts"))
+    return record
+
+
+def recent_calls(limit: Optional[int] = None) -> List[CallRecord]:
+    """The latest call records, oldest first."""
+    with _recent_lock:
+        calls = list(_recent)
+    return calls[-limit:] if limit else calls
+
+
+@contextmanager
+def timer(name: str) -> Iterator[Dict[str, float]]:
+    """
+    Time the block under `name`. The yielded dict gets `elapsed` (seconds)
+    when the block exits; exceptions are counted as errors and re-raised.
+    """
+    span: Dict[str, float] = {}
+    start = time.perf_counter()
+    failed = False
+    try:
+        yield span
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        span["elapsed"] = time.perf_counter() - start
+        observe(name, span["elapsed"], error=failed)
+        if _log.isEnabledFor(logging.DEBUG):
+            _log.debug(f"timer={name} elapsed={span['elapsed']:.4f}{' error=1' if failed else ''}")
+
+
+def timed(name: Optional[str] = None) -> Callable[[F], F]:
+    """Decorator form of timer(); the name defaults to module.function."""
+    def decorate(fn: F) -> F:
+        label = name or f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timer(label):
+                return fn(*args, **kwargs)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def dump_stats() -> Dict[str, Dict[str, float]]:
+    """{name: count, errors, p50, p95, p99, max, mean}; times in seconds."""
+    return _stats.snapshot()
+
+
+def format_stats(stats: Optional[Dict[str, Dict[str, float]]] = None) -> str:
+    stats = dump_stats() if stats is None else stats
+    lines = [f"{'name':<44} {'count':>6} {'err':>4} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'max ms':>8}"]
+    for name, s in stats.items():
+        lines.append(
+            f"{name:<44} {s['count']:>6} {s['errors']:>4} {s['p50'] * 1e3:>8.1f} "
+            f"{s['p95'] * 1e3:>8.1f} {s['p99'] * 1e3:>8.1f} {s['max'] * 1e3:>8.1f}"
+        )
+    return "\n".join(lines)
+
+
+def log_stats(level: int = logging.INFO) -> None:
+    _log.log(level, "Timing stats\n%s", format_stats())
+
+
+def reset_stats() -> None:
+    _stats.reset()
+    with _recent_lock:
+        _recent.clear()
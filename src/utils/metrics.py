@@ -0,0 +1,385 @@
+"""
+Prometheus-style metrics: counters, gauges and histograms with labels,
+rendered in the text exposition format.
+
+Two exporters, both off unless configured and both safe to start again
+on every Streamlit rerun:
+
+    FSH_METRICS_PORT=9108     serve http://127.0.0.1:9108/metrics
+    FSH_METRICS_FILE=path     rewrite a textfile-collector file every
+                              FSH_METRICS_INTERVAL seconds (default 15)
+
+The series the app exports are defined at the bottom of this module so
+the full list is in one place.
+"""
+import functools
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.utils.logger import get_logger
+
+_log = get_logger("metrics")
+
+METRICS_PORT = os.getenv("FSH_METRICS_PORT")
+METRICS_FILE = os.getenv("FSH_METRICS_FILE")
+METRICS_INTERVAL = float(os.getenv("FSH_METRICS_INTERVAL", "15"))
+
+# Sekunder; täcker allt från minnesträffar till en API-hämtning som väntat på rate-limitern
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value == int(value):
+        return str(int(value))
+    return repr(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def _new_child(self) -> "_Metric":
+        return type(self)(self.name, self.documentation)
+
+    def labels(self, *values: str, **kwargs: str) -> "_Metric":
+        if kwargs:
+            values = tuple(kwargs[name] for name in self.labelnames)
+        key = tuple(str(v) for v in values)
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}")
+        child = self._children.get(key)
+        if child is None:
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        """(suffix, extra label, value) for one unlabelled series."""
+        raise NotImplementedError
+
+    def collect(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        if self.labelnames:
+            with self._lock:
+                series = sorted(self._children.items())
+        else:
+            series = [((), self)]
+        for values, metric in series:
+            for suffix, extra, value in metric._samples():
+                labels = _format_labels(self.labelnames, values, extra)
+                lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        with self._lock:
+            self.value += amount
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        return [("_total", "", self.value)]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self.value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self.value = float(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, fn: Callable[[], float]) -> None:
+        """Read the value from `fn` at collection time instead."""
+        self._function = fn
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        if self._function is not None:
+            try:
+                return [("", "", float(self._function()))]
+            except Exception as e:
+                _log.warning("Could not read gauge %s: %s", self.name, e)
+                return []
+        return [("", "", self.value)]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        self._counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self.buckets[:-1])
+
+    def observe(self, value: float) -> None:
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            self.sum += value
+            self.count += 1
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        with self._lock:
+            counts, total, count = list(self._counts), self.sum, self.count
+        samples = []
+        cumulative = 0
+        for bound, n in zip(self.buckets, counts):
+            cumulative += n
+            samples.append(("_bucket", f'le="{_format_value(bound)}"', cumulative))
+        samples.append(("_sum", "", total))
+        samples.append(("_count", "", count))
+        return samples
+
+
+class Registry:
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, _Metric] = {}
+
+    def _get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str], **kwargs) -> _Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} is already registered with another type or labels")
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.collect())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def render() -> str:
+    """All registered series in the Prometheus text format."""
+    return REGISTRY.render()
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] not in ("/metrics", "/"):
+            self.send_response(404)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+_exporter_lock = threading.Lock()
+_http_server: Optional[ThreadingHTTPServer] = None
+_file_thread: Optional[threading.Thread] = None
+_file_stop = threading.Event()
+
+
+def start_http_exporter(port: int, host: str = "127.0.0.1") -> Optional[ThreadingHTTPServer]:
+    """Serve /metrics from a daemon thread; a no-op if already running in this process."""
+    global _http_server
+    with _exporter_lock:
+        if _http_server is not None:
+            return _http_server
+        try:
+            server = ThreadingHTTPServer((host, port), _MetricsHandler)
+        except OSError as e:
+            # Porten är upptagen, t.ex. av en annan Streamlit-process
+            _log.warning("Could not start metrics endpoint on %s:%s: %s", host, port, e)
+            return None
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+        _http_server = server
+        _log.info("Serving metrics on http://%s:%s/metrics", host, server.server_address[1])
+        return server
+
+
+def write_metrics_file(path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_text(render(), encoding="utf-8")
+    # Atomiskt byte, så att den som skrapar aldrig läser en halv fil
+    tmp.replace(path)
+
+
+def start_file_exporter(path: Path, interval: float = METRICS_INTERVAL) -> None:
+    """Rewrite `path` every `interval` seconds from a daemon thread."""
+    global _file_thread
+    with _exporter_lock:
+        if _file_thread is not None:
+            return
+        _file_stop.clear()
+
+        def loop() -> None:
+            while not _file_stop.is_set():
+                try:
+                    write_metrics_file(path)
+                except OSError as e:
+                    _log.warning("Could not write metrics file %s: %s", path, e)
+                _file_stop.wait(interval)
+
+        _file_thread = threading.Thread(target=loop, name="metrics-file", daemon=True)
+        _file_thread.start()
+
+
+def stop_exporters() -> None:
+    global _http_server, _file_thread
+    with _exporter_lock:
+        server, _http_server = _http_server, None
+        thread, _file_thread = _file_thread, None
+    if server is not None:
+        server.shutdown()
+        server.server_close()
+    if thread is not None:
+        _file_stop.set()
+        thread.join()
+
+
+def start_exporters() -> None:
+    """Start whichever exporters FSH_METRICS_PORT / FSH_METRICS_FILE ask for."""
+    if METRICS_PORT:
+        start_http_exporter(int(METRICS_PORT))
+    if METRICS_FILE:
+        start_file_exporter(Path(METRICS_FILE))
+
+
+@functools.lru_cache(maxsize=4096)
+def cache_family(key: str) -> str:
+    # "team_detail_86" -> "team_detail", "matches_PD_2025-01-01_..." -> "matches"
+    parts = []
+    for part in key.split("_"):
+        if not part or part[0].isdigit() or part.isupper() or part == "None":
+            break
+        parts.append(part)
+    return "_".join(parts) or "other"
+
+
+# Serier som appen exporterar
+
+API_REQUEST_SECONDS = REGISTRY.histogram(
+    "fsh_api_request_duration_seconds",
+    "football-data.org request latency including retries, by endpoint and final status",
+    ("endpoint", "status"),
+)
+API_RETRIES = REGISTRY.counter(
+    "fsh_api_retries",
+    "Retried or requeued API requests, by endpoint",
+    ("endpoint",),
+)
+CACHE_LOOKUPS = REGISTRY.counter(
+    "fsh_cache_lookups",
+    "Cache lookups by key family and result (hit_memory, hit_disk, stale, miss)",
+    ("family", "result"),
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "fsh_cache_hit_ratio",
+    "Share of cache lookups answered from the cache since start, by key family",
+    ("family",),
+)
+RATE_LIMIT_QUEUE_DEPTH = REGISTRY.gauge(
+    "fsh_rate_limit_queue_depth",
+    "Requests waiting for a rate limiter token",
+)
+SEARCH_SECONDS = REGISTRY.histogram(
+    "fsh_search_duration_seconds",
+    "search_teams latency",
+)
+SEARCH_MEMO_LOOKUPS = REGISTRY.counter(
+    "fsh_search_memo_lookups",
+    "Search memo lookups by index and result (hit, refine, miss)",
+    ("index", "result"),
+)
+PLAYER_SEARCH_SECONDS = REGISTRY.histogram(
+    "fsh_player_search_duration_seconds",
+    "search_players latency",
+)
+PAGE_RENDER_SECONDS = REGISTRY.histogram(
+    "fsh_page_render_seconds",
+    "Streamlit page render time by page and tab",
+    ("page", "tab"),
+)
+FRAME_MEMO_LOOKUPS = REGISTRY.counter(
+    "fsh_frame_memo_lookups",
+    "League page frame memo lookups by builder and result (hit, miss)",
+    ("frame", "result"),
+)
@@ -1,7 +1,10 @@
 import json
 from pathlib import Path
 from datetime import datetime
-import logging
+
+from src.utils.logger import get_logger
+
+_log = get_logger("storage")
 
 DATA_DIR = Path("data")
 FAVORITES_FILE = DATA_DIR / "favorites.json"
@@ -15,7 +18,7 @@ def load_favorites() -> list[str]:     # Funktion som skapar en lista med strän
             data = json.load(file)
             return data.get("favorites", [])
     except json.JSONDecodeError:
-        logging.error("Kunde inte läsa favorites.json")
+        _log.error("Kunde inte läsa favorites.json")
         return []
 
 def save_favorites(favorites: list[str]) -> None:   # Funktion som sparar favoritlag
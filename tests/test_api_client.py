@@ -0,0 +1,393 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from src.data_collection import api_client, async_client, circuit_breaker, http_session, rate_limit
+from src.utils import cache, logger
+from src.utils.cache_backends import SqliteBackend
+
+
+class _FakeApiHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    hits = {}
+    delay = 0.0
+    etag = None       # sätts för att svara 304 på matchande If-None-Match
+    not_modified = 0
+    payload = None    # annars {"path": ...}
+    failures = 0      # så många anrop till svarar 502
+    rate_limited = 0  # så många anrop till svarar 429
+
+    def do_GET(self):
+        _FakeApiHandler.hits[self.path] = _FakeApiHandler.hits.get(self.path, 0) + 1
+        time.sleep(_FakeApiHandler.delay)
+        if _FakeApiHandler.rate_limited > 0:
+            _FakeApiHandler.rate_limited -= 1
+            self.send_response(429)
+            self.send_header("Retry-After", "60")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if _FakeApiHandler.failures > 0:
+            _FakeApiHandler.failures -= 1
+            self.send_response(502)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        etag = _FakeApiHandler.etag
+        if etag and self.headers.get("If-None-Match") == etag:
+            _FakeApiHandler.not_modified += 1
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        body = json.dumps(_FakeApiHandler.payload or {"path": self.path}).encode("utf-8")
+        self.send_response(200)
+        if etag:
+            self.send_header("ETag", etag)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def fake_api(monkeypatch, tmp_path):
+    _FakeApiHandler.hits = {}
+    _FakeApiHandler.delay = 0.0
+    _FakeApiHandler.etag = None
+    _FakeApiHandler.not_modified = 0
+    _FakeApiHandler.payload = None
+    _FakeApiHandler.failures = 0
+    _FakeApiHandler.rate_limited = 0
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeApiHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    monkeypatch.setenv("FOOTBALL_DATA_TOKEN", "test-token")
+    monkeypatch.setattr(api_client, "BASE_URL", f"http://127.0.0.1:{server.server_port}/v4")
+    http_session.close_session()
+    http_session.reset_connection_stats()
+    monkeypatch.setattr(rate_limit, "_limiter", rate_limit.RateLimiter(6000, 100))
+    monkeypatch.setattr(api_client, "RETRY_BACKOFF_BASE", 0.01)
+    circuit_breaker.reset_breakers()
+
+    # Egen databas så att testerna inte skriver i data/cache
+    backend = SqliteBackend(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(cache, "_backend", backend)
+    monkeypatch.setattr(cache, "_memory", cache.MemoryTier(1024 * 1024))
+    monkeypatch.setattr(cache, "_revalidating", set())
+
+    yield server
+
+    http_session.close_session()
+    backend.close()
+    server.shutdown()
+    server.server_close()
+
+
+''' SESSION TESTS '''
+
+def test_get_reuses_pooled_connection(fake_api):
+    for code in ["PD", "PL", "SA"]:
+        data = api_client._get(f"/competitions/{code}/standings")
+        assert data["path"] == f"/v4/competitions/{code}/standings"
+
+    stats = http_session.get_connection_stats()
+    assert stats["requests"] == 3
+    assert stats["opened"] == 1
+    assert stats["reused"] == 2
+
+
+def test_get_session_is_shared():
+    assert http_session.get_session() is http_session.get_session()
+
+
+def test_concurrent_identical_calls_share_one_request(fake_api):
+    _FakeApiHandler.delay = 0.2
+    results = []
+
+    def worker():
+        results.append(api_client.get_teams("PL"))
+
+    threads = [threading.Thread(target=worker) for _ in range(10)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(5)
+
+    assert len(results) == 10
+    assert _FakeApiHandler.hits == {"/v4/competitions/PL/teams": 1}
+
+
+def test_team_and_squad_share_one_team_fetch(fake_api):
+    api_client.get_team(86)
+    api_client.get_squad(86)
+
+    assert _FakeApiHandler.hits == {"/v4/teams/86": 1}
+
+
+def test_shifted_match_window_only_fetches_new_days(fake_api):
+    api_client.get_team_matches(86, dateFrom="2025-01-01", dateTo="2025-01-10", limit=60)
+    api_client.get_team_matches(86, dateFrom="2025-01-02", dateTo="2025-01-11", limit=60)
+    api_client.get_team_matches(86, dateFrom="2025-01-03", dateTo="2025-01-05", limit=5)
+
+    assert _FakeApiHandler.hits == {
+        "/v4/teams/86/matches?dateFrom=2025-01-01&dateTo=2025-01-10": 1,
+        "/v4/teams/86/matches?dateFrom=2025-01-11&dateTo=2025-01-11": 1,
+    }
+
+
+def test_fetched_intervals_are_kept_when_a_later_one_fails(fake_api, monkeypatch):
+    api_client.get_team_matches(86, dateFrom="2025-01-05", dateTo="2025-01-10", limit=60)
+    original = api_client._get
+    calls = []
+
+    def second_call_fails(path, params=None, **kwargs):
+        calls.append(params["dateFrom"])
+        if len(calls) == 2:
+            raise api_client.UpstreamUnavailableError("down")
+        return original(path, params=params, **kwargs)
+
+    monkeypatch.setattr(api_client, "_get", second_call_fails)
+    # Två saknade intervall; det andra misslyckas och lagrade matcher visas i stället
+    api_client.get_team_matches(86, dateFrom="2025-01-01", dateTo="2025-01-15", limit=60)
+    monkeypatch.setattr(api_client, "_get", original)
+    api_client.get_team_matches(86, dateFrom="2025-01-01", dateTo="2025-01-15", limit=60)
+
+    assert _FakeApiHandler.hits == {
+        "/v4/teams/86/matches?dateFrom=2025-01-05&dateTo=2025-01-10": 1,
+        "/v4/teams/86/matches?dateFrom=2025-01-01&dateTo=2025-01-04": 1,
+        "/v4/teams/86/matches?dateFrom=2025-01-11&dateTo=2025-01-15": 1,
+    }
+
+def test_fetch_all_runs_independent_fetches_concurrently(fake_api):
+    _FakeApiHandler.delay = 0.3
+    start = time.perf_counter()
+    results = async_client.fetch_all({
+        code: async_client.get_teams(code) for code in ["PD", "PL", "SA"]
+    })
+    elapsed = time.perf_counter() - start
+
+    assert set(results) == {"PD", "PL", "SA"}
+    assert len(_FakeApiHandler.hits) == 3
+    assert elapsed < 0.6  # i serie skulle det ta minst 0.9 s
+
+
+def test_fetch_all_keeps_priority_and_errors(fake_api, monkeypatch):
+    seen = []
+
+    def fake_get_teams(code):
+        seen.append(rate_limit.current_priority())
+        if code == "SA":
+            raise api_client.ApiClientError("boom")
+        return [code]
+
+    monkeypatch.setattr(api_client, "get_teams", fake_get_teams)
+    with rate_limit.request_priority(rate_limit.PRIORITY_BACKGROUND):
+        results = async_client.fetch_all(
+            {code: async_client.get_teams(code) for code in ["PD", "SA"]},
+            return_exceptions=True,
+        )
+
+    assert seen == [rate_limit.PRIORITY_BACKGROUND] * 2
+    assert results["PD"] == ["PD"]
+    assert isinstance(results["SA"], api_client.ApiClientError)
+    with pytest.raises(api_client.ApiClientError):
+        async_client.fetch_all({"SA": async_client.get_teams("SA")})
+
+
+''' CONDITIONAL REQUEST TESTS '''
+
+def _expire(key):
+    # Låtsas att posten hämtades för en timme sedan
+    record = cache.cache_peek(key)
+    cache.get_backend().touch(key, record.ts - 3600, record.expires_at)
+    cache._memory.discard(key)
+
+
+def test_not_modified_only_bumps_timestamp(fake_api):
+    _FakeApiHandler.etag = '"v1"'
+    first = api_client.get_teams("PD")
+    _expire("teams_PD")
+    old_ts = cache.cache_peek("teams_PD").ts
+
+    # Förbi max_age: måste hämtas om, men servern svarar 304
+    api_client._cached("teams_PD", 0, "/competitions/PD/teams", api_client._normalize_teams)
+    record = cache.cache_peek("teams_PD")
+
+    assert _FakeApiHandler.not_modified == 1
+    assert record.ts > old_ts
+    assert record.data == first
+    assert record.meta["etag"] == '"v1"'
+
+
+def test_unchanged_content_keeps_hash_and_data(fake_api):
+    _FakeApiHandler.payload = {"teams": [{"id": 1, "name": "Real Madrid"}]}
+    first = api_client._cached("teams_PD", 0, "/competitions/PD/teams", api_client._normalize_teams)
+    hash_before = cache.cache_peek("teams_PD").meta["content_hash"]
+
+    cache._memory.discard("teams_PD")
+    second = api_client._cached("teams_PD", 0, "/competitions/PD/teams", api_client._normalize_teams)
+    assert second == first
+    assert cache.cache_peek("teams_PD").meta["content_hash"] == hash_before
+
+    _FakeApiHandler.payload = {"teams": [{"id": 1, "name": "Real Madrid CF"}]}
+    api_client._cached("teams_PD", 0, "/competitions/PD/teams", api_client._normalize_teams)
+    assert cache.cache_peek("teams_PD").meta["content_hash"] != hash_before
+
+
+''' RETRY / CIRCUIT BREAKER TESTS '''
+
+def test_transient_errors_are_retried(fake_api):
+    _FakeApiHandler.failures = 2
+
+    assert api_client._get("/competitions/PD/standings")["path"] == "/v4/competitions/PD/standings"
+    assert _FakeApiHandler.hits == {"/v4/competitions/PD/standings": 3}
+    assert api_client.get_breaker_states()["/competitions/{code}/standings"]["state"] == "closed"
+
+
+def test_open_breaker_fails_fast_and_serves_stale(fake_api, monkeypatch):
+    monkeypatch.setattr(api_client, "RETRY_ATTEMPTS", 1)
+    api_client.get_teams("PD")
+    _expire("teams_PD")
+    cache._memory.discard("teams_PD")
+
+    _FakeApiHandler.failures = 100
+    breaker = circuit_breaker.get_breaker("/competitions/{code}/teams")
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(api_client.UpstreamUnavailableError):
+            api_client._get("/competitions/PL/teams")
+    assert breaker.state == circuit_breaker.OPEN
+
+    hits_before = sum(_FakeApiHandler.hits.values())
+    with pytest.raises(api_client.CircuitOpenError):
+        api_client._get("/competitions/PL/teams")
+    # Förbi max_age, men API:t är nere: gammal data i stället för fel
+    stale = api_client._cached("teams_PD", 0, "/competitions/PD/teams", api_client._normalize_teams)
+
+    assert stale == cache.cache_peek("teams_PD").data
+    assert sum(_FakeApiHandler.hits.values()) == hits_before
+
+
+''' RATE LIMIT TESTS '''
+
+def test_rate_limiter_serves_interactive_before_background():
+    limiter = rate_limit.RateLimiter(per_minute=600, burst=1)
+    limiter.acquire()  # töm bucketen
+    order = []
+
+    def worker(name, priority):
+        limiter.acquire(priority=priority)
+        order.append(name)
+
+    background = threading.Thread(target=worker, args=("background", rate_limit.PRIORITY_BACKGROUND))
+    background.start()
+    time.sleep(0.02)
+    interactive = threading.Thread(target=worker, args=("interactive", rate_limit.PRIORITY_INTERACTIVE))
+    interactive.start()
+    background.join(2)
+    interactive.join(2)
+
+    assert order == ["interactive", "background"]
+
+
+def test_rate_limiter_estimate_and_max_wait():
+    limiter = rate_limit.RateLimiter(per_minute=2, burst=1)
+    assert limiter.estimate_wait() == 0
+    limiter.acquire()
+
+    assert limiter.estimate_wait() > 1
+    with pytest.raises(rate_limit.RateLimitExceeded) as exc:
+        limiter.acquire(max_wait=0.01)
+    assert exc.value.estimated_wait > 1
+
+
+def test_rate_limiter_admits_the_full_quota_without_exceeding_it():
+    now = [0.0]
+    limiter = rate_limit.RateLimiter(per_minute=10, clock=lambda: now[0])
+    admitted = []
+    # Två simulerade minuter där någon alltid väntar på nästa plats
+    while now[0] < 120:
+        if limiter.estimate_wait() == 0:
+            limiter.acquire()
+            admitted.append(now[0])
+        else:
+            now[0] += 0.25
+
+    assert len(admitted) == 20
+    for start in admitted:
+        assert sum(1 for t in admitted if start <= t < start + 60) <= 10
+
+
+''' INSTRUMENTATION TESTS '''
+
+def test_calls_are_recorded_with_cache_status_and_retries(fake_api):
+    logger.reset_stats()
+    _FakeApiHandler.failures = 1
+    api_client.get_teams("PD")
+    api_client.get_teams("PD")
+
+    miss, hit = logger.recent_calls()
+    assert (miss.endpoint, miss.cache, miss.status, miss.retries) == ("/competitions/{code}/teams", "miss", 200, 1)
+    assert miss.size > 0
+    assert (hit.cache, hit.status) == ("hit", None)
+
+    stats = logger.dump_stats()
+    assert stats["api /competitions/{code}/teams"]["count"] == 1
+    assert stats["cache /competitions/{code}/teams"]["count"] == 1
+
+
+def test_failed_call_is_recorded_as_error(fake_api, monkeypatch):
+    logger.reset_stats()
+    monkeypatch.setattr(api_client, "RETRY_ATTEMPTS", 2)
+    _FakeApiHandler.failures = 10
+    with pytest.raises(api_client.UpstreamUnavailableError):
+        api_client._get("/teams/86")
+
+    (record,) = logger.recent_calls()
+    assert (record.status, record.retries, record.error) == (502, 1, "UpstreamUnavailableError")
+    assert logger.dump_stats()["api /teams/{id}"]["errors"] == 1
+
+
+def test_max_wait_serves_stale_instead_of_queueing(fake_api, monkeypatch):
+    api_client.get_teams("PD")
+    _expire("teams_PD")
+    cache._memory.discard("teams_PD")
+
+    limiter = rate_limit.RateLimiter(per_minute=2, burst=1)
+    limiter.acquire()  # töm bucketen: nästa plats om ~60 s
+    monkeypatch.setattr(rate_limit, "_limiter", limiter)
+    hits_before = sum(_FakeApiHandler.hits.values())
+
+    started = time.monotonic()
+    with rate_limit.request_max_wait(0.5):
+        # Sparad data finns: den visas direkt
+        stale = api_client._cached("teams_PD", 0, "/competitions/PD/teams", api_client._normalize_teams)
+        # Ingen sparad data: felet bär väntetiden, även genom fetch_all
+        result = async_client.fetch_all({"teams": async_client.get_teams("PL")}, return_exceptions=True)
+    assert time.monotonic() - started < 5
+
+    assert stale == cache.cache_peek("teams_PD").data
+    assert isinstance(result["teams"], api_client.RateLimitedError)
+    assert result["teams"].retry_after > 1
+    assert sum(_FakeApiHandler.hits.values()) == hits_before
+    assert rate_limit.current_max_wait() is None
+
+
+def test_429_with_max_wait_fails_fast_with_estimate(fake_api):
+    _FakeApiHandler.rate_limited = 1
+
+    started = time.monotonic()
+    with rate_limit.request_max_wait(0.5):
+        with pytest.raises(api_client.RateLimitedError) as exc:
+            api_client._get("/competitions/PD/standings")
+    # Pausen efter 429 köas inte om: sidan får väntetiden direkt
+    assert time.monotonic() - started < 5
+    assert exc.value.retry_after > 30
+    assert _FakeApiHandler.hits == {"/v4/competitions/PD/standings": 1}
@@ -0,0 +1,310 @@
+import json
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+from src.utils import cache, cache_serializers
+from src.utils.cache_backends import JsonDirBackend, SqliteBackend, migrate_entries, migrate_serialization
+
+
+@pytest.fixture(params=["sqlite", "json"])
+def tmp_cache(request, tmp_path, monkeypatch):
+    if request.param == "sqlite":
+        backend = SqliteBackend(tmp_path / "cache.sqlite3")
+    else:
+        backend = JsonDirBackend(tmp_path)
+    monkeypatch.setattr(cache, "_backend", backend)
+    monkeypatch.setattr(cache, "_memory", cache.MemoryTier(1024 * 1024))
+    yield backend
+    backend.close()
+
+
+def test_cache_set_and_get(tmp_cache):
+    cache.cache_set("standings_PD", [{"team_name": "Barcelona"}])
+
+    assert cache.cache_get("standings_PD", ttl_seconds=60) == [{"team_name": "Barcelona"}]
+    assert cache.cache_get("standings_PL", ttl_seconds=60) is None
+
+
+def test_expired_entry_returns_none_without_revalidate(tmp_cache):
+    cache.cache_set("teams_PD", ["a"])
+
+    assert cache.cache_get("teams_PD", ttl_seconds=-1) is None
+
+
+''' STALE-WHILE-REVALIDATE '''
+
+def test_stale_entry_is_served_and_refreshed_in_background(tmp_cache):
+    cache.cache_set("teams_PD", ["old"])
+    refreshed = threading.Event()
+
+    def revalidate():
+        cache.cache_set("teams_PD", ["new"])
+        refreshed.set()
+
+    stale = cache.cache_get("teams_PD", ttl_seconds=-1, max_age_seconds=3600, revalidate=revalidate)
+
+    assert stale == ["old"]
+    assert refreshed.wait(2)
+    assert cache.cache_get("teams_PD", ttl_seconds=60) == ["new"]
+
+
+def test_entry_past_max_age_blocks(tmp_cache):
+    cache.cache_set("teams_PD", ["old"])
+    calls = []
+
+    result = cache.cache_get("teams_PD", ttl_seconds=-2, max_age_seconds=-1, revalidate=lambda: calls.append(1))
+
+    assert result is None
+    assert calls == []
+
+
+''' MEMORY TIER '''
+
+def test_hot_reads_skip_the_disk_tier(tmp_cache, monkeypatch):
+    cache.cache_set("squad_86", [{"name": "Player"}])
+    monkeypatch.setattr(tmp_cache, "get", lambda key: pytest.fail("disk read"))
+
+    assert cache.cache_get("squad_86", ttl_seconds=60) == [{"name": "Player"}]
+    assert cache.memory_cache_stats()["hits"] == 1
+
+
+def test_memory_tier_evicts_least_recently_used():
+    tier = cache.MemoryTier(max_bytes=100)
+    tier.put("a", 0, "A", 40)
+    tier.put("b", 0, "B", 40)
+    tier.get("a", ttl_seconds=float("inf"))
+    tier.put("c", 0, "C", 40)
+
+    assert tier.get("b", ttl_seconds=float("inf")) is None
+    assert tier.get("a", ttl_seconds=float("inf")) is not None
+    stats = tier.stats()
+    assert stats["evictions"] == 1
+    assert stats["bytes"] == 80
+
+
+def test_memory_tier_ignores_expired_entries():
+    tier = cache.MemoryTier(max_bytes=100)
+    tier.put("a", 0, "A", 10)  # ts=0 -> mycket gammal
+
+    assert tier.get("a", ttl_seconds=60) is None
+
+
+''' BACKENDS '''
+
+def test_get_many_and_set_many(tmp_cache):
+    cache.cache_set_many({"team_1": {"name": "A"}, "team_2": {"name": "B"}}, ttl_seconds=60)
+    cache._memory.clear()
+
+    found = cache.cache_get_many(["team_1", "team_2", "team_3"], ttl_seconds=60)
+
+    assert found == {"team_1": {"name": "A"}, "team_2": {"name": "B"}}
+
+
+def test_upsert_overwrites_and_keys_filter_by_prefix(tmp_cache):
+    cache.cache_set("team_1", "old")
+    cache.cache_set("team_1", "new", ttl_seconds=60)
+    cache.cache_set("teams_PD", [])
+
+    record = tmp_cache.get("team_1")
+    assert record.data == "new"
+    assert record.expires_at == pytest.approx(record.ts + 60)
+    assert sorted(tmp_cache.keys("team_")) == ["team_1"]
+
+
+def test_touch_bumps_timestamp_and_keeps_payload(tmp_cache):
+    cache.cache_set("standings_PD", [{"team_name": "Barcelona"}], meta={"etag": '"a"'})
+    before = cache.cache_peek("standings_PD")
+
+    assert cache.cache_touch("standings_PD", ttl_seconds=600, meta={"etag": '"b"'})
+    after = cache.cache_peek("standings_PD")
+
+    assert after.ts >= before.ts
+    assert after.data == [{"team_name": "Barcelona"}]
+    assert after.meta == {"etag": '"b"'}
+    assert not cache.cache_touch("standings_PL")
+
+
+def test_short_lived_threads_do_not_leak_connections(tmp_path):
+    backend = SqliteBackend(tmp_path / "cache.sqlite3", pool_size=2)
+    backend.set("standings_PD", cache._record([{"position": 1}], None))
+    fd_dir = Path("/proc/self/fd")
+    fds_before = len(list(fd_dir.iterdir())) if fd_dir.exists() else 0
+
+    # Som Streamlit: varje rerun körs i en ny tråd som sedan avslutas
+    for _ in range(300):
+        thread = threading.Thread(target=backend.get, args=("standings_PD",))
+        thread.start()
+        thread.join()
+
+    assert backend.idle_connections() <= 2
+    if fd_dir.exists():
+        assert len(list(fd_dir.iterdir())) - fds_before < 10
+    backend.close()
+    assert backend.idle_connections() == 0
+
+
+def test_migrate_json_dir_into_sqlite(tmp_path):
+    source = JsonDirBackend(tmp_path / "json")
+    target = SqliteBackend(tmp_path / "cache.sqlite3")
+    source.set("standings_PD", cache._record([{"position": 1}], None))
+
+    assert migrate_entries(source, target) == 1
+    assert target.get("standings_PD").data == [{"position": 1}]
+    target.close()
+
+
+def write_legacy(directory, key, ts, data):
+    # Som den gamla cachen skrev dem: ingen nyckel och inget expires_at i filen, bara ts och data
+    (directory / f"{key}.json").write_text(json.dumps({"ts": ts, "data": data}), encoding="utf-8")
+
+
+def test_new_sqlite_cache_imports_the_json_cache_once(tmp_path, monkeypatch):
+    now = time.time()
+    write_legacy(tmp_path, "standings_PD", now - 60, [{"position": 1}])
+    write_legacy(tmp_path, "teams_PD", now - 60, [])
+    monkeypatch.setattr(cache, "CACHE_DIR", tmp_path)
+
+    backend = cache._make_backend("sqlite")
+    # Importen körs i underhållstråden; vänta ut den
+    cache._maintenance_pool.submit(lambda: None).result()
+    assert sorted(backend.keys()) == ["standings_PD", "teams_PD"]
+    assert backend.get("standings_PD").data == [{"position": 1}]
+
+    # Nyare data i SQLite skrivs inte över av en ny import
+    backend.set("teams_PD", cache._record([{"team_id": 1}], None))
+    assert cache.import_json_cache(backend) == 0
+    assert backend.get("teams_PD").data == [{"team_id": 1}]
+    backend.close()
+
+    # Databasen finns redan: ingen import när den öppnas igen
+    write_legacy(tmp_path, "matches_PD", now - 60, [])
+    backend = cache._make_backend("sqlite")
+    cache._maintenance_pool.submit(lambda: None).result()
+    assert "matches_PD" not in backend.keys()
+    backend.close()
+
+
+def test_json_import_skips_unreadable_files(tmp_path):
+    now = time.time()
+    write_legacy(tmp_path, "standings_PD", now - 60, [{"position": 1}])
+    (tmp_path / "standings_PL.json").write_text('{"ts": 17000', encoding="utf-8")
+    (tmp_path / "teams_PD.json").write_text("[1, 2, 3]", encoding="utf-8")
+    backend = SqliteBackend(tmp_path / "cache.sqlite3")
+
+    assert cache.import_json_cache(backend, tmp_path) == 1
+    assert backend.keys() == ["standings_PD"]
+    backend.close()
+
+
+def test_import_never_replaces_entries_written_meanwhile(tmp_path):
+    target = SqliteBackend(tmp_path / "cache.sqlite3")
+    source = JsonDirBackend(tmp_path / "json")
+    source.set("teams_PD", cache._record(["old"], 3600))
+    source.set("teams_PL", cache._record(["old"], 3600))
+    # Skrivs av appen efter att importen listat målets nycklar
+    fetched = cache._record(["new"], 3600)
+    source_get_many = source.get_many
+
+    def get_many_then_fetch(keys):
+        records = source_get_many(keys)
+        target.set("teams_PD", fetched)
+        return records
+
+    source.get_many = get_many_then_fetch
+    assert migrate_entries(source, target, overwrite=False) == 1
+    assert target.get("teams_PD").data == ["new"]
+    assert target.get("teams_PL").data == ["old"]
+    target.close()
+
+
+def test_imported_json_entries_expire_like_their_family(tmp_path):
+    now = time.time()
+    write_legacy(tmp_path, "standings_PD", now - 60, [{"position": 1}])
+    write_legacy(tmp_path, "team_matches_86_FINISHED_2025-01-01_2025-01-31_10", now - 60, [])
+    # Redan för gammal för att någonsin serveras
+    write_legacy(tmp_path, "top_scorers_PD", now - 2 * 86400, [])
+    # Ersatta av team_detail_86 och läses inte längre
+    write_legacy(tmp_path, "team_86", now - 60, {"name": "Real Madrid CF"})
+    write_legacy(tmp_path, "squad_86", now - 60, [])
+    backend = SqliteBackend(tmp_path / "cache.sqlite3")
+
+    assert cache.import_json_cache(backend, tmp_path) == 2
+    assert sorted(backend.keys()) == ["standings_PD", "team_matches_86_FINISHED_2025-01-01_2025-01-31_10"]
+    standings = backend.get("standings_PD")
+    assert standings.expires_at == pytest.approx(standings.ts + 6 * 3600)
+    assert backend.expired_keys(now=now + 2 * 3600) == ["team_matches_86_FINISHED_2025-01-01_2025-01-31_10"]
+    backend.close()
+
+
+''' SERIALIZATION '''
+
+def test_serializers_roundtrip():
+    rows = [{"player_id": 1, "name": "Pedri", "goals": None}, {"player_id": 2, "name": "Gavi", "goals": 3}]
+    for name in ["json", "pickle"]:
+        blob = cache_serializers.encode(rows, cache_serializers.get_serializer(name))
+        assert cache_serializers.decode(blob) == rows
+
+
+def test_legacy_json_rows_are_read_and_migrated(tmp_path):
+    backend = SqliteBackend(tmp_path / "cache.sqlite3", serializer=cache_serializers.get_serializer("pickle"))
+    with backend._connection() as conn:
+        conn.execute(
+            "INSERT INTO cache_entries (key, ts, expires_at, size, data) VALUES (?, ?, NULL, 2, ?)",
+            ("teams_PD", 123.0, '[{"name": "Girona FC"}]'),
+        )
+
+    assert backend.get("teams_PD").data == [{"name": "Girona FC"}]
+    assert migrate_serialization(backend) == 1
+    assert backend.stale_format_keys() == []
+    record = backend.get("teams_PD")
+    assert record.data == [{"name": "Girona FC"}]
+    assert record.ts == 123.0
+    backend.close()
+
+
+''' COMPACTION '''
+
+def test_compact_purges_expired_entries(tmp_cache):
+    cache.cache_set("team_matches_1", ["old"], ttl_seconds=-1)
+    cache.cache_set("team_1", {"name": "A"}, ttl_seconds=3600)
+
+    report = cache.compact()
+
+    assert report["expired"] == 1
+    assert report["reclaimed_bytes"] > 0
+    assert tmp_cache.keys() == ["team_1"]
+
+
+def test_compact_evicts_least_recently_used(tmp_cache):
+    for key in ["team_1", "team_2", "team_3"]:
+        cache.cache_set(key, {"key": key})
+    cache._memory.clear()
+    cache.cache_get("team_1", ttl_seconds=60)
+
+    report = cache.compact(max_entries=2, policy="lru")
+
+    assert report["evicted"] == 1
+    assert sorted(tmp_cache.keys()) == ["team_1", "team_3"]
+
+
+def test_compact_only_counts_entries_it_deleted(tmp_cache, monkeypatch):
+    cache.cache_set("team_matches_1", ["old"], ttl_seconds=-1)
+    cache.cache_set("team_matches_2", ["old"], ttl_seconds=-1)
+    sizes = {e.key: e.size for e in tmp_cache.entries()}
+    delete_entries = tmp_cache.delete_entries
+
+    def rewritten_during_compaction(entries):
+        # En annan tråd hinner skriva om posten mellan listningen och borttagningen
+        cache.cache_set("team_matches_2", ["new"], ttl_seconds=3600)
+        return delete_entries(entries)
+
+    monkeypatch.setattr(tmp_cache, "delete_entries", rewritten_during_compaction)
+    report = cache.compact()
+
+    assert report["expired"] == 2
+    assert report["removed"] == 1
+    assert report["reclaimed_bytes"] == sizes["team_matches_1"]
+    assert tmp_cache.keys() == ["team_matches_2"]
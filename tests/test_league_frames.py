@@ -0,0 +1,138 @@
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.components import league_frames
+from src.components.leagues import LEAGUES, get_league
+from src.data_collection.api_client import SUPPORTED_COMPETITIONS
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def standing(position, name, played, points):
+    return {
+        "position": position, "team_id": position, "team_name": name, "crest": f"{name}.png",
+        "played": played, "won": 0, "draw": 0, "lost": 0,
+        "goals_for": 0, "goals_against": 0, "goal_difference": 0, "points": points,
+    }
+
+
+def test_leagues_follow_supported_competitions():
+    assert list(LEAGUES) == list(SUPPORTED_COMPETITIONS)
+    for league in LEAGUES.values():
+        assert (ROOT / league.page).exists()
+        assert (ROOT / "data" / "lookup" / league.lookup).exists()
+    assert get_league("PL").slug == "premier_league"
+    # Sidfilerna är unika och krockar inte med appens övriga sidor
+    pages = [league.page for league in LEAGUES.values()]
+    assert len(set(pages)) == len(pages)
+    assert "pages/4_Favourites.py" not in pages
+    with pytest.raises(ValueError):
+        get_league("XX")
+
+
+def test_standings_frame_and_season_progress():
+    standings = [standing(1, "A", 10, 30), standing(2, "B", 9, 20), standing(3, "C", 10, 10)]
+    df = league_frames.standings_frame(standings)
+    assert list(df.columns) == list(league_frames.STANDINGS_COLUMNS.values())
+    assert list(df["Lag"]) == ["A", "B", "C"]
+    assert list(df["Logo"]) == ["A.png", "B.png", "C.png"]
+    # Tre lag: fyra omgångar, tio spelade räknas som hela säsongen
+    assert league_frames.season_progress(standings) == 100.0
+    assert league_frames.season_progress([]) == 0.0
+
+
+def test_season_progress_scales_with_team_count():
+    standings = [standing(i, f"T{i}", 19, 0) for i in range(1, 21)]
+    assert league_frames.season_progress(standings) == pytest.approx(50.0)
+
+
+def test_team_options_skips_incomplete_rows():
+    teams = [{"team_id": 1, "name": "A"}, {"id": 2, "team_name": "B"}, {"team_id": 3}]
+    assert league_frames.team_options(teams) == {"A": 1, "B": 2}
+
+
+def test_matches_frame_shows_last_and_next_five():
+    now = pd.Timestamp("2025-01-15", tz="UTC")
+    matches = [
+        {
+            "match_id": day, "utc_date": f"2025-01-{day:02d}T20:00:00Z", "status": "FINISHED" if day < 15 else "SCHEDULED",
+            "home_team_id": 1, "home_team_name": "A", "away_team_id": 2, "away_team_name": "B",
+            "score_home": 1 if day < 15 else None, "score_away": 0 if day < 15 else None,
+        }
+        for day in range(1, 29)
+    ]
+    view = league_frames.matches_frame(matches, now=now)
+    assert list(view.columns) == ["Datum", "Hemma", "Borta", "Resultat"]
+    assert list(view["Datum"].str[:10]) == [f"2025-01-{d:02d}" for d in [10, 11, 12, 13, 14, 15, 16, 17, 18, 19]]
+    assert league_frames.matches_frame([]).empty
+
+
+def test_squad_frame_sorts_by_position_and_skips_coaches():
+    squad = [
+        {"player_id": 1, "name": "Forward", "position": "Offence"},
+        {"player_id": 2, "name": "Keeper", "position": "Goalkeeper"},
+        {"player_id": 3, "name": "Coach", "position": None, "role": "COACH"},
+    ]
+    view = league_frames.squad_frame(squad)
+    assert list(view["Spelare"]) == ["Keeper", "Forward"]
+    assert "Nr" not in view.columns
+    assert league_frames.squad_frame([squad[2]]).empty
+
+
+def test_scorers_frame_and_goals_per_match():
+    scorers = [
+        {"player_name": f"P{i}", "team_name": "A", "goals": i, "assists": 0, "appearances": 10}
+        for i in range(1, 26)
+    ]
+    sdf = league_frames.scorers_frame(scorers, {"A": "A.png"})
+    assert len(sdf) == 20
+    assert sdf.iloc[0]["Spelare"] == "P25"
+    assert set(sdf["Logo"]) == {"A.png"}
+
+    top = league_frames.goals_per_match(sdf, top=3)
+    assert list(top["Mål per match"]) == [2.5, 2.4, 2.3]
+
+
+def test_frames_are_shared_until_the_payload_changes():
+    league_frames.clear_memo()
+    standings = [standing(1, "A", 10, 30), standing(2, "B", 9, 20)]
+    first = league_frames.standings_frame(standings)
+    assert league_frames.standings_frame(standings) is first
+    # Samma innehåll i ett nytt objekt, t.ex. läst från disken igen
+    assert league_frames.standings_frame([dict(row) for row in standings]) is first
+
+    changed = [standing(1, "A", 11, 33), standing(2, "B", 9, 20)]
+    rebuilt = league_frames.standings_frame(changed)
+    assert rebuilt is not first
+    assert list(rebuilt["P"]) == [33, 20]
+
+
+def test_match_table_is_memoized_per_minute():
+    league_frames.clear_memo()
+    matches = [{
+        "match_id": 1, "utc_date": "2025-01-15T20:00:00Z", "status": "SCHEDULED",
+        "home_team_id": 1, "home_team_name": "A", "away_team_id": 2, "away_team_name": "B",
+    }]
+    before = league_frames.matches_frame(matches, now=pd.Timestamp("2025-01-15T19:59", tz="UTC"))
+    after = league_frames.matches_frame(matches, now=pd.Timestamp("2025-01-15T20:01", tz="UTC"))
+    assert before is not after
+    assert league_frames.matches_frame(matches, now=pd.Timestamp("2025-01-15T19:59", tz="UTC")) is before
+
+
+def test_frame_memo_is_bounded():
+    memo = league_frames.FrameMemo(max_entries=2)
+    builds = []
+
+    def build(rows):
+        builds.append(rows)
+        return len(rows)
+
+    for rows in ([1], [1, 2], [1, 2, 3], [1]):
+        memo.get_or_build("test", build, rows)
+    assert len(memo) == 2
+    # [1] föll ur när [1, 2, 3] lades till och byggdes om
+    assert len(builds) == 4
+    memo.get_or_build("test", build, [1, 2, 3])
+    assert len(builds) == 4
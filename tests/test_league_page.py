@@ -0,0 +1,78 @@
+from types import SimpleNamespace
+
+import pandas as pd
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from src.components import league_frames, league_page
+
+SCRIPT = 'from src.components.league_page import render_league_page\nrender_league_page("PD")\n'
+
+
+def standing(position, team_id, name):
+    return {
+        "competition_code": "PD", "position": position, "team_id": team_id, "team_name": name,
+        "crest": f"https://crests.football-data.org/{team_id}.png", "played": 10, "won": 5, "draw": 3, "lost": 2,
+        "points": 18, "goals_for": 15, "goals_against": 10, "goal_difference": 5,
+    }
+
+
+STANDINGS = [standing(1, 86, "Real Madrid CF"), standing(2, 81, "FC Barcelona")]
+TEAMS = [{"team_id": 86, "name": "Real Madrid CF"}, {"team_id": 81, "name": "FC Barcelona"}]
+SCORERS = [
+    {"competition_code": "PD", "player_name": "Kylian Mbappé", "team_id": 86, "team_name": "Real Madrid CF",
+     "goals": 12, "assists": None, "appearances": 10},
+    {"competition_code": "PD", "player_name": "Robert Lewandowski", "team_id": 81, "team_name": "FC Barcelona",
+     "goals": 9, "assists": 2, "appearances": 10},
+]
+TEAM = {"team_id": 86, "name": "Real Madrid CF", "crest": "https://crests.football-data.org/86.png", "venue": "Santiago Bernabéu"}
+MATCHES = [{
+    "match_id": 1, "utc_date": "2025-01-15T20:00:00Z", "status": "FINISHED",
+    "home_team_id": 86, "home_team_name": "Real Madrid CF", "away_team_id": 81, "away_team_name": "FC Barcelona",
+    "score_home": 2, "score_away": 1,
+}]
+SQUAD = [
+    {"player_id": 1, "name": "Thibaut Courtois", "position": "Goalkeeper", "nationality": "Belgium",
+     "date_of_birth": "1992-05-11"},
+    {"player_id": 2, "name": "Kylian Mbappé", "position": "Offence", "nationality": "France", "date_of_birth": None},
+]
+
+
+@pytest.fixture
+def page(monkeypatch):
+    # Sidan renderas utan API, meny och bakgrundsjobb
+    monkeypatch.setattr(league_page, "show_menubar", lambda current_page=None: None)
+    monkeypatch.setattr(league_page, "get_standings", lambda code: STANDINGS)
+    monkeypatch.setattr(league_page, "get_teams", lambda code: TEAMS)
+    monkeypatch.setattr(league_page, "get_top_scorers", lambda code: SCORERS)
+    monkeypatch.setattr(league_page, "load_favorites", lambda: [])
+    monkeypatch.setattr(league_page, "async_client", SimpleNamespace(
+        get_team=lambda team_id: TEAM,
+        get_team_matches=lambda team_id, **params: MATCHES,
+        get_squad=lambda team_id: SQUAD,
+    ))
+    monkeypatch.setattr(league_page, "fetch_all", lambda calls: calls)
+    league_frames.clear_memo()
+
+
+def test_rendering_never_changes_shared_frames(page, monkeypatch):
+    # Varje ram sidan får ur minnet delas med alla sessioner: spara en kopia när den lämnas ut
+    handed_out = []
+    for name in ["standings_frame", "matches_frame", "squad_frame", "scorers_frame"]:
+        def spy(*args, _name=name, _build=getattr(league_frames, name), **kwargs):
+            frame = _build(*args, **kwargs)
+            handed_out.append((_name, frame, frame.copy()))
+            return frame
+        monkeypatch.setattr(league_frames, name, spy)
+
+    at = AppTest.from_string(SCRIPT, default_timeout=30)
+    at.run()
+    for tab in league_page.TABS:
+        at.radio[0].set_value(tab).run()
+        if tab == league_page.TABS[1]:
+            at.selectbox[0].set_value("Real Madrid CF").run()
+        assert not at.exception
+
+    assert {name for name, *_ in handed_out} == {"standings_frame", "matches_frame", "squad_frame", "scorers_frame"}
+    for name, frame, snapshot in handed_out:
+        pd.testing.assert_frame_equal(frame, snapshot, obj=name)
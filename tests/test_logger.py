@@ -0,0 +1,49 @@
+import pytest
+
+from src.utils import logger
+
+
+@pytest.fixture(autouse=True)
+def clean_stats():
+    logger.reset_stats()
+    yield
+    logger.reset_stats()
+
+
+def test_percentiles_per_name():
+    for ms in range(1, 101):
+        logger.observe("render standings", ms / 1000)
+
+    stats = logger.dump_stats()["render standings"]
+    assert stats["count"] == 100
+    assert stats["p50"] == pytest.approx(0.050, abs=0.002)
+    assert stats["p95"] == pytest.approx(0.095, abs=0.002)
+    assert stats["p99"] == pytest.approx(0.099, abs=0.002)
+    assert stats["max"] == 0.1
+
+
+def test_rolling_window_drops_old_samples():
+    stats = logger.RollingStats(window=3)
+    for seconds in [10, 1, 1, 1]:
+        stats.observe("x", seconds)
+
+    assert stats.snapshot()["x"]["max"] == 1
+    assert stats.snapshot()["x"]["count"] == 4
+
+
+def test_timer_and_timed_record_errors():
+    with logger.timer("block") as span:
+        pass
+    assert span["elapsed"] >= 0
+
+    @logger.timed("boom")
+    def boom():
+        raise ValueError("x")
+
+    with pytest.raises(ValueError):
+        boom()
+
+    stats = logger.dump_stats()
+    assert stats["block"]["errors"] == 0
+    assert stats["boom"] == {**stats["boom"], "count": 1, "errors": 1}
+    assert "boom" in logger.format_stats()
@@ -0,0 +1,65 @@
+from datetime import date, datetime
+
+from src.data_collection.match_store import MatchStore, RECENT_TTL, merge, subtract
+
+
+def _match(match_id, day, status="SCHEDULED"):
+    return {"match_id": match_id, "utc_date": f"{day}T20:00:00Z", "status": status}
+
+
+def _ts(day):
+    return datetime.fromisoformat(f"{day}T12:00:00+00:00").timestamp()
+
+
+def test_subtract_and_merge_intervals():
+    covered = [(date(2025, 1, 5), date(2025, 1, 10))]
+
+    assert subtract((date(2025, 1, 1), date(2025, 1, 12)), covered) == [
+        (date(2025, 1, 1), date(2025, 1, 4)),
+        (date(2025, 1, 11), date(2025, 1, 12)),
+    ]
+    assert merge([(date(2025, 1, 3), date(2025, 1, 4)), (date(2025, 1, 1), date(2025, 1, 2))]) == [
+        (date(2025, 1, 1), date(2025, 1, 4)),
+    ]
+
+
+def test_query_slices_window_status_and_limit():
+    store = MatchStore()
+    store.apply(
+        (date(2025, 1, 1), date(2025, 1, 31)),
+        [_match(3, "2025-01-20"), _match(1, "2025-01-02", "FINISHED"), _match(2, "2025-01-10", "FINISHED")],
+        fetched_at=_ts("2025-01-01"),
+    )
+
+    window = (date(2025, 1, 1), date(2025, 1, 15))
+    assert [m["match_id"] for m in store.query(window)] == [1, 2]
+    assert [m["match_id"] for m in store.query((date(2025, 1, 1), date(2025, 1, 31)), limit=2)] == [1, 2]
+    assert [m["match_id"] for m in store.query((date(2025, 1, 1), date(2025, 1, 31)), status="SCHEDULED")] == [3]
+
+
+def test_plan_refetches_only_dates_that_can_still_change():
+    store = MatchStore()
+    fetched = _ts("2025-03-01")
+    store.apply((date(2025, 1, 1), date(2025, 3, 31)), [], fetched_at=fetched)
+    window = (date(2025, 1, 1), date(2025, 4, 2))
+
+    missing, stale = store.plan(window, now=fetched + 10, today=date(2025, 3, 1))
+    assert missing == [(date(2025, 4, 1), date(2025, 4, 2))]
+    assert stale == []
+
+    # Efter RECENT_TTL: bara de närmaste två veckorna, inte avgjorda matcher eller fjärran framtid
+    _, stale = store.plan(window, now=fetched + RECENT_TTL + 1, today=date(2025, 3, 1))
+    assert stale == [(date(2025, 2, 28), date(2025, 3, 15))]
+
+    # Dagen efter: allt som inte redan var avgjort vid hämtningen är inaktuellt
+    _, stale = store.plan(window, now=fetched + 86400, today=date(2025, 3, 2))
+    assert stale == [(date(2025, 2, 28), date(2025, 3, 31))]
+
+
+def test_apply_drops_rescheduled_matches_from_refetched_dates():
+    store = MatchStore()
+    store.apply((date(2025, 1, 1), date(2025, 1, 31)), [_match(1, "2025-01-10")], fetched_at=_ts("2025-01-01"))
+    store.apply((date(2025, 1, 5), date(2025, 1, 15)), [], fetched_at=_ts("2025-01-02"))
+
+    assert store.query((date(2025, 1, 1), date(2025, 1, 31))) == []
+    assert len(store.coverage) == 3
@@ -0,0 +1,110 @@
+import urllib.request
+
+import pytest
+
+from src.utils import cache, metrics
+from src.utils.cache_backends import SqliteBackend
+
+
+def test_counter_renders_labelled_series():
+    registry = metrics.Registry()
+    calls = registry.counter("fsh_test_calls", "Test calls", ("endpoint",))
+    calls.labels("teams").inc()
+    calls.labels(endpoint="teams").inc(2)
+    calls.labels("scorers").inc()
+
+    text = registry.render()
+    assert "# TYPE fsh_test_calls counter" in text
+    assert 'fsh_test_calls_total{endpoint="teams"} 3' in text
+    assert 'fsh_test_calls_total{endpoint="scorers"} 1' in text
+
+
+def test_counter_rejects_negative_and_wrong_labels():
+    registry = metrics.Registry()
+    calls = registry.counter("fsh_test_calls", "Test calls", ("endpoint",))
+    with pytest.raises(ValueError):
+        calls.labels("teams").inc(-1)
+    with pytest.raises(ValueError):
+        calls.labels("teams", "extra")
+    with pytest.raises(ValueError):
+        registry.gauge("fsh_test_calls", "Same name, other type")
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = metrics.Registry()
+    latency = registry.histogram("fsh_test_seconds", "Test latency", buckets=(0.1, 1.0))
+    for value in [0.05, 0.5, 0.5, 5.0]:
+        latency.observe(value)
+
+    text = registry.render()
+    assert 'fsh_test_seconds_bucket{le="0.1"} 1' in text
+    assert 'fsh_test_seconds_bucket{le="1"} 3' in text
+    assert 'fsh_test_seconds_bucket{le="+Inf"} 4' in text
+    assert "fsh_test_seconds_sum 6.05" in text
+    assert "fsh_test_seconds_count 4" in text
+
+
+def test_gauge_function_is_read_at_collection():
+    registry = metrics.Registry()
+    depth = registry.gauge("fsh_test_depth", "Queue depth")
+    queue = [1, 2]
+    depth.set_function(lambda: len(queue))
+    assert "fsh_test_depth 2" in registry.render()
+    queue.append(3)
+    assert "fsh_test_depth 3" in registry.render()
+
+
+def test_label_values_are_escaped():
+    registry = metrics.Registry()
+    renders = registry.counter("fsh_test_renders", "Renders", ("tab",))
+    renders.labels('a "quoted"\\tab').inc()
+    assert r'fsh_test_renders_total{tab="a \"quoted\"\\tab"} 1' in registry.render()
+
+
+@pytest.mark.parametrize("key,family", [
+    ("team_detail_86", "team_detail"),
+    ("matches_PD_2025-01-01_2025-01-31_None", "matches"),
+    ("standings_PL", "standings"),
+    ("scorers_SA_10", "scorers"),
+    ("123", "other"),
+])
+def test_cache_family(key, family):
+    assert metrics.cache_family(key) == family
+
+
+def test_cache_lookups_feed_hit_ratio(tmp_path, monkeypatch):
+    backend = SqliteBackend(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(cache, "_backend", backend)
+    monkeypatch.setattr(cache, "_memory", cache.MemoryTier(1024 * 1024))
+    key = "metricstest_PD"
+    before = {r: metrics.CACHE_LOOKUPS.labels("metricstest", r).value for r in ("hit_memory", "miss")}
+
+    assert cache.cache_get(key, ttl_seconds=60) is None
+    cache.cache_set(key, {"ok": True})
+    assert cache.cache_get(key, ttl_seconds=60) == {"ok": True}
+
+    assert metrics.CACHE_LOOKUPS.labels("metricstest", "miss").value == before["miss"] + 1
+    assert metrics.CACHE_LOOKUPS.labels("metricstest", "hit_memory").value == before["hit_memory"] + 1
+    assert 'fsh_cache_hit_ratio{family="metricstest"}' in metrics.render()
+    backend.close()
+
+
+def test_http_exporter_serves_metrics():
+    server = metrics.start_http_exporter(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics", timeout=5) as resp:
+            body = resp.read().decode("utf-8")
+            assert resp.headers["Content-Type"].startswith("text/plain")
+        assert "# TYPE fsh_api_request_duration_seconds histogram" in body
+        # Ett andra anrop startar ingen ny server
+        assert metrics.start_http_exporter(0) is server
+    finally:
+        metrics.stop_exporters()
+
+
+def test_file_exporter_writes_atomically(tmp_path):
+    path = tmp_path / "fsh.prom"
+    metrics.write_metrics_file(path)
+    assert "fsh_cache_lookups" in path.read_text(encoding="utf-8")
+    assert not path.with_suffix(".prom.tmp").exists()
@@ -0,0 +1,143 @@
+from datetime import date
+
+import pytest
+import requests
+
+from src.data_collection import api_client, circuit_breaker, http_session, rate_limit
+from src.data_collection import mock_loader
+from src.data_collection.mock_loader import MockLeagueData
+from src.data_collection.mock_server import MockApiServer
+from src.utils import cache
+from src.utils.cache_backends import SqliteBackend
+
+TODAY = date(2025, 11, 1)
+
+
+@pytest.fixture
+def mock_api(monkeypatch, tmp_path):
+    server = MockApiServer(MockLeagueData.from_lookup(seed=1, today=TODAY)).start()
+
+    monkeypatch.setenv("FOOTBALL_DATA_TOKEN", "test-token")
+    monkeypatch.setattr(api_client, "BASE_URL", server.base_url)
+    monkeypatch.setattr(rate_limit, "_limiter", rate_limit.RateLimiter(6000, 100))
+    monkeypatch.setattr(api_client, "RETRY_BACKOFF_BASE", 0.01)
+    http_session.close_session()
+    circuit_breaker.reset_breakers()
+
+    backend = SqliteBackend(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(cache, "_backend", backend)
+    monkeypatch.setattr(cache, "_memory", cache.MemoryTier(1024 * 1024))
+    monkeypatch.setattr(cache, "_revalidating", set())
+
+    yield server
+
+    http_session.close_session()
+    backend.close()
+    server.stop()
+
+
+def test_client_reads_every_endpoint(mock_api):
+    standings = api_client.get_standings("PD")
+    teams = api_client.get_teams("PD")
+    scorers = api_client.get_top_scorers("PD")
+
+    assert len(standings) == len(teams) == 20
+    assert [row["position"] for row in standings] == list(range(1, 21))
+    assert standings[0]["points"] >= standings[-1]["points"]
+    assert scorers and scorers[0]["goals"] >= scorers[-1]["goals"]
+
+    team_id = teams[0]["team_id"]
+    assert api_client.get_team(team_id)["name"] == teams[0]["name"]
+    assert len(api_client.get_squad(team_id)) == 25
+
+    matches = api_client.get_team_matches(team_id, dateFrom="2025-08-01", dateTo="2025-10-31", limit=60)
+    assert matches and all(team_id in (m["home_team_id"], m["away_team_id"]) for m in matches)
+    assert all(m["status"] == "FINISHED" for m in matches)
+
+    by_date = api_client.get_matches_by_date("PL", "2025-09-01", "2025-09-30", status="FINISHED")
+    assert by_date and all(m["utc_date"].startswith("2025-09") for m in by_date)
+
+
+def test_same_seed_gives_same_data():
+    a = MockLeagueData.from_lookup(seed=7, today=TODAY)
+    b = MockLeagueData.from_lookup(seed=7, today=TODAY)
+    c = MockLeagueData.from_lookup(seed=8, today=TODAY)
+
+    assert a.standings("SA") == b.standings("SA")
+    assert a.matches[("SA", 2025)] != c.matches[("SA", 2025)]
+
+
+def test_standings_add_up(mock_api):
+    table = mock_api.data.standings("PL")["standings"][0]["table"]
+    for row in table:
+        assert row["won"] + row["draw"] + row["lost"] == row["playedGames"]
+    assert sum(r["goalsFor"] for r in table) == sum(r["goalsAgainst"] for r in table)
+
+
+def test_unknown_resources_and_missing_token(mock_api):
+    headers = {"X-Auth-Token": "x"}
+    assert requests.get(f"{mock_api.base_url}/teams/1", headers=headers).status_code == 404
+    assert requests.get(f"{mock_api.base_url}/competitions/PD/standings").status_code == 403
+
+
+def test_etag_answers_not_modified(mock_api):
+    url = f"{mock_api.base_url}/competitions/SA/teams"
+    first = requests.get(url, headers={"X-Auth-Token": "x"})
+    second = requests.get(url, headers={"X-Auth-Token": "x", "If-None-Match": first.headers["ETag"]})
+
+    assert second.status_code == 304
+    assert mock_api.stats()["/competitions/{code}/teams"] == {200: 1, 304: 1}
+
+
+def test_quota_answers_429_with_reset(mock_api):
+    mock_api.quota_per_minute = 2
+    url = f"{mock_api.base_url}/competitions/PD/standings"
+    statuses = [requests.get(url, headers={"X-Auth-Token": "x"}) for _ in range(3)]
+
+    assert [r.status_code for r in statuses] == [200, 200, 429]
+    assert int(statuses[-1].headers["X-RequestCounter-Reset"]) > 0
+
+
+def test_injected_errors_reach_client_as_unavailable(mock_api):
+    mock_api.error_rate = 1.0
+    with pytest.raises(api_client.UpstreamUnavailableError):
+        api_client.get_standings("PD")
+    assert mock_api.stats()["/competitions/{code}/standings"] == {503: api_client.RETRY_ATTEMPTS}
+
+
+''' GENERATOR TESTS '''
+
+def test_generate_scales_competitions_seasons_and_squads():
+    data = MockLeagueData.generate(competitions=5, seasons=2, teams_per_competition=10, squad_size=30, seed=3, today=TODAY)
+
+    assert list(data.competitions) == ["PD", "PL", "SA", "X01", "X02"]
+    assert len(data.competition_teams["X02"]) == 10
+    assert all(len(squad) == 30 for squad in data.squads.values())
+    # Förra säsongen är färdigspelad, 2 * (n - 1) omgångar med n / 2 matcher
+    assert len(data.matches[("X01", 2024)]) == 90
+    assert all(m["status"] == "FINISHED" for m in data.matches[("PD", 2024)])
+    assert data.standings("PD", 2024)["standings"][0]["table"][0]["playedGames"] == 38
+    assert data.standings("PD", 2023) is None
+
+
+def test_normalized_payloads_match_api_client_rows(mock_api):
+    data = MockLeagueData.generate(competitions=4, teams_per_competition=6, seed=1, today=TODAY)
+    payloads = mock_loader.normalized_payloads(data)
+
+    mock_api.data = data
+    team_id = data.competition_teams["X01"][0]
+    assert payloads["standings"]["standings_X01"] == api_client.get_standings("X01")
+    assert payloads["top_scorers"]["top_scorers_PL"] == api_client.get_top_scorers("PL")
+    assert payloads["team_detail"][f"team_detail_{team_id}"]["squad"] == api_client.get_squad(team_id)
+
+
+def test_write_to_cache_serves_client_without_requests(mock_api):
+    data = MockLeagueData.generate(competitions=4, teams_per_competition=6, seed=1, today=TODAY)
+    written = mock_loader.write_to_cache(data)
+    team_id = data.competition_teams["X01"][0]
+
+    assert written == 4 * 3 + len(data.teams) * 2
+    assert len(api_client.get_teams("X01")) == 6
+    assert api_client.get_team(team_id)["team_id"] == team_id
+    assert api_client.get_team_matches(team_id, dateFrom="2025-08-01", dateTo="2025-10-31", limit=60)
+    assert mock_api.stats() == {}
@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from src.components import player_search
+from src.utils import cache
+from src.utils.cache_backends import SqliteBackend
+
+
+@pytest.fixture
+def backend(tmp_path, monkeypatch):
+    backend = SqliteBackend(tmp_path / "cache.sqlite3")
+    monkeypatch.setattr(cache, "_backend", backend)
+    monkeypatch.setattr(cache, "_memory", cache.MemoryTier(1024 * 1024))
+    yield backend
+    backend.close()
+
+
+def squad(team_id, team_name, *players):
+    return {
+        "team": {"team_id": team_id, "name": team_name},
+        "squad": [{"player_id": team_id * 100 + i, "name": name, "position": "Offence"} for i, name in enumerate(players)],
+    }
+
+
+def names(results):
+    return [r["player_name"] for r in results]
+
+
+@pytest.fixture
+def index(backend):
+    cache.cache_set("team_detail_86", squad(86, "Real Madrid CF", "Vinicius Junior", "Kylian Mbappé", "Jude Bellingham"))
+    cache.cache_set("team_detail_81", squad(81, "FC Barcelona", "Robert Lewandowski", "Lamine Yamal", "Pedri"))
+    cache.cache_set("top_scorers_PD", [
+        {"competition_code": "PD", "player_name": "Kylian Mbappé", "team_id": 86, "team_name": "Real Madrid CF", "goals": 25},
+        {"competition_code": "PD", "player_name": "Robert Lewandowski", "team_id": 81, "team_name": "FC Barcelona", "goals": 20},
+    ])
+    cache.cache_set("standings_PD", [{"team_name": "ignored"}])
+    index = player_search.PlayerSearchIndex()
+    assert index.sync(backend) == 3
+    return index
+
+
+def test_sync_indexes_squads_and_scorers(index):
+    assert index.sources() == ["team_detail_81", "team_detail_86", "top_scorers_PD"]
+    assert len(index) == 8
+
+
+def test_prefix_accent_and_fuzzy_queries(index):
+    assert names(index.search("lew")) == ["Robert Lewandowski"]
+    assert names(index.search("mbappe")) == ["Kylian Mbappé"]
+    assert names(index.search("yam")) == ["Lamine Yamal"]
+    assert names(index.search("bellinghma")) == ["Jude Bellingham"]
+    assert index.search("zzzz") == []
+
+
+def test_results_carry_team_league_and_goals(index):
+    [result] = index.search("mbappe")
+    assert result["team_name"] == "Real Madrid CF"
+    assert result["league_code"] == "PD"
+    assert result["page"] == "pages/1_La_Liga.py"
+    # Truppen och skytteligan slås ihop till en rad
+    assert result["goals"] == 25
+    assert result["position"] == "Offence"
+    assert result["player_id"] == 8601
+
+
+def test_limit_and_ranking(index):
+    assert sorted(names(index.search("ju"))) == ["Jude Bellingham", "Vinicius Junior"]
+    assert len(index.search("ju", limit=1)) == 1
+    # Exakt namn före prefixträffar
+    assert names(index.search("pedri")) == ["Pedri"]
+
+
+def test_sync_only_reindexes_changed_entries(index, backend):
+    assert index.sync(backend) == 0
+
+    time.sleep(0.01)
+    cache.cache_set("team_detail_81", squad(81, "FC Barcelona", "Robert Lewandowski", "Lamine Yamal", "Pedri", "Gavi"))
+    # Samma innehåll med ny tidsstämpel indexeras inte om
+    cache.cache_set("team_detail_86", squad(86, "Real Madrid CF", "Vinicius Junior", "Kylian Mbappé", "Jude Bellingham"))
+    assert index.sync(backend) == 1
+    assert names(index.search("gavi")) == ["Gavi"]
+
+    cache.cache_delete("team_detail_81")
+    index.sync(backend)
+    assert index.search("gavi") == []
+    assert names(index.search("lewandowski")) == ["Robert Lewandowski"]  # kvar i skytteligan
+
+
+def test_memory_budget_keeps_newest_entries(backend):
+    for i, team_id in enumerate([1, 2, 3]):
+        cache.cache_set(f"team_detail_{team_id}", squad(team_id, f"Team {team_id}", f"Player{team_id}a", f"Player{team_id}b"))
+        time.sleep(0.01)
+    index = player_search.PlayerSearchIndex(max_players=4)
+    index.sync(backend)
+
+    assert index.sources() == ["team_detail_2", "team_detail_3"]
+    assert len(index) == 4
+    # Posten som hölls utanför läses inte in igen förrän den ändrats
+    assert index.sync(backend) == 0
+
+
+def test_search_players_never_fetches(index, monkeypatch):
+    index.refreshed_at = time.time()
+    monkeypatch.setattr(player_search, "_index", index)
+    assert player_search.search_players("a") == []
+    assert names(player_search.search_players("pedri")) == ["Pedri"]
+
+
+def test_memo_follows_index_changes(index, backend):
+    assert index.search("gavi") == []
+    cache.cache_set("team_detail_81", squad(81, "FC Barcelona", "Pedri", "Gavi"))
+    index.sync(backend)
+    assert names(index.search("gavi")) == ["Gavi"]
+    # Utökad fråga filtrerar den förra frågans träffar
+    assert names(index.search("ped")) == ["Pedri"]
+    assert names(index.search("pedr")) == ["Pedri"]
+
+
+def test_two_letter_queries_match_inside_names(index):
+    # "am" mitt i "Yamal" och i slutet av "Bellingham"
+    assert sorted(names(index.search("am"))) == ["Jude Bellingham", "Lamine Yamal"]
+    assert sorted(names(index.search("an"))) == ["Kylian Mbappé", "Robert Lewandowski"]
+
+
+def test_refined_results_equal_fresh_results(index):
+    typed = ["am", "ama", "yama", "le", "lew", "lewa"]
+    expected = {}
+    for query in typed:
+        index.memo.clear()
+        expected[query] = names(index.search(query))
+    assert expected["ama"] == ["Lamine Yamal"]
+
+    index.memo.clear()
+    assert {query: names(index.search(query)) for query in typed} == expected
@@ -0,0 +1,186 @@
+import time
+
+import pytest
+
+from src.components import search
+
+
+@pytest.fixture
+def index():
+    index = search.TeamSearchIndex()
+    index.load_snapshots()
+    return index
+
+
+def names(results):
+    return [r["team_name"] for r in results]
+
+
+def test_snapshots_cover_all_competitions(index):
+    assert len(index) >= 60
+    assert {r["league_code"] for r in index.search("fc")} == {"PD", "PL", "SA"}
+
+
+def test_prefix_matches_come_before_substring_matches(index):
+    results = names(index.search("real"))
+    assert results[0].startswith("Real")
+    assert all(name.startswith("Real") for name in results[:3])
+
+
+def test_matches_words_short_name_and_tla(index):
+    assert "Real Madrid CF" in names(index.search("madrid"))
+    assert "Real Madrid CF" in names(index.search("RMA"))
+    assert "Manchester United FC" in names(index.search("man united"))
+
+
+def test_prefix_uses_sorted_terms(index):
+    hits = [index._view.entries[i].result["team_name"] for i in index.prefix("arsenal")]
+    assert hits == ["Arsenal FC"]
+    assert index.prefix("zzzz") == []
+
+
+def test_results_carry_league_and_page(index):
+    result = index.search("arsenal")[0]
+    assert result["league_code"] == "PL"
+    assert result["page"] == "pages/2_Premier_League.py"
+    assert result["team_id"] == 57
+
+
+def test_update_skips_unchanged_lists(index):
+    teams = [{"team_id": 1, "name": "Testlaget FC", "shortName": "Testlaget", "tla": "TST"}]
+    assert index.update("PD", teams) is True
+    assert index.update("PD", teams) is False
+    # Samma innehåll i ett nytt objekt räknas inte heller som en ändring
+    assert index.update("PD", [dict(t) for t in teams]) is False
+
+    assert names(index.search("testlag")) == ["Testlaget FC"]
+    assert "Real Madrid CF" not in names(index.search("madrid"))
+    assert "Arsenal FC" in names(index.search("arsenal"))
+
+
+def test_update_rejects_unknown_competition(index):
+    with pytest.raises(ValueError):
+        index.update("XX", [])
+
+
+def test_refresh_only_reindexes_changed_competitions(index, monkeypatch):
+    lists = {comp["code"]: index._sources[comp["code"]][0] for comp in index.competitions}
+    lists["SA"] = lists["SA"] + [{"team_id": 9999, "name": "Nuovo Calcio", "shortName": "Nuovo", "tla": "NUO"}]
+
+    async def fake_get_teams(code):
+        return lists[code]
+
+    monkeypatch.setattr(search, "get_teams", fake_get_teams)
+    assert search.refresh_team_index(index) == 1
+    assert names(index.search("nuovo")) == ["Nuovo Calcio"]
+    assert search.refresh_team_index(index) == 0
+    assert index.refreshed_at > 0
+
+
+def test_search_teams_uses_process_index(index, monkeypatch):
+    index.refreshed_at = time.time()
+    monkeypatch.setattr(search, "_index", index)
+    monkeypatch.setattr(search, "get_teams", lambda code: pytest.fail("search must not fetch"))
+
+    assert search.search_teams("a") == []
+    assert "Juventus FC" in names(search.search_teams("juve"))
+
+
+@pytest.mark.parametrize("text,folded", [
+    ("Club Atlético de Madrid", "club atletico de madrid"),
+    ("Barça", "barca"),
+    ("  Real  Sociedad de Fútbol ", "real sociedad de futbol"),
+    ("Brøndby IF", "brondby if"),
+    ("Paris Saint-Germain", "paris saint germain"),
+])
+def test_normalize_text_folds_accents_and_punctuation(text, folded):
+    assert search.normalize_text(text) == folded
+
+
+def test_accent_insensitive_in_both_directions(index):
+    assert names(index.search("atletico"))[0] == "Club Atlético de Madrid"
+    assert names(index.search("barça"))[0] == "FC Barcelona"
+    assert "Deportivo Alavés" in names(index.search("alaves"))
+
+
+@pytest.mark.parametrize("typo,team", [
+    ("barcleona", "FC Barcelona"),
+    ("juventsu", "Juventus FC"),
+    ("tottenahm", "Tottenham Hotspur FC"),
+])
+def test_typos_find_the_team(index, typo, team):
+    assert names(index.search(typo, limit=3))[0] == team
+
+
+def test_ranking_and_limit(index):
+    results = names(index.search("real", limit=3))
+    assert len(results) == 3
+    # Prefixträffar före "Villarreal CF", som bara innehåller frågan
+    assert "Villarreal CF" not in results
+    assert names(index.search("villarreal"))[0] == "Villarreal CF"
+    assert index.search("zzzz") == []
+
+
+def test_exact_match_ranks_first(index):
+    assert names(index.search("Inter", limit=1)) == ["FC Internazionale Milano"]
+    assert names(index.search("MUN", limit=1)) == ["Manchester United FC"]
+
+
+def test_memo_returns_same_results_without_reranking(index, monkeypatch):
+    first = index.search("madrid", limit=3)
+    monkeypatch.setattr(index, "_rank", lambda view, query: pytest.fail("should be memoized"))
+    assert index.search("Madrid ", limit=3) == first
+    assert index.search("madrid")[:3] == first
+
+
+def test_memo_refines_extended_queries(index, monkeypatch):
+    index.search("bar")
+    base_calls = []
+    original = index.memo.base
+    monkeypatch.setattr(index.memo, "base", lambda gen, q: base_calls.append(q) or original(gen, q))
+    monkeypatch.setattr(index, "_prefix", lambda terms, q: pytest.fail("refinement should not use the full index"))
+
+    assert names(index.search("barc"))[0] == "FC Barcelona"
+    assert names(index.search("barcleona"))[0] == "FC Barcelona"  # fuzzy-träffar kommer fortfarande via trigram
+    assert base_calls == ["barc", "barcleona"]
+
+
+def test_memo_is_invalidated_when_index_changes(index):
+    assert index.search("testlag") == []
+    assert len(index.memo) > 0
+    index.update("PD", [{"team_id": 1, "name": "Testlaget FC"}])
+    assert names(index.search("testlag")) == ["Testlaget FC"]
+
+
+def test_memo_evicts_least_recently_used():
+    memo = search.QueryMemo(max_entries=2)
+    memo.put(1, "aa", frozenset(), [1])
+    memo.put(1, "bb", frozenset(), [2])
+    assert memo.get(1, "aa") == [1]
+    memo.put(1, "cc", frozenset(), [3])
+    assert memo.get(1, "bb") is None
+    assert memo.get(1, "aa") == [1]
+    # En ny generation tömmer allt
+    assert memo.get(2, "aa") is None
+    assert len(memo) == 0
+
+
+def test_two_letter_queries_still_match_substrings(index):
+    # Samma träffar som före trigramindexet: "ta" mitt i namnen räknas
+    results = names(index.search("ta"))
+    assert sorted(results) == ["Atalanta BC", "Crystal Palace FC", "Getafe CF", "RC Celta de Vigo"]
+    assert results[0] == "Atalanta BC"  # prefixträffen först
+    assert sorted(names(index.search("tal"))) == ["Atalanta BC", "Crystal Palace FC"]
+
+
+
+@pytest.mark.parametrize("typed", [["ta", "tal"], ["at", "ata", "atal", "atala"], ["zz", "zzz", "zzzb"], ["rea", "real", "real m"]])
+def test_refined_results_equal_fresh_results(index, typed):
+    expected = {}
+    for query in typed:
+        index.memo.clear()
+        expected[query] = names(index.search(query))
+
+    # Den som skriver tecken för tecken får samma svar som en helt ny fråga
+    index.memo.clear()
+    assert {query: names(index.search(query)) for query in typed} == expected